@@ -1,3 +1,4 @@
+import { randomBytes } from 'crypto'
 import { NextRequest, NextResponse } from 'next/server'
 
 export const runtime = 'nodejs'
@@ -5,6 +6,55 @@ export const maxDuration = 120
 
 const C1B_API_URL = process.env.C1B_API_URL || 'http://localhost:8000'
 
+const TRACEPARENT_RE = /^00-[0-9a-f]{32}-[0-9a-f]{16}-[0-9a-f]{2}$/
+
+// Contexte de trace W3C transmis au parser : celui reçu s'il est valide,
+// sinon un nouveau (le parser rattache ses spans à cette trace)
+function traceparentFor(request: NextRequest): string {
+  const incoming = request.headers.get('traceparent')?.trim().toLowerCase()
+  if (incoming && TRACEPARENT_RE.test(incoming)) return incoming
+  return `00-${randomBytes(16).toString('hex')}-${randomBytes(8).toString('hex')}-01`
+}
+
+// Format colonnes du parser (tableaux parallèles, minutes epoch) : beaucoup
+// plus léger à transférer, redéployé ici au format attendu par le navigateur
+const COLUMNAR_JSON = 'application/vnd.tacho.columnar+json'
+
+interface ColumnarDriver {
+  driver_name: string
+  card_number: string
+  types: number[]
+  starts: number[]
+  ends: number[]
+  durations: number[]
+  registrations: number[]
+  registration_table: string[]
+}
+
+function fromEpochMinutes(minutes: number): string {
+  return new Date(minutes * 60000).toISOString().replace('.000Z', '+00:00')
+}
+
+function expandColumnar(data: any) {
+  const typeCodes: string[] = data.type_codes
+  return {
+    filename: data.filename,
+    file_type: data.file_type,
+    drivers_found: data.drivers_found,
+    results: (data.results as ColumnarDriver[]).map((d) => ({
+      driver_name: d.driver_name,
+      card_number: d.card_number,
+      activities: d.types.map((t, i) => ({
+        type: typeCodes[t],
+        start: fromEpochMinutes(d.starts[i]),
+        end: fromEpochMinutes(d.ends[i]),
+        duration_minutes: d.durations[i],
+        vehicle_registration: d.registrations[i] >= 0 ? d.registration_table[d.registrations[i]] : null,
+      })),
+    })),
+  }
+}
+
 // GET pour tester la connectivité avec le parser
 export async function GET() {
   try {
@@ -17,7 +67,8 @@ export async function GET() {
 }
 
 export async function POST(request: NextRequest) {
-  console.log('[parse-c1b] POST reçu, C1B_API_URL:', C1B_API_URL)
+  const traceparent = traceparentFor(request)
+  console.log('[parse-c1b] POST reçu, C1B_API_URL:', C1B_API_URL, 'traceparent:', traceparent)
 
   try {
     const formData = await request.formData()
@@ -44,6 +95,7 @@ export async function POST(request: NextRequest) {
     const response = await fetch(targetUrl, {
       method: 'POST',
       body: pythonFormData,
+      headers: { traceparent, Accept: `${COLUMNAR_JSON}, application/json;q=0.5` },
       signal: AbortSignal.timeout(120000),
     })
 
@@ -60,7 +112,8 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: errorMessage }, { status: response.status })
     }
 
-    const data = await response.json()
+    const body = await response.json()
+    const data = response.headers.get('content-type')?.startsWith(COLUMNAR_JSON) ? expandColumnar(body) : body
     console.log('[parse-c1b] Succès, drivers:', data.drivers_found)
     return NextResponse.json(data)
   } catch (error: any) {
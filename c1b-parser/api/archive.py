@@ -0,0 +1,90 @@
+"""Lecture des archives (ZIP, tar) de téléchargements tachygraphiques.
+
+Les membres sont extraits un par un, à la demande, dans des fichiers
+temporaires : la mémoire reste bornée quelle que soit la taille de
+l'archive, et seuls les membres en cours de traitement occupent le disque.
+"""
+
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from typing import IO, Callable, Iterator, Optional, Tuple
+
+TACHO_EXTENSIONS = {".c1b", ".ddd", ".v1b"}
+# Un téléchargement réel dépasse rarement quelques Mo : au-delà, membre refusé
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+# Erreurs propres à un membre : chiffré (RuntimeError), compression non gérée
+# (NotImplementedError, ex. deflate64), données corrompues (CRC, flux tronqué)
+MEMBER_ERRORS = (
+    RuntimeError, NotImplementedError, zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError,
+)
+
+
+class ArchiveError(ValueError):
+    """Archive illisible ou membre invalide."""
+
+
+def _is_tacho_file(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in TACHO_EXTENSIONS
+
+
+def _zip_members(path: str) -> Iterator[Tuple[str, int, Callable[[], IO[bytes]]]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir():
+                yield info.filename, info.file_size, lambda info=info: archive.open(info)
+
+
+def _tar_members(path: str) -> Iterator[Tuple[str, int, Callable[[], IO[bytes]]]]:
+    with tarfile.open(path) as archive:
+        for info in archive:
+            if info.isfile():
+                yield info.name, info.size, lambda info=info: archive.extractfile(info)
+
+
+def iter_members(path: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """Extrait chaque fichier tachygraphique de l'archive, l'un après l'autre.
+
+    Un membre refusé (trop volumineux) ou illisible (chiffré, compression
+    non gérée, corrompu) n'interrompt pas la lecture : il est signalé à sa
+    place et les membres suivants sont extraits.
+
+    Yields:
+        (nom du membre, chemin du fichier temporaire, None), le fichier
+        étant à la charge de l'appelant qui le supprime après traitement ;
+        ou (nom du membre, None, motif du refus).
+
+    Raises:
+        ArchiveError: le fichier n'est ni un ZIP ni un tar
+    """
+    if zipfile.is_zipfile(path):
+        members = _zip_members(path)
+    elif tarfile.is_tarfile(path):
+        members = _tar_members(path)
+    else:
+        raise ArchiveError("Archive ZIP ou tar attendue")
+
+    for name, size, open_member in members:
+        if not _is_tacho_file(name):
+            continue
+        if size > MAX_MEMBER_BYTES:
+            yield name, None, f"Membre trop volumineux ({size} octets, max {MAX_MEMBER_BYTES})"
+            continue
+        # Seul le nom de base sert : pas de chemin issu de l'archive sur le disque
+        suffix = os.path.splitext(os.path.basename(name))[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            try:
+                with open_member() as source:
+                    shutil.copyfileobj(source, tmp)
+            except MEMBER_ERRORS as e:
+                error = f"Membre illisible: {e}"
+            else:
+                error = None
+        if error is not None:
+            os.unlink(tmp.name)
+            yield name, None, error
+            continue
+        yield name, tmp.name, None
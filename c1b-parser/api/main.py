@@ -6,11 +6,16 @@ from pathlib import Path
 # Ajouter le répertoire racine au path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from api.routes import infringements, reports, upload
-from database.db import init_db
+from api.routes import analyze, debug, infringements, jobs, planning, reports, upload
+from database.db import close_connections, init_db
+from engine.registry import metrics_sinks
+from observability.memory import MemoryTracingMiddleware
+from observability.metrics import PROMETHEUS_CONTENT_TYPE, ServerTimingMiddleware, render_prometheus
+from observability.profiler import RequestProfilerMiddleware
+from observability.tracing import RuleSpanSink, TracingMiddleware
 
 app = FastAPI(
     title="Tachograph Analyzer API",
@@ -24,16 +29,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id", "traceparent"],
 )
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MemoryTracingMiddleware)
+app.add_middleware(RequestProfilerMiddleware, authorize=debug.authorize_headers)
+app.add_middleware(TracingMiddleware)
+
+# Un span par règle et par entrée partagée du moteur dans la trace de la requête
+metrics_sinks.append(RuleSpanSink())
 
 app.include_router(upload.router, tags=["Upload"])
+app.include_router(jobs.router, tags=["Jobs"])
+app.include_router(analyze.router, tags=["Analyse"])
 app.include_router(infringements.router, tags=["Infractions"])
 app.include_router(reports.router, tags=["Rapports"])
+app.include_router(planning.router, tags=["Planification"])
+app.include_router(debug.router, tags=["Diagnostic"])
 
 
 @app.on_event("startup")
 def startup():
     init_db()
+    jobs.start_job_workers()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    jobs.stop_job_workers()
+    close_connections()
 
 
 @app.get("/")
@@ -43,3 +67,9 @@ def root():
         "version": "1.0.0",
         "description": "Analyse d'infractions Règlement (CE) 561/2006",
     }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métriques Prometheus (latence par étape, type de fichier et issue)."""
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,195 @@
+"""Chaîne de traitement d'un fichier tachygraphique.
+
+Décodage (dddparser), normalisation, analyse et enregistrement en base,
+partagés par les routes d'upload. Chaque étape est chronométrée
+(Server-Timing, histogrammes /metrics) avec le type de fichier.
+"""
+
+import hashlib
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from database.db import (
+    get_compliance_state,
+    get_connection,
+    get_or_create_driver,
+    save_analysis,
+    save_compliance_state,
+)
+from engine.compliance_state import update_compliance_state
+from engine.infringement_engine import analyze_crew
+from engine.shadow import analyze_shadowed
+from models.activity import DriverActivity
+from models.compliance import ComplianceState
+from models.infringement import Infringement
+from observability.metrics import stage_timer
+from parser.json_normalizer import normalize_card_data, normalize_vu_data
+from parser.tacho_parser import parse_file
+
+DriverAnalysis = Tuple[DriverActivity, List[Infringement]]
+# Observateur de progression : (événement, données), ex. pour les événements SSE d'un job
+Progress = Callable[[str, dict], None]
+
+
+def _no_progress(event: str, data: dict) -> None:
+    pass
+
+
+def file_sha256(path: str) -> str:
+    """Empreinte du contenu d'un fichier (déduplication des analyses)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def decode(path: str, file_type: str) -> dict:
+    """Décode le fichier avec dddparser et retourne le JSON brut."""
+    with stage_timer("decode", file_type):
+        return parse_file(path, file_type=file_type)
+
+
+def normalize(raw_json: dict, file_type: str) -> List[DriverActivity]:
+    """Normalise le JSON brut : un conducteur pour une carte, un ou plusieurs pour un VU."""
+    with stage_timer("normalize", file_type):
+        if file_type == "card":
+            return [normalize_card_data(raw_json)]
+        return normalize_vu_data(raw_json)
+
+
+def analyze_drivers(
+    drivers: List[DriverActivity],
+    file_type: str,
+    progress: Progress = _no_progress,
+) -> List[DriverAnalysis]:
+    """Analyse chaque conducteur ; pour un VU, ajoute le repos en équipage (Art. 8.5)."""
+    with stage_timer("analyze", file_type):
+        crew_infringements = analyze_crew(drivers) if file_type == "vu" else []
+        analyses = []
+        for index, driver_activity in enumerate(drivers, 1):
+            infringements = analyze_shadowed(driver_activity) + [
+                inf for inf in crew_infringements
+                if inf.card_number == driver_activity.card_number
+            ]
+            infringements.sort(key=lambda i: i.date)
+            analyses.append((driver_activity, infringements))
+            progress("driver_analyzed", {
+                "index": index,
+                "total": len(drivers),
+                "card_number": driver_activity.card_number,
+                "total_infringements": len(infringements),
+            })
+        return analyses
+
+
+def _update_compliance_state(conn, driver_id: int, driver_activity: DriverActivity) -> None:
+    """Intègre les nouvelles activités à l'état de conformité du conducteur."""
+    state = get_compliance_state(conn, driver_id) or ComplianceState(
+        card_number=driver_activity.card_number
+    )
+    update_compliance_state(state, driver_activity.activities)
+    save_compliance_state(conn, driver_id, state)
+
+
+def persist(
+    filename: str,
+    file_type: str,
+    analyses: List[DriverAnalysis],
+    progress: Progress = _no_progress,
+    content_hash: Optional[str] = None,
+) -> List[dict]:
+    """Enregistre les analyses et retourne le résultat par conducteur.
+
+    ``content_hash`` (SHA-256 du fichier) : une nouvelle analyse du même
+    fichier remplace la précédente au lieu de la dupliquer.
+    """
+    results = []
+    with stage_timer("persist", file_type):
+        with get_connection() as conn:
+            for index, (driver_activity, infringements) in enumerate(analyses, 1):
+                driver_id = get_or_create_driver(
+                    conn, driver_activity.driver_name, driver_activity.card_number
+                )
+                activities = driver_activity.activities
+                period = (activities[0].start.date(), activities[-1].end.date()) if activities else None
+                analysis_id = save_analysis(
+                    conn, driver_id, filename, file_type, infringements, content_hash,
+                    total_activities=len(activities), period=period,
+                )
+                _update_compliance_state(conn, driver_id, driver_activity)
+
+                results.append({
+                    "driver_name": driver_activity.driver_name,
+                    "card_number": driver_activity.card_number,
+                    "driver_id": driver_id,
+                    "analysis_id": analysis_id,
+                    "total_activities": len(activities),
+                    "total_infringements": len(infringements),
+                    "infringements": [inf.dict() for inf in infringements],
+                })
+                progress("driver_result", {
+                    "index": index, "total": len(analyses), "result": results[-1],
+                })
+    return results
+
+
+def process_file(
+    path: str,
+    filename: str,
+    file_type: str,
+    progress: Progress = _no_progress,
+) -> List[dict]:
+    """Chaîne complète d'un fichier : résultat par conducteur (format de /upload).
+
+    ``progress`` reçoit les transitions d'étape (``decoded``, ``normalized``,
+    ``analyzed``), chaque conducteur analysé (``driver_analyzed``) et chaque
+    résultat enregistré (``driver_result``).
+    """
+    raw_json = decode(path, file_type)
+    progress("decoded", {})
+    drivers = normalize(raw_json, file_type)
+    progress("normalized", {"drivers": len(drivers)})
+    analyses = analyze_drivers(drivers, file_type, progress)
+    progress("analyzed", {})
+    return persist(filename, file_type, analyses, progress, content_hash=file_sha256(path))
+
+
+def activity_payload(activity) -> dict:
+    """Une activité au format de sortie de /parse."""
+    return {
+        "type": activity.type.value,
+        "start": activity.start.isoformat(),
+        "end": activity.end.isoformat(),
+        "duration_minutes": activity.duration_minutes,
+        "vehicle_registration": activity.vehicle_registration,
+    }
+
+
+def activities_payload(driver_activity: DriverActivity) -> dict:
+    """Activités brutes d'un conducteur, telles que renvoyées par /parse."""
+    return {
+        "driver_name": driver_activity.driver_name,
+        "card_number": driver_activity.card_number,
+        "activities": [activity_payload(a) for a in driver_activity.activities],
+    }
+
+
+def iter_parse_chunks(drivers: List[DriverActivity], chunk_size: int) -> Iterator[dict]:
+    """Sortie de /parse découpée : en-tête par conducteur puis blocs d'activités.
+
+    Chaque bloc ne matérialise que ``chunk_size`` activités sérialisées.
+    """
+    for driver_activity in drivers:
+        yield {
+            "kind": "driver",
+            "driver_name": driver_activity.driver_name,
+            "card_number": driver_activity.card_number,
+            "total_activities": len(driver_activity.activities),
+        }
+        activities = driver_activity.activities
+        for i in range(0, len(activities), chunk_size):
+            yield {
+                "kind": "activities",
+                "card_number": driver_activity.card_number,
+                "activities": [activity_payload(a) for a in activities[i:i + chunk_size]],
+            }
@@ -0,0 +1,48 @@
+"""Route d'analyse de timelines déjà normalisées (sans décodage)."""
+
+from fastapi import APIRouter, HTTPException
+
+from api.pipeline import persist
+from api.schemas import AnalyzeRequest
+from engine.infringement_engine import analyze_summary
+
+router = APIRouter()
+
+# Type enregistré dans analyses.file_type pour une timeline fournie en JSON
+TIMELINE_FILE_TYPE = "timeline"
+
+
+@router.post("/analyze")
+def analyze_timeline(request: AnalyzeRequest):
+    """Analyse une timeline au format de /parse (``timeline``) ou en colonnes (``columnar``).
+
+    Évite un nouveau passage par dddparser pour une ré-analyse (timeline
+    corrigée, règles modifiées). ``start``/``end`` limitent la fenêtre,
+    ``articles`` les règles ; avec ``persist``, l'analyse est enregistrée
+    comme celles de /upload.
+    """
+    try:
+        if request.timeline is not None:
+            driver_activity = request.timeline.to_driver_activity()
+        else:
+            driver_activity = request.columnar.to_driver_activity()
+        summary = analyze_summary(
+            driver_activity, request.start, request.end, articles=request.articles
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    result = {
+        "driver_name": driver_activity.driver_name,
+        "card_number": driver_activity.card_number,
+        "total_activities": len(driver_activity.activities),
+        **summary,
+    }
+    if request.persist:
+        saved = persist(
+            request.filename or "timeline", TIMELINE_FILE_TYPE,
+            [(driver_activity, summary["infringements"])],
+        )[0]
+        result["driver_id"] = saved["driver_id"]
+        result["analysis_id"] = saved["analysis_id"]
+    return result
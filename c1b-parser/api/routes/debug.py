@@ -0,0 +1,57 @@
+"""Routes de diagnostic réservées à l'administrateur (profilage)."""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from observability.profiler import profile_for, profile_store
+
+router = APIRouter(prefix="/debug")
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+MAX_PROFILE_SECONDS = 60
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """Vrai si ``token`` correspond à ADMIN_TOKEN (routes désactivées sans ADMIN_TOKEN)."""
+    expected = os.environ.get("ADMIN_TOKEN")
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+
+def authorize_headers(headers: dict) -> bool:
+    """Autorisation pour le middleware ASGI (en-têtes bruts, noms en minuscules)."""
+    token = headers.get(ADMIN_TOKEN_HEADER.lower().encode())
+    return admin_token_valid(token.decode("latin-1") if token else None)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Accès réservé à l'administrateur")
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def profile_process(
+    seconds: float = Query(5, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+):
+    """Échantillonne tous les threads pendant ``seconds`` secondes.
+
+    Retourne les piles au format collapsed (flamegraph.pl, speedscope).
+    """
+    return profile_for(seconds, interval_ms / 1000)
+
+
+@router.get(
+    "/profile/{profile_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)],
+)
+def get_request_profile(profile_id: str):
+    """Profil d'une requête envoyée avec l'en-tête ``X-Profile`` (voir ``X-Profile-Id``)."""
+    collapsed = profile_store.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return collapsed
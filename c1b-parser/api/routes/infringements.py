@@ -4,11 +4,13 @@ from fastapi import APIRouter, HTTPException
 
 from database.db import (
     get_all_drivers,
+    get_compliance_state,
     get_connection,
     get_driver_by_id,
     get_infringements_by_driver,
     get_summary,
 )
+from engine.compliance_state import compliance_snapshot
 
 router = APIRouter()
 
@@ -43,3 +45,16 @@ def list_drivers():
     with get_connection() as conn:
         drivers = get_all_drivers(conn)
     return {"drivers": drivers}
+
+
+@router.get("/drivers/{driver_id}/compliance")
+def driver_compliance(driver_id: int):
+    """Temps de conduite restant, prochaine pause et prochains repos du conducteur.
+
+    Lu depuis l'état maintenu à chaque upload : pas de ré-analyse de l'historique.
+    """
+    with get_connection() as conn:
+        state = get_compliance_state(conn, driver_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Aucun état de conformité pour ce conducteur")
+    return compliance_snapshot(state)
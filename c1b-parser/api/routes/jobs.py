@@ -0,0 +1,137 @@
+"""Routes d'analyse asynchrone : dépôt d'un fichier et suivi du job."""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, File, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from jobs.events import TERMINAL_EVENTS, job_events
+from jobs.queue import DEFAULT_QUEUE_PATH, JobQueue, create_queue, new_job
+from jobs.worker import WorkerPool
+from models.job import JobStatus
+from observability.tracing import span
+from parser.tacho_parser import detect_file_type
+
+router = APIRouter(prefix="/jobs")
+
+# Commentaire SSE envoyé en l'absence d'événement (garde la connexion ouverte)
+KEEPALIVE_SECONDS = 15.0
+
+job_queue: Optional[JobQueue] = None
+worker_pool: Optional[WorkerPool] = None
+
+
+def storage_dir() -> Path:
+    """Répertoire des fichiers en attente de traitement (JOB_STORAGE_DIR)."""
+    return Path(os.environ.get("JOB_STORAGE_DIR", DEFAULT_QUEUE_PATH.parent))
+
+
+def start_job_workers() -> None:
+    """Ouvre la file (JOB_QUEUE_URL) et démarre les workers (JOB_WORKERS)."""
+    global job_queue, worker_pool
+    job_queue = create_queue(os.environ.get("JOB_QUEUE_URL") or None)
+    workers = os.environ.get("JOB_WORKERS")
+    worker_pool = WorkerPool(job_queue) if workers is None else WorkerPool(job_queue, int(workers))
+    worker_pool.start()
+
+
+def stop_job_workers() -> None:
+    global worker_pool
+    if worker_pool is not None:
+        worker_pool.stop()
+        worker_pool = None
+
+
+def _queue() -> JobQueue:
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="File de jobs non démarrée")
+    return job_queue
+
+
+@router.post("", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    """Dépose un fichier C1B/DDD/V1B ; l'analyse se fait en arrière-plan.
+
+    Returns:
+        Identifiant du job, à suivre avec GET /jobs/{job_id}
+    """
+    queue = _queue()
+    filename = file.filename or "unknown"
+    file_type = detect_file_type(filename)
+    directory = storage_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    job = new_job(filename, file_type, path="")
+    job.path = str(directory / f"{job.id}{os.path.splitext(filename)[1]}")
+    with span("temp_write"), open(job.path, "wb") as stored:
+        shutil.copyfileobj(file.file, stored)
+
+    queue.enqueue(job)
+    if worker_pool is not None:
+        worker_pool.notify()
+    return {"job_id": job.id, "status": job.status.value}
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    """État d'un job ; ``result`` (format de /upload) une fois terminé."""
+    job = _queue().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    return job.model_dump(mode="json", exclude={"path"})
+
+
+def _sse(seq: Optional[int], event: str, data: dict) -> str:
+    lines = [f"event: {event}", f"data: {json.dumps(data, default=str, ensure_ascii=False)}"]
+    if seq is not None:
+        lines.insert(0, f"id: {seq}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _job_events(queue: JobQueue, job_id: str, cursor: int) -> AsyncIterator[str]:
+    """Événements du job à partir de ``cursor``, jusqu'à ``done`` ou ``failed``."""
+    while True:
+        if not job_events.known(job_id):
+            # Job traité ailleurs ou avant un redémarrage : seul l'état final est connu
+            job = await run_in_threadpool(queue.get, job_id)
+            if job.status == JobStatus.DONE:
+                yield _sse(None, "done", {"result": job.result})
+                return
+            if job.status == JobStatus.FAILED:
+                yield _sse(None, "failed", {"error": job.error})
+                return
+
+        events = await job_events.wait(job_id, cursor, KEEPALIVE_SECONDS)
+        for seq, event, data in events:
+            yield _sse(seq, event, data)
+            cursor = seq + 1
+            if event in TERMINAL_EVENTS:
+                return
+        if not events:
+            yield ": keepalive\n\n"
+
+
+@router.get("/{job_id}/events")
+async def job_event_stream(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Progression d'un job en Server-Sent Events.
+
+    Événements : ``running``, ``decoded``, ``normalized`` (nombre de
+    conducteurs), ``driver_analyzed`` (i/n, nombre d'infractions),
+    ``analyzed``, ``driver_result`` (résultat enregistré d'un conducteur),
+    puis ``done`` (résultat complet) ou ``failed``. Les événements déjà
+    émis sont rejoués ; ``Last-Event-ID`` reprend après une reconnexion.
+    """
+    queue = _queue()
+    if await run_in_threadpool(queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    cursor = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _job_events(queue, job_id, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,60 @@
+"""Routes d'aide à la planification (évaluation de plannings hypothétiques)."""
+
+import os
+
+from fastapi import APIRouter, HTTPException
+
+from api.schemas import WhatIfRequest
+from engine.what_if import evaluate_candidates
+
+router = APIRouter()
+
+MAX_CANDIDATES = 500
+# Processus d'évaluation (0 : un par cœur) ; en dessous de PARALLEL_MIN_CANDIDATES
+# candidats, le démarrage du pool coûte plus qu'il ne rapporte
+WHAT_IF_WORKERS = int(os.environ.get("WHAT_IF_WORKERS", "0"))
+PARALLEL_MIN_CANDIDATES = int(os.environ.get("WHAT_IF_PARALLEL_MIN", "32"))
+
+
+@router.post("/what-if")
+def what_if(request: WhatIfRequest):
+    """Évalue des plannings candidats contre l'historique d'un conducteur.
+
+    Le service ne conserve pas les timelines : l'historique est fourni au
+    format de sortie de /parse. Retourne, pour chaque candidat, les
+    infractions qu'il provoquerait. Au-delà de PARALLEL_MIN_CANDIDATES
+    candidats, l'évaluation est répartie sur WHAT_IF_WORKERS processus.
+    """
+    if len(request.candidates) > MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Trop de plannings candidats (max {MAX_CANDIDATES})",
+        )
+
+    history = request.history.to_driver_activity()
+    candidates = [[a.to_activity() for a in c] for c in request.candidates]
+
+    workers = 1
+    if len(candidates) >= PARALLEL_MIN_CANDIDATES:
+        workers = WHAT_IF_WORKERS or os.cpu_count() or 1
+
+    try:
+        results = evaluate_candidates(
+            history, candidates, articles=request.articles, workers=workers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return {
+        "driver_name": history.driver_name,
+        "card_number": history.card_number,
+        "candidates": [
+            {
+                "index": index,
+                "compliant": not infringements,
+                "total_infringements": len(infringements),
+                "infringements": [inf.dict() for inf in infringements],
+            }
+            for index, infringements in enumerate(results)
+        ],
+    }
@@ -22,6 +22,7 @@ from database.db import (
     get_driver_by_id,
     get_infringements_by_driver,
 )
+from observability.metrics import stage_timer
 
 router = APIRouter()
 
@@ -152,7 +153,8 @@ def generate_pdf_report(driver_id: int):
         footer_style,
     ))
 
-    doc.build(elements)
+    with stage_timer("render_pdf"):
+        doc.build(elements)
     buffer.seek(0)
 
     filename = f"rapport_{driver['card_number']}_{datetime.now().strftime('%Y%m%d')}.pdf"
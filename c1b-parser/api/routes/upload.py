@@ -1,171 +1,292 @@
 """Route d'upload et d'analyse de fichiers tachygraphiques."""
 
+import asyncio
+import hashlib
+import json
 import os
 import shutil
+import tarfile
 import tempfile
-from typing import List
+import zipfile
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from database.db import get_connection, get_or_create_driver, save_analysis
-from engine.infringement_engine import analyze
-from models.infringement import Infringement
-from parser.json_normalizer import normalize_card_data, normalize_vu_data
-from parser.tacho_parser import TachoParserError, detect_file_type, parse_file
+from api.archive import ArchiveError, iter_members
+from api.pipeline import (
+    activities_payload,
+    analyze_drivers,
+    decode,
+    iter_parse_chunks,
+    normalize,
+    persist,
+    process_file,
+)
+from api.wire import (
+    JSON_MEDIA_TYPE,
+    TYPE_CODES,
+    columnar_timeline,
+    encoded_response,
+    negotiate_media_type,
+)
+from database.db import get_analyses_by_hash, get_analysis_infringements, get_connection
+from observability.tracing import span
+from parser.tacho_parser import TachoParserError, detect_file_type
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Membres d'une archive traités simultanément (fichiers extraits en attente compris)
+BULK_CONCURRENCY = int(os.environ.get("BULK_CONCURRENCY", "4"))
+# Activités par ligne dans la réponse NDJSON de /parse
+PARSE_CHUNK_SIZE = int(os.environ.get("PARSE_CHUNK_SIZE", "500"))
+
+
+def _decode_or_raise(path: str, file_type: str) -> dict:
+    """Décode le fichier, en traduisant les erreurs du parser en erreurs HTTP."""
+    try:
+        return decode(path, file_type)
+    except TachoParserError as e:
+        raise HTTPException(status_code=422, detail=f"Erreur de parsing: {e}")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload, default=str, ensure_ascii=False) + "\n"
+
+
+def _wants_ndjson(accept: Optional[str]) -> bool:
+    return NDJSON_MEDIA_TYPE in (accept or "")
+
+
+def _parse_lines(filename: Optional[str], file_type: str, drivers) -> Iterator[str]:
+    """Sortie NDJSON de /parse : en-tête du fichier puis blocs par conducteur."""
+    yield _ndjson({
+        "kind": "file",
+        "filename": filename,
+        "file_type": file_type,
+        "drivers_found": len(drivers),
+    })
+    for chunk in iter_parse_chunks(drivers, PARSE_CHUNK_SIZE):
+        yield _ndjson(chunk)
+
 
 @router.post("/parse")
-async def parse_only(file: UploadFile = File(...)):
+async def parse_only(
+    file: UploadFile = File(...),
+    accept: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """Parse un fichier C1B/DDD/V1B et retourne les activités brutes.
 
     Pas d'analyse d'infractions — le frontend utilise son propre algorithme.
+
+    Avec ``Accept: application/x-ndjson``, la réponse est une ligne
+    ``file``, puis pour chaque conducteur une ligne ``driver`` et des
+    lignes ``activities`` d'au plus PARSE_CHUNK_SIZE activités. Le fichier
+    est décodé et normalisé en entier avant la première ligne (dans un
+    fichier VU, les conducteurs sont mêlés dans chaque bloc) : seule la
+    sérialisation est diffusée, ce qui borne la mémoire de la réponse mais
+    pas le délai avant le premier octet.
+
+    Avec ``Accept: application/vnd.tacho.columnar+json`` (ou ``+msgpack``),
+    les activités sont renvoyées en colonnes (voir api.wire). La réponse est
+    compressée selon Accept-Encoding (gzip, brotli).
     """
     suffix = os.path.splitext(file.filename or "file")[1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+    with span("temp_write"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
         shutil.copyfileobj(file.file, tmp)
         tmp_path = tmp.name
 
     try:
         file_type = detect_file_type(file.filename or tmp_path)
+        raw_json = _decode_or_raise(tmp_path, file_type)
+        drivers = normalize(raw_json, file_type)
+    finally:
+        os.unlink(tmp_path)
 
-        try:
-            raw_json = parse_file(tmp_path, file_type=file_type)
-        except TachoParserError as e:
-            raise HTTPException(status_code=422, detail=f"Erreur de parsing: {e}")
-        except FileNotFoundError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    if _wants_ndjson(accept):
+        return StreamingResponse(
+            _parse_lines(file.filename, file_type, drivers), media_type=NDJSON_MEDIA_TYPE
+        )
 
-        results = []
+    media_type = negotiate_media_type(accept)
+    if media_type == JSON_MEDIA_TYPE:
+        results = [activities_payload(d) for d in drivers]
+    else:
+        results = [columnar_timeline(d) for d in drivers]
+    payload = {
+        "filename": file.filename,
+        "file_type": file_type,
+        "drivers_found": len(results),
+        "results": results,
+    }
+    if media_type != JSON_MEDIA_TYPE:
+        payload["type_codes"] = TYPE_CODES
+    return encoded_response(payload, media_type, accept_encoding)
+
+
+def _store_upload(file: UploadFile) -> Tuple[str, str]:
+    """Copie l'upload dans un fichier temporaire ; retourne (chemin, SHA-256)."""
+    suffix = os.path.splitext(file.filename or "file")[1]
+    digest = hashlib.sha256()
+    with span("temp_write"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        for block in iter(lambda: file.file.read(1024 * 1024), b""):
+            digest.update(block)
+            tmp.write(block)
+    return tmp.name, digest.hexdigest()
 
-        if file_type == "card":
-            driver_activity = normalize_card_data(raw_json)
+
+def _previous_results(content_hash: str) -> List[dict]:
+    """Analyses déjà enregistrées pour ce contenu, au format de persist()."""
+    with span("dedupe"), get_connection() as conn:
+        results = []
+        for row in get_analyses_by_hash(conn, content_hash):
+            infringements = get_analysis_infringements(conn, row)
             results.append({
-                "driver_name": driver_activity.driver_name,
-                "card_number": driver_activity.card_number,
-                "activities": [
-                    {
-                        "type": a.type.value,
-                        "start": a.start.isoformat(),
-                        "end": a.end.isoformat(),
-                        "duration_minutes": a.duration_minutes,
-                        "vehicle_registration": a.vehicle_registration,
-                    }
-                    for a in driver_activity.activities
-                ],
+                "driver_name": row["driver_name"],
+                "card_number": row["card_number"],
+                "driver_id": row["driver_id"],
+                "analysis_id": row["analysis_id"],
+                "total_activities": row["total_activities"],
+                "total_infringements": len(infringements),
+                "infringements": [inf.dict() for inf in infringements],
             })
-        else:
-            driver_activities = normalize_vu_data(raw_json)
-            for driver_activity in driver_activities:
-                results.append({
-                    "driver_name": driver_activity.driver_name,
-                    "card_number": driver_activity.card_number,
-                    "activities": [
-                        {
-                            "type": a.type.value,
-                            "start": a.start.isoformat(),
-                            "end": a.end.isoformat(),
-                            "duration_minutes": a.duration_minutes,
-                            "vehicle_registration": a.vehicle_registration,
-                        }
-                        for a in driver_activity.activities
-                    ],
-                })
-
-        return {
-            "filename": file.filename,
-            "file_type": file_type,
-            "drivers_found": len(results),
-            "results": results,
-        }
-
-    finally:
-        os.unlink(tmp_path)
+        return results
 
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    force: bool = Query(False, description="Ré-analyser même si ce fichier l'a déjà été"),
+    accept_encoding: Optional[str] = Header(None),
+):
     """Upload un fichier C1B/DDD/V1B, le parse et analyse les infractions.
 
+    Un fichier VU peut contenir plusieurs conducteurs ; le repos en
+    équipage (Art. 8.5) est alors vérifié par jointure des timelines.
+
+    Un fichier déjà analysé (même contenu) n'est ni décodé ni ré-analysé :
+    la réponse a la même forme, avec ``duplicate: true`` et les infractions
+    enregistrées sur la période du fichier. ``force=true`` ré-analyse et
+    remplace ces analyses (mêmes ``analysis_id``).
+
+    La réponse ne contient pas d'activités : elle est toujours en JSON
+    (les formats colonnes de /parse ne s'appliquent pas), compressée selon
+    Accept-Encoding.
+
     Returns:
         Résultat de l'analyse avec les infractions détectées
     """
     # Sauvegarder le fichier temporairement
-    suffix = os.path.splitext(file.filename or "file")[1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
+    tmp_path, content_hash = _store_upload(file)
 
     try:
-        # Détecter le type et parser
         file_type = detect_file_type(file.filename or tmp_path)
+        previous = [] if force else _previous_results(content_hash)
+        if previous:
+            payload = {"duplicate": True, "results": previous}
+        else:
+            # Parser, normaliser, analyser et sauvegarder en BDD
+            raw_json = _decode_or_raise(tmp_path, file_type)
+            drivers = normalize(raw_json, file_type)
+            analyses = analyze_drivers(drivers, file_type)
+            results = persist(
+                file.filename or "unknown", file_type, analyses, content_hash=content_hash
+            )
+            payload = {"duplicate": False, "results": results}
 
-        try:
-            raw_json = parse_file(tmp_path, file_type=file_type)
-        except TachoParserError as e:
-            raise HTTPException(status_code=422, detail=f"Erreur de parsing: {e}")
-        except FileNotFoundError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        return encoded_response(
+            {
+                "filename": file.filename,
+                "file_type": file_type,
+                "drivers_found": len(payload["results"]),
+                **payload,
+            },
+            JSON_MEDIA_TYPE,
+            accept_encoding,
+        )
 
-        # Normaliser et analyser
-        results = []
+    finally:
+        os.unlink(tmp_path)
 
-        if file_type == "card":
-            driver_activity = normalize_card_data(raw_json)
-            infringements = analyze(driver_activity)
 
-            # Sauvegarder en BDD
-            with get_connection() as conn:
-                driver_id = get_or_create_driver(
-                    conn, driver_activity.driver_name, driver_activity.card_number
-                )
-                analysis_id = save_analysis(
-                    conn, driver_id, file.filename or "unknown",
-                    file_type, infringements
-                )
+def _process_member(name: str, path: str) -> List[dict]:
+    """Analyse un membre extrait : une ligne par conducteur, ou une ligne d'erreur."""
+    filename = os.path.basename(name)
+    file_type = detect_file_type(filename)
+    try:
+        results = process_file(path, filename, file_type)
+    except TachoParserError as e:
+        return [{"member": name, "file_type": file_type, "error": f"Erreur de parsing: {e}"}]
+    except Exception as e:
+        return [{"member": name, "file_type": file_type, "error": str(e)}]
+    finally:
+        os.unlink(path)
+    return [{"member": name, "file_type": file_type, **result} for result in results]
 
-            results.append({
-                "driver_name": driver_activity.driver_name,
-                "card_number": driver_activity.card_number,
-                "driver_id": driver_id,
-                "analysis_id": analysis_id,
-                "total_activities": len(driver_activity.activities),
-                "total_infringements": len(infringements),
-                "infringements": [inf.dict() for inf in infringements],
-            })
 
-        else:
-            # VU : peut contenir plusieurs conducteurs
-            driver_activities = normalize_vu_data(raw_json)
-            for driver_activity in driver_activities:
-                infringements = analyze(driver_activity)
-
-                with get_connection() as conn:
-                    driver_id = get_or_create_driver(
-                        conn, driver_activity.driver_name, driver_activity.card_number
-                    )
-                    analysis_id = save_analysis(
-                        conn, driver_id, file.filename or "unknown",
-                        file_type, infringements
-                    )
-
-                results.append({
-                    "driver_name": driver_activity.driver_name,
-                    "card_number": driver_activity.card_number,
-                    "driver_id": driver_id,
-                    "analysis_id": analysis_id,
-                    "total_activities": len(driver_activity.activities),
-                    "total_infringements": len(infringements),
-                    "infringements": [inf.dict() for inf in infringements],
-                })
-
-        return {
-            "filename": file.filename,
-            "file_type": file_type,
-            "drivers_found": len(results),
-            "results": results,
-        }
+async def _bulk_lines(archive_path: str, concurrency: int) -> AsyncIterator[str]:
+    """Lignes NDJSON des membres de l'archive, dans l'ordre où ils se terminent.
 
+    Un membre n'est extrait que lorsqu'une place se libère : au plus
+    ``concurrency`` fichiers extraits et résultats en attente à la fois.
+    """
+    members = iter_members(archive_path)
+    pending = set()
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    member = await run_in_threadpool(next, members, None)
+                except (ArchiveError, zipfile.BadZipFile, tarfile.TarError) as e:
+                    yield _ndjson({"error": f"Archive: {e}"})
+                    member = None
+                if member is None:
+                    exhausted = True
+                    break
+                name, path, error = member
+                if error is not None:
+                    yield _ndjson({
+                        "member": name,
+                        "file_type": detect_file_type(os.path.basename(name)),
+                        "error": error,
+                    })
+                    continue
+                pending.add(asyncio.ensure_future(run_in_threadpool(_process_member, name, path)))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for line in task.result():
+                    yield _ndjson(line)
     finally:
+        members.close()
+        os.unlink(archive_path)
+
+
+@router.post("/upload/bulk")
+async def upload_archive(file: UploadFile = File(...)):
+    """Upload une archive ZIP ou tar de fichiers C1B/DDD/V1B.
+
+    Les membres sont décodés et analysés en parallèle (BULK_CONCURRENCY) ;
+    la réponse NDJSON contient une ligne par conducteur (format d'un
+    élément de ``results`` de /upload, avec ``member`` et ``file_type``)
+    ou une ligne ``error`` par membre illisible, dès que chacun se termine.
+    """
+    suffix = os.path.splitext(file.filename or "archive")[1]
+    with span("temp_write"), tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        tmp_path = tmp.name
+
+    if not (zipfile.is_zipfile(tmp_path) or tarfile.is_tarfile(tmp_path)):
         os.unlink(tmp_path)
+        raise HTTPException(status_code=422, detail="Archive ZIP ou tar attendue")
+
+    return StreamingResponse(
+        _bulk_lines(tmp_path, max(1, BULK_CONCURRENCY)), media_type=NDJSON_MEDIA_TYPE
+    )
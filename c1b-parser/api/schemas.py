@@ -0,0 +1,90 @@
+"""Schémas des corps de requête JSON de l'API."""
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, model_validator
+
+from api.wire import timeline_from_columnar
+from models.activity import Activity, ActivityType, DriverActivity
+
+
+class ActivityIn(BaseModel):
+    """Activité au format de sortie de /parse (durée recalculée si absente)."""
+    type: ActivityType
+    start: datetime
+    end: datetime
+    duration_minutes: Optional[int] = None
+    vehicle_registration: Optional[str] = None
+
+    def to_activity(self) -> Activity:
+        duration = self.duration_minutes
+        if duration is None:
+            duration = int((self.end - self.start).total_seconds() / 60)
+        return Activity(
+            type=self.type,
+            start=self.start,
+            end=self.end,
+            duration_minutes=duration,
+            vehicle_registration=self.vehicle_registration,
+        )
+
+
+class TimelineIn(BaseModel):
+    """Timeline d'un conducteur au format d'un élément de ``results`` de /parse."""
+    driver_name: str
+    card_number: str
+    activities: List[ActivityIn]
+
+    def to_driver_activity(self) -> DriverActivity:
+        activities = [a.to_activity() for a in self.activities]
+        activities.sort(key=lambda a: a.start)
+        return DriverActivity(
+            driver_name=self.driver_name,
+            card_number=self.card_number,
+            activities=activities,
+        )
+
+
+class WhatIfRequest(BaseModel):
+    """Historique réel d'un conducteur et plannings candidats à évaluer."""
+    history: TimelineIn
+    candidates: List[List[ActivityIn]]
+    articles: Optional[List[str]] = None
+
+
+class ColumnarTimelineIn(BaseModel):
+    """Timeline d'un conducteur au format colonnes (voir api.wire)."""
+    driver_name: str
+    card_number: str
+    types: List[int]
+    starts: List[int]
+    ends: List[int]
+    durations: List[int]
+    registrations: Optional[List[int]] = None
+    registration_table: List[str] = []
+    type_codes: Optional[List[str]] = None
+
+    def to_driver_activity(self) -> DriverActivity:
+        """Raises ValueError si les colonnes sont incohérentes."""
+        payload = self.model_dump()
+        if self.registrations is None:
+            payload["registrations"] = [-1] * len(self.types)
+        return timeline_from_columnar(payload, self.type_codes)
+
+
+class AnalyzeRequest(BaseModel):
+    """Timeline à analyser sans décodage : format de /parse ou colonnes."""
+    timeline: Optional[TimelineIn] = None
+    columnar: Optional[ColumnarTimelineIn] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+    articles: Optional[List[str]] = None
+    persist: bool = False
+    filename: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _one_timeline(self):
+        if (self.timeline is None) == (self.columnar is None):
+            raise ValueError("Fournir exactement un des champs timeline ou columnar")
+        return self
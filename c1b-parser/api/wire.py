@@ -0,0 +1,146 @@
+"""Format compact (colonnes) des timelines et négociation de contenu.
+
+Forme colonnes d'un conducteur : tableaux parallèles plutôt qu'une liste
+d'objets dont chaque élément répète les clés et deux dates ISO.
+- ``starts`` / ``ends`` : minutes depuis l'epoch Unix (UTC) ;
+- ``types`` : index dans ``type_codes`` (en tête de réponse) ;
+- ``durations`` : minutes ;
+- ``registrations`` : index dans ``registration_table`` (-1 : aucune).
+
+Les données tachygraphiques sont à la minute : le passage en minutes est
+sans perte. Le corps est encodé en JSON ou en MessagePack (si le paquet
+``msgpack`` est installé), puis compressé en brotli (paquet ``brotli``)
+ou gzip selon Accept-Encoding.
+"""
+
+import gzip
+import json
+from datetime import timezone
+from typing import List, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from models.activity import (
+    ACTIVITY_TYPE_CODES,
+    DriverActivity,
+    pack_driver_activity,
+    unpack_driver_activity,
+)
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_JSON = "application/vnd.tacho.columnar+json"
+COLUMNAR_MSGPACK = "application/vnd.tacho.columnar+msgpack"
+TYPE_CODES = [t.value for t in ACTIVITY_TYPE_CODES]
+# En dessous, la compression coûte plus qu'elle ne rapporte
+MIN_COMPRESS_BYTES = 1024
+
+
+def columnar_timeline(driver_activity: DriverActivity) -> dict:
+    """Timeline d'un conducteur sous forme de colonnes."""
+    _, _, _, types, starts, ends, durations, regs, reg_table = pack_driver_activity(driver_activity)
+    return {
+        "driver_name": driver_activity.driver_name,
+        "card_number": driver_activity.card_number,
+        "types": list(types),
+        "starts": [s // 60 for s in starts],
+        "ends": [e // 60 for e in ends],
+        "durations": list(durations),
+        "registrations": list(regs),
+        "registration_table": reg_table,
+    }
+
+
+def timeline_from_columnar(payload: dict, type_codes: Optional[List[str]] = None) -> DriverActivity:
+    """Reconstruit une timeline (UTC) depuis ``columnar_timeline``.
+
+    Raises:
+        ValueError: colonnes de longueurs différentes ou index invalides
+    """
+    codes = [ACTIVITY_TYPE_CODES[TYPE_CODES.index(c)] for c in (type_codes or TYPE_CODES)]
+    columns = [payload[k] for k in ("types", "starts", "ends", "durations", "registrations")]
+    if len({len(c) for c in columns}) > 1:
+        raise ValueError("Colonnes de longueurs différentes")
+    types, starts, ends, durations, regs = columns
+    reg_table = payload.get("registration_table", [])
+    if any(t < 0 or t >= len(codes) for t in types):
+        raise ValueError("Code d'activité inconnu")
+    if any(r >= len(reg_table) for r in regs):
+        raise ValueError("Index d'immatriculation invalide")
+
+    driver_activity = unpack_driver_activity((
+        payload["driver_name"], payload["card_number"], timezone.utc,
+        bytes(ACTIVITY_TYPE_CODES.index(codes[t]) for t in types),
+        [s * 60 for s in starts], [e * 60 for e in ends], durations, regs, reg_table,
+    ))
+    driver_activity.activities.sort(key=lambda a: a.start)
+    return driver_activity
+
+
+def _accepted(header: Optional[str]) -> List[Tuple[str, float]]:
+    """Valeurs d'un en-tête Accept*, triées par préférence (q décroissant)."""
+    items = []
+    for part in (header or "").split(","):
+        value, *params = [p.strip() for p in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            items.append((value.lower(), q))
+    return sorted(items, key=lambda item: -item[1])
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """Type de réponse : colonnes (JSON ou MessagePack) si demandé, JSON sinon."""
+    supported = {COLUMNAR_JSON} | ({COLUMNAR_MSGPACK} if msgpack else set())
+    for value, _ in _accepted(accept):
+        if value in supported:
+            return value
+        if value in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Compression de la réponse : ``br``, ``gzip`` ou None."""
+    accepted = {value for value, _ in _accepted(accept_encoding)}
+    if brotli and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def encoded_response(payload: dict, media_type: str, accept_encoding: Optional[str]) -> Response:
+    """Réponse encodée (JSON / MessagePack) et compressée selon la négociation."""
+    payload = jsonable_encoder(payload)
+    if media_type == COLUMNAR_MSGPACK:
+        body = msgpack.packb(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding == "br":
+        body = brotli.compress(body, quality=5)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=6)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=headers)
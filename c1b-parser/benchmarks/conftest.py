@@ -0,0 +1,102 @@
+"""Infrastructure des benchmarks : échelles, mesure mémoire, seuil de régression.
+
+Variables d'environnement :
+- BENCH_SCALES : nombres de conducteurs à mesurer (défaut "1,100,1000",
+  ajouter 10000 pour l'échelle flotte complète) ;
+- BENCH_WEEKS : semaines d'historique par conducteur (défaut 4) ;
+- BENCH_THRESHOLD : régression tolérée par rapport à la référence (défaut 0.25) ;
+- BENCH_UPDATE_BASELINE=1 : réécrit benchmarks/baseline.json au lieu de comparer.
+
+La référence dépend de la machine : elle n'est pas versionnée et le
+garde-fou ne vaut que localement (voir benchmarks/README.md). Sans
+référence, les mesures sont faites sans comparaison.
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.generators import synthetic_fleet
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+SCALES = [int(s) for s in os.environ.get("BENCH_SCALES", "1,100,1000").split(",") if s.strip()]
+WEEKS = int(os.environ.get("BENCH_WEEKS", "4"))
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+UPDATE_BASELINE = os.environ.get("BENCH_UPDATE_BASELINE") == "1"
+
+_fleets = {}
+_results = {}
+
+
+def fleet_for(n_drivers: int):
+    """Flotte synthétique, générée une seule fois par échelle."""
+    if n_drivers not in _fleets:
+        _fleets[n_drivers] = synthetic_fleet(n_drivers, weeks=WEEKS, seed=n_drivers)
+    return _fleets[n_drivers]
+
+
+@pytest.fixture(params=SCALES, ids=lambda n: f"{n}drivers")
+def fleet(request):
+    return fleet_for(request.param)
+
+
+def _load_baseline() -> dict:
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """Mesure temps (pytest-benchmark) et pic mémoire (tracemalloc) d'une fonction.
+
+    Compare ensuite à la référence enregistrée : échoue si le temps moyen
+    ou le pic mémoire dépasse la référence de plus de BENCH_THRESHOLD.
+    """
+    def run(func, *args, **kwargs):
+        result = benchmark(func, *args, **kwargs)
+
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        _results[request.node.name] = {"mean_seconds": mean, "peak_memory_bytes": peak}
+
+        reference = _load_baseline().get(request.node.name)
+        if reference is None and not UPDATE_BASELINE:
+            warnings.warn(
+                f"Pas de référence pour {request.node.name} dans {BASELINE_PATH.name} : "
+                "mesure sans comparaison"
+            )
+        if reference and not UPDATE_BASELINE:
+            limit = 1 + THRESHOLD
+            if mean > reference["mean_seconds"] * limit:
+                pytest.fail(
+                    f"Régression de temps : {mean:.4f}s contre {reference['mean_seconds']:.4f}s"
+                )
+            if peak > reference["peak_memory_bytes"] * limit:
+                pytest.fail(
+                    f"Régression mémoire : {peak} octets contre {reference['peak_memory_bytes']}"
+                )
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if UPDATE_BASELINE and _results:
+        baseline = _load_baseline()
+        baseline.update(_results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,33 @@
+"""Benchmarks du moteur : règles individuelles et analyse complète."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from engine.infringement_engine import analyze
+from engine.rules.breaks import check_breaks
+from engine.rules.daily_rest import check_daily_rest
+from engine.rules.driving_time import (
+    check_biweekly_driving,
+    check_daily_driving,
+    check_weekly_driving,
+)
+from engine.rules.weekly_rest import check_weekly_rest
+
+RULES = [
+    check_daily_driving,
+    check_weekly_driving,
+    check_biweekly_driving,
+    check_breaks,
+    check_daily_rest,
+    check_weekly_rest,
+]
+
+
+@pytest.mark.parametrize("check", RULES, ids=lambda f: f.__name__)
+def test_rule(measure, fleet, check):
+    measure(lambda: [check(driver) for driver in fleet])
+
+
+def test_analyze(measure, fleet):
+    measure(lambda: [analyze(driver, use_cache=False) for driver in fleet])
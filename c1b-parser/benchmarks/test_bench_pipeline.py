@@ -0,0 +1,46 @@
+"""Benchmarks de la normalisation et de la persistance."""
+
+import random
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from database.db import get_or_create_driver, init_db, save_analysis
+from engine.infringement_engine import analyze
+from parser.json_normalizer import normalize_card_data, normalize_vu_data
+from tests.generators import card_raw_json, synthetic_crew, vu_raw_json
+
+
+def test_normalize_card_data(measure, fleet):
+    raws = [card_raw_json(driver) for driver in fleet]
+    measure(lambda: [normalize_card_data(raw) for raw in raws])
+
+
+def test_normalize_vu_data(measure, fleet):
+    """Fichiers VU en équipage : un par paire de conducteurs de la flotte."""
+    rng = random.Random(len(fleet))
+    raws = [
+        vu_raw_json(*synthetic_crew(rng, cards=(f"A{i}", f"B{i}")))
+        for i in range(max(1, len(fleet) // 2))
+    ]
+    measure(lambda: [normalize_vu_data(raw) for raw in raws])
+
+
+def test_save_analysis(measure, fleet, tmp_path):
+    db_path = str(tmp_path / "bench.db")
+    init_db(db_path)
+    analyses = [(driver, analyze(driver)) for driver in fleet]
+
+    def save_all():
+        conn = sqlite3.connect(db_path)
+        try:
+            for driver, infringements in analyses:
+                driver_id = get_or_create_driver(conn, driver.driver_name, driver.card_number)
+                save_analysis(conn, driver_id, "bench.ddd", "card", infringements)
+            conn.commit()
+        finally:
+            conn.close()
+
+    measure(save_all)
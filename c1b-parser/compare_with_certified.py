@@ -6,6 +6,17 @@ Usage:
         --certified-file certified.csv \
         --tolerance 0.05  # 5% d'écart max
 
+Mode lot (plusieurs centaines de conducteurs) :
+    python compare_with_certified.py \
+        --our-dir results/ \
+        --certified-dir certified/ \
+        --workers 8 \
+        --report discrepancies.json
+
+    Les fichiers JSON de nos résultats et les CSV certifiés sont appariés
+    par numéro de carte, comparés en parallèle, et un rapport JSON unique
+    (écarts par conducteur + statistiques agrégées) est produit.
+
 Format CSV attendu (outil certifié) :
     date,conducteur,carte,conduite_h,repos_h,infractions
     2025-09-26,NIGI,1000000650871003,9.2,14.4,"Art. 6.1"
@@ -14,7 +25,10 @@ Format CSV attendu (outil certifié) :
 import argparse
 import csv
 import json
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
 
@@ -27,6 +41,16 @@ def load_our_results(file_path):
         return json.load(f)
 
 
+def _parse_certified_row(row):
+    return {
+        'conducteur': row['conducteur'],
+        'carte': row['carte'],
+        'conduite_h': float(row['conduite_h']),
+        'repos_h': float(row.get('repos_h') or 0),
+        'infractions': row.get('infractions', '').split(',') if row.get('infractions') else [],
+    }
+
+
 def load_certified_csv(file_path):
     """Charge les résultats de l'outil certifié (CSV)."""
     results = {}
@@ -34,36 +58,63 @@ def load_certified_csv(file_path):
         reader = csv.DictReader(f)
         for row in reader:
             day = datetime.strptime(row['date'], '%Y-%m-%d').date()
-            results[day] = {
-                'conducteur': row['conducteur'],
-                'carte': row['carte'],
-                'conduite_h': float(row['conduite_h']),
-                'repos_h': float(row.get('repos_h', 0)),
-                'infractions': row.get('infractions', '').split(',') if row.get('infractions') else [],
-            }
+            results[day] = _parse_certified_row(row)
     return results
 
 
-def compare_results(our_results, certified_results, tolerance=0.05):
-    """Compare les deux jeux de résultats."""
-    print("=" * 80)
-    print("COMPARAISON AVEC OUTIL CERTIFIÉ")
-    print("=" * 80)
+def load_certified_dir(directory):
+    """Charge tous les CSV certifiés d'un répertoire, regroupés par carte.
+
+    Returns:
+        {carte: {date ISO: ligne}} — un CSV peut contenir plusieurs conducteurs
+    """
+    by_card = {}
+    for path in sorted(Path(directory).glob('*.csv')):
+        with open(path) as f:
+            for row in csv.DictReader(f):
+                by_card.setdefault(row['carte'], {})[row['date']] = _parse_certified_row(row)
+    return by_card
 
-    discrepancies = []
+
+def load_our_dir(directory):
+    """Charge tous nos fichiers JSON de résultats, regroupés par carte.
+
+    La carte d'un fichier est celle de ses jours ; à défaut, le nom du fichier.
+    """
+    by_card = {}
+    for path in sorted(Path(directory).glob('*.json')):
+        results = load_our_results(path)
+        cards = {day.get('carte') for day in results.values() if day.get('carte')}
+        for card in cards or {path.stem}:
+            days = {d: v for d, v in results.items() if v.get('carte', card) == card}
+            by_card.setdefault(card, {}).update(days)
+    return by_card
+
+
+def find_discrepancies(our_results, certified_results, tolerance=0.05):
+    """Aligne les jours des deux jeux de résultats et liste les écarts.
+
+    L'alignement est une jointure sur les clés (date ISO) : les jours
+    absents de nos résultats sont une différence d'ensembles, les jours
+    communs sont comparés sans parcourir le calendrier.
+
+    Returns:
+        (écarts, jours concordants, erreurs absolues de conduite en heures)
+    """
+    certified_by_key = {str(day): row for day, row in certified_results.items()}
+    missing = certified_by_key.keys() - our_results.keys()
+    common = certified_by_key.keys() & our_results.keys()
+
+    discrepancies = [
+        {'date': day, 'type': 'MISSING', 'message': "Jour manquant dans nos résultats"}
+        for day in sorted(missing)
+    ]
     matches = 0
-    total_days = len(certified_results)
+    driving_errors = []
 
-    for day, certified in certified_results.items():
-        # Trouver le jour correspondant dans nos résultats
-        our_day = our_results.get(str(day))
-        if not our_day:
-            discrepancies.append({
-                'date': day,
-                'type': 'MISSING',
-                'message': f"Jour manquant dans nos résultats",
-            })
-            continue
+    for day in sorted(common):
+        certified = certified_by_key[day]
+        our_day = our_results[day]
 
         # Comparer nom conducteur
         if our_day.get('conducteur') != certified['conducteur']:
@@ -88,6 +139,7 @@ def compare_results(our_results, certified_results, tolerance=0.05):
         certified_driving = certified['conduite_h']
         diff = abs(our_driving - certified_driving)
         rel_diff = diff / certified_driving if certified_driving > 0 else 0
+        driving_errors.append(diff)
 
         if rel_diff > tolerance:
             discrepancies.append({
@@ -101,6 +153,18 @@ def compare_results(our_results, certified_results, tolerance=0.05):
         else:
             matches += 1
 
+    return discrepancies, matches, driving_errors
+
+
+def compare_results(our_results, certified_results, tolerance=0.05):
+    """Compare les deux jeux de résultats."""
+    print("=" * 80)
+    print("COMPARAISON AVEC OUTIL CERTIFIÉ")
+    print("=" * 80)
+
+    discrepancies, matches, _ = find_discrepancies(our_results, certified_results, tolerance)
+    total_days = len(certified_results)
+
     # Afficher résultats
     print(f"\n📊 RÉSULTATS:")
     print(f"   Total jours testés: {total_days}")
@@ -146,14 +210,111 @@ def compare_results(our_results, certified_results, tolerance=0.05):
     return len(discrepancies) == 0
 
 
+def compare_driver(card, our_results, certified_results, tolerance=0.05):
+    """Compare un conducteur (exécuté dans un processus du pool)."""
+    discrepancies, matches, driving_errors = find_discrepancies(
+        our_results, certified_results, tolerance
+    )
+    return {
+        'carte': card,
+        'days': len(certified_results),
+        'matching_days': matches,
+        'discrepancies': discrepancies,
+        'driving_abs_error_sum_h': sum(driving_errors),
+        'driving_max_error_h': max(driving_errors, default=0.0),
+        'compared_days': len(driving_errors),
+    }
+
+
+def compare_batch(our_dir, certified_dir, tolerance=0.05, workers=None):
+    """Compare en parallèle tous les conducteurs présents des deux côtés.
+
+    Returns:
+        Rapport JSON-sérialisable : écarts par conducteur et statistiques agrégées
+    """
+    ours = load_our_dir(our_dir)
+    certified = load_certified_dir(certified_dir)
+    cards = sorted(ours.keys() & certified.keys())
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        per_driver = list(pool.map(
+            compare_driver,
+            cards,
+            (ours[c] for c in cards),
+            (certified[c] for c in cards),
+            [tolerance] * len(cards),
+            chunksize=max(1, len(cards) // (4 * (workers or os.cpu_count() or 1))),
+        ))
+
+    total_days = sum(d['days'] for d in per_driver)
+    matching_days = sum(d['matching_days'] for d in per_driver)
+    compared_days = sum(d['compared_days'] for d in per_driver)
+    by_type = Counter(disc['type'] for d in per_driver for disc in d['discrepancies'])
+    return {
+        'tolerance': tolerance,
+        'summary': {
+            'drivers': len(per_driver),
+            'days': total_days,
+            'matching_days': matching_days,
+            'accuracy': matching_days / total_days if total_days else None,
+            'discrepancies': sum(by_type.values()),
+            'discrepancies_by_type': dict(by_type),
+            'drivers_without_discrepancy': sum(1 for d in per_driver if not d['discrepancies']),
+            'driving_mean_abs_error_h': (
+                sum(d['driving_abs_error_sum_h'] for d in per_driver) / compared_days
+                if compared_days else None
+            ),
+            'driving_max_error_h': max((d['driving_max_error_h'] for d in per_driver), default=0.0),
+        },
+        'unpaired': {
+            'ours': sorted(ours.keys() - certified.keys()),
+            'certified': sorted(certified.keys() - ours.keys()),
+        },
+        'drivers': per_driver,
+    }
+
+
+def main_batch(args):
+    for directory in (args.our_dir, args.certified_dir):
+        if not Path(directory).is_dir():
+            print(f"❌ Répertoire introuvable: {directory}")
+            sys.exit(1)
+
+    report = compare_batch(args.our_dir, args.certified_dir, args.tolerance, args.workers)
+    output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.report:
+        Path(args.report).write_text(output + "\n")
+        summary = report['summary']
+        accuracy = summary['accuracy']
+        print(f"{summary['drivers']} conducteurs, {summary['days']} jours, "
+              f"{summary['discrepancies']} écarts"
+              + (f", concordance {accuracy:.1%}" if accuracy is not None else ""))
+        print(f"Rapport: {args.report}")
+    else:
+        print(output)
+    sys.exit(0 if report['summary']['discrepancies'] == 0 else 1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Compare avec outil certifié")
-    parser.add_argument('--our-file', required=True, help="Fichier JSON de nos résultats")
-    parser.add_argument('--certified-file', required=True, help="Fichier CSV de l'outil certifié")
-    parser.add_argument('--tolerance', type=float, default=0.05, help="Tolérance d'écart (défaut: 5%)")
+    parser.add_argument('--our-file', help="Fichier JSON de nos résultats")
+    parser.add_argument('--certified-file', help="Fichier CSV de l'outil certifié")
+    parser.add_argument('--our-dir', help="Répertoire de nos résultats JSON (mode lot)")
+    parser.add_argument('--certified-dir', help="Répertoire des CSV certifiés (mode lot)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processus de comparaison en mode lot (défaut: nombre de CPU)")
+    parser.add_argument('--report', help="Rapport JSON des écarts en mode lot (défaut: sortie standard)")
+    parser.add_argument('--tolerance', type=float, default=0.05, help="Tolérance d'écart (défaut: 5%%)")
 
     args = parser.parse_args()
 
+    if args.our_dir or args.certified_dir:
+        if not (args.our_dir and args.certified_dir):
+            parser.error("--our-dir et --certified-dir vont ensemble")
+        main_batch(args)
+    if not (args.our_file and args.certified_file):
+        parser.error("--our-file et --certified-file sont requis (ou --our-dir / --certified-dir)")
+
     if not Path(args.our_file).exists():
         print(f"❌ Fichier introuvable: {args.our_file}")
         sys.exit(1)
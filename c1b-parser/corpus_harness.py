@@ -0,0 +1,242 @@
+"""Harnais de non-régression sur un corpus de fichiers réels.
+
+Chaque fichier C1B/DDD/V1B du répertoire de corpus passe par toute la
+chaîne : décodage (dddparser), normalisation, analyse et enregistrement
+en base (SQLite temporaire). Pour chaque étape, on mesure la latence et
+le pic de mémoire résidente (RSS) ; les résultats sont comparés à une
+référence JSON, et les écarts (latence, mémoire, nombre d'infractions)
+sont signalés.
+
+Usage :
+    PYTHONPATH=. python3 corpus_harness.py                   # compare à la référence
+    PYTHONPATH=. python3 corpus_harness.py --update-baseline # enregistre la référence
+    PYTHONPATH=. python3 corpus_harness.py --day 2025-09-26  # détail d'un jour
+
+Fonctionne hors ligne ; sans binaire dddparser, le corpus est ignoré.
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database.db import get_connection, get_or_create_driver, init_db, save_analysis
+from engine.infringement_engine import analyze
+from models.activity import ActivityType
+from parser.json_normalizer import normalize_card_data, normalize_vu_data
+from parser.tacho_parser import DEFAULT_BINARY_PATH, detect_file_type, parse_file
+
+CORPUS_DIR = Path(__file__).parent / "tests" / "corpus"
+BASELINE_PATH = CORPUS_DIR / "baseline.json"
+CORPUS_EXTENSIONS = {".c1b", ".ddd", ".v1b"}
+STAGES = ("decode", "normalize", "analyze", "persist")
+DEFAULT_THRESHOLD = 0.25
+# En dessous de ce seuil, un écart de latence relève du bruit de mesure
+MIN_LATENCY_DELTA = 0.005
+
+
+def decoder_available(binary_path: Optional[str] = None) -> bool:
+    return Path(binary_path or DEFAULT_BINARY_PATH).is_file()
+
+
+def corpus_files(directory: Path = CORPUS_DIR) -> List[Path]:
+    """Fichiers tachygraphiques du corpus, triés par nom."""
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in CORPUS_EXTENSIONS)
+
+
+def _peak_rss_kb(who: int = resource.RUSAGE_SELF) -> int:
+    """Pic de RSS (Ko sous Linux) du processus ou de ses enfants."""
+    return resource.getrusage(who).ru_maxrss
+
+
+def run_file(path: Path, db_path: str) -> dict:
+    """Fait passer un fichier par toute la chaîne et mesure chaque étape.
+
+    Le pic de RSS du décodage est celui du sous-processus dddparser ; celui
+    des autres étapes est le pic du processus Python, cumulatif d'une étape
+    à l'autre (d'où l'exécution de chaque fichier dans un processus neuf).
+    """
+    stages: Dict[str, dict] = {}
+    file_type = detect_file_type(str(path))
+
+    started = time.perf_counter()
+    raw_json = parse_file(str(path), file_type=file_type)
+    stages["decode"] = {
+        "seconds": time.perf_counter() - started,
+        "peak_rss_kb": _peak_rss_kb(resource.RUSAGE_CHILDREN),
+    }
+
+    started = time.perf_counter()
+    if file_type == "card":
+        drivers = [normalize_card_data(raw_json)]
+    else:
+        drivers = normalize_vu_data(raw_json)
+    stages["normalize"] = {"seconds": time.perf_counter() - started, "peak_rss_kb": _peak_rss_kb()}
+
+    started = time.perf_counter()
+    analyses = [(driver, analyze(driver, use_cache=False)) for driver in drivers]
+    stages["analyze"] = {"seconds": time.perf_counter() - started, "peak_rss_kb": _peak_rss_kb()}
+
+    started = time.perf_counter()
+    with get_connection(db_path) as conn:
+        for driver, infringements in analyses:
+            driver_id = get_or_create_driver(conn, driver.driver_name, driver.card_number)
+            save_analysis(conn, driver_id, path.name, file_type, infringements)
+    stages["persist"] = {"seconds": time.perf_counter() - started, "peak_rss_kb": _peak_rss_kb()}
+
+    by_article = Counter(inf.article for _, infs in analyses for inf in infs)
+    return {
+        "file_type": file_type,
+        "drivers": len(drivers),
+        "activities": sum(len(d.activities) for d in drivers),
+        "infringements": sum(by_article.values()),
+        "by_article": dict(sorted(by_article.items())),
+        "stages": stages,
+    }
+
+
+def _run_isolated(path: Path) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "corpus.db")
+        init_db(db_path)
+        return run_file(path, db_path)
+
+
+def run_corpus(files: List[Path]) -> Dict[str, dict]:
+    """Exécute chaque fichier dans un processus neuf (pics de RSS indépendants)."""
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=1, maxtasksperchild=1) as pool:
+        for path, result in zip(files, pool.map(_run_isolated, files, chunksize=1)):
+            results[path.name] = result
+    return results
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """Liste des régressions par rapport à la référence."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["by_article"] != reference["by_article"]:
+            regressions.append(
+                f"{name} : infractions {reference['by_article']} -> {result['by_article']}"
+            )
+        for stage in STAGES:
+            now, before = result["stages"][stage], reference["stages"].get(stage)
+            if before is None:
+                continue
+            if (now["seconds"] > before["seconds"] * (1 + threshold)
+                    and now["seconds"] - before["seconds"] > MIN_LATENCY_DELTA):
+                regressions.append(
+                    f"{name} / {stage} : {now['seconds'] * 1000:.1f} ms "
+                    f"(référence {before['seconds'] * 1000:.1f} ms)"
+                )
+            if now["peak_rss_kb"] > before["peak_rss_kb"] * (1 + threshold):
+                regressions.append(
+                    f"{name} / {stage} : pic RSS {now['peak_rss_kb']} Ko "
+                    f"(référence {before['peak_rss_kb']} Ko)"
+                )
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, dict]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baseline(results: Dict[str, dict], path: Path = BASELINE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def print_day(path: Path, day: date) -> None:
+    """Détail d'un jour : totaux calculés à la main et infractions du moteur."""
+    file_type = detect_file_type(str(path))
+    raw_json = parse_file(str(path), file_type=file_type)
+    drivers = [normalize_card_data(raw_json)] if file_type == "card" else normalize_vu_data(raw_json)
+
+    for driver in drivers:
+        tz = driver.activities[0].start.tzinfo if driver.activities else None
+        day_start = datetime.combine(day, dt_time.min, tzinfo=tz)
+        day_end = day_start + timedelta(days=1)
+        totals = Counter()
+        longest_rest = 0.0
+        for act in driver.activities_between(day_start, day_end):
+            minutes = (min(act.end, day_end) - max(act.start, day_start)).total_seconds() / 60
+            totals[act.type] += minutes
+            if act.type == ActivityType.REST:
+                longest_rest = max(longest_rest, minutes)
+
+        print(f"\n{path.name} — {driver.driver_name} ({driver.card_number}) — {day}")
+        print(f"  Conduite : {totals[ActivityType.DRIVING] / 60:.1f}h")
+        print(f"  Travail  : {totals[ActivityType.WORK] / 60:.1f}h")
+        print(f"  Repos    : {totals[ActivityType.REST] / 60:.1f}h (plus long : {longest_rest / 60:.1f}h)")
+        day_infringements = [inf for inf in analyze(driver) if inf.date == day]
+        for inf in day_infringements:
+            print(f"  • {inf.article} ({inf.severity.value}) {inf.rule_description} : "
+                  f"{inf.value}h / limite {inf.limit}h")
+        if not day_infringements:
+            print("  Aucune infraction détectée ce jour")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="Répertoire des fichiers")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Référence JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression tolérée (0.25 = +25 %%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Enregistre les mesures comme nouvelle référence")
+    parser.add_argument("--day", type=date.fromisoformat,
+                        help="Affiche le détail d'un jour (AAAA-MM-JJ) pour chaque fichier")
+    args = parser.parse_args(argv)
+
+    if not decoder_available():
+        print(f"Binaire dddparser absent ({DEFAULT_BINARY_PATH}) : corpus ignoré.")
+        return 0
+    files = corpus_files(args.corpus)
+    if not files:
+        print(f"Aucun fichier dans {args.corpus} : corpus ignoré.")
+        return 0
+
+    if args.day:
+        for path in files:
+            print_day(path, args.day)
+        return 0
+
+    results = run_corpus(files)
+    for name, result in results.items():
+        latencies = "  ".join(
+            f"{stage} {result['stages'][stage]['seconds'] * 1000:7.1f} ms" for stage in STAGES
+        )
+        print(f"{name:40} {result['activities']:6} act. {result['infringements']:4} inf.  {latencies}")
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+    for line in regressions:
+        print(f"RÉGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,19 @@
 """Couche base de données SQLite pour stocker les résultats d'analyse."""
 
 import sqlite3
+import threading
 from contextlib import contextmanager
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from models.compliance import ComplianceState
 from models.infringement import Infringement, Severity
+from observability.tracing import TracedConnection
 
 DB_PATH = Path(__file__).parent.parent / "data" / "tachograph.db"
+# Articles dont l'infraction porte sur un jour ou une semaine calendaire
+CALENDAR_ARTICLES = ("Art. 6.1", "Art. 6.2", "Art. 6.3")
 
 
 def init_db(db_path: Optional[str] = None) -> None:
@@ -34,10 +39,28 @@ def init_db(db_path: Optional[str] = None) -> None:
             file_type TEXT NOT NULL,
             analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             total_infringements INTEGER DEFAULT 0,
+            content_hash TEXT,
+            total_activities INTEGER DEFAULT 0,
+            period_start DATE,
+            period_end DATE,
             FOREIGN KEY (driver_id) REFERENCES drivers(id)
         )
     """)
 
+    # Migration des bases créées avant l'ajout de content_hash
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(analyses)")}
+    if "content_hash" not in columns:
+        cursor.execute("ALTER TABLE analyses ADD COLUMN content_hash TEXT")
+    # ... et avant celui de la période couverte par le fichier
+    for column in ("total_activities INTEGER DEFAULT 0", "period_start DATE", "period_end DATE"):
+        if column.split()[0] not in columns:
+            cursor.execute(f"ALTER TABLE analyses ADD COLUMN {column}")
+    # Un fichier (SHA-256) n'est analysé qu'une fois par conducteur
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_analyses_content
+        ON analyses (content_hash, driver_id)
+    """)
+
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS infringements (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,39 +79,176 @@ def init_db(db_path: Optional[str] = None) -> None:
         )
     """)
 
+    # Clé d'événement : début de la période en infraction (ou date pour les
+    # règles calendaires), voir _event_key
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(infringements)")}
+    if "event_key" not in columns:
+        cursor.execute("ALTER TABLE infringements ADD COLUMN event_key TEXT NOT NULL DEFAULT ''")
+
+    # Clé naturelle : une infraction n'est comptée qu'une fois, quel que soit
+    # le nombre de téléchargements (chevauchants) qui la contiennent
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_infringements_event'"
+    )
+    if cursor.fetchone() is None:
+        cursor.execute("DROP INDEX IF EXISTS idx_infringements_natural")
+        cursor.execute("DROP INDEX IF EXISTS idx_infringements_key")
+        # Lignes antérieures sans début de période : date (règles calendaires),
+        # sinon date et rang le même jour dans leur analyse
+        cursor.execute(f"""
+            UPDATE infringements SET event_key = CASE
+                WHEN article IN ({", ".join("?" * len(CALENDAR_ARTICLES))}) THEN infringement_date
+                ELSE infringement_date || '#' || (
+                    SELECT COUNT(*) FROM infringements o
+                    WHERE o.analysis_id = infringements.analysis_id
+                      AND o.driver_id = infringements.driver_id
+                      AND o.article = infringements.article
+                      AND o.infringement_date = infringements.infringement_date
+                      AND o.rule_description = infringements.rule_description
+                      AND o.id < infringements.id
+                )
+            END
+            WHERE event_key = ''
+        """, CALENDAR_ARTICLES)
+        cursor.execute("""
+            DELETE FROM infringements WHERE id NOT IN (
+                SELECT MAX(id) FROM infringements
+                GROUP BY driver_id, article, rule_description, event_key
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX idx_infringements_event
+            ON infringements (driver_id, article, rule_description, event_key)
+        """)
+        _refresh_totals(cursor)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS compliance_state (
+            driver_id INTEGER PRIMARY KEY,
+            state TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (driver_id) REFERENCES drivers(id)
+        )
+    """)
+
     conn.commit()
     conn.close()
 
 
+# Réglages appliqués une fois par connexion :
+# - WAL : les lectures ne bloquent plus l'écriture (uploads concurrents) ;
+# - synchronous=NORMAL : sûr en WAL, sans fsync à chaque commit ;
+# - busy_timeout : un écrivain attend le verrou au lieu d'échouer
+#   (« database is locked ») ;
+# - mmap_size / cache_size (Kio si négatif) : lectures servies en mémoire.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", "5000"),
+    ("mmap_size", str(256 * 1024 * 1024)),
+    ("cache_size", str(-64 * 1024)),
+)
+
+
+class _ConnectionPool:
+    """Une connexion configurée par thread et par base, réutilisée.
+
+    Les connexions ne changent pas de thread ; ``close_all`` (arrêt de
+    l'application) les ferme toutes, d'où ``check_same_thread=False``.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[sqlite3.Connection] = []
+
+    def acquire(self, path: str) -> Tuple[sqlite3.Connection, Dict[str, int]]:
+        """Connexion du thread courant pour ``path`` et son compteur d'imbrication."""
+        pool = getattr(self._local, "connections", None)
+        if pool is None:
+            pool = self._local.connections = {}
+        if path not in pool:
+            conn = sqlite3.connect(path, factory=TracedConnection, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for name, value in PRAGMAS:
+                conn.execute(f"PRAGMA {name} = {value}")
+            with self._lock:
+                self._all.append(conn)
+            pool[path] = (conn, {"depth": 0})
+        return pool[path]
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_pool = _ConnectionPool()
+
+
 @contextmanager
 def get_connection(db_path: Optional[str] = None):
-    """Context manager pour obtenir une connexion SQLite."""
+    """Context manager pour obtenir une connexion SQLite.
+
+    La connexion est celle du thread courant (pool) ; la transaction est
+    validée (ou annulée) à la sortie du bloc le plus externe, un bloc
+    imbriqué partageant la transaction de son appelant.
+    """
     path = db_path or str(DB_PATH)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
+    conn, usage = _pool.acquire(path)
+    usage["depth"] += 1
     try:
         yield conn
-        conn.commit()
+        if usage["depth"] == 1:
+            conn.commit()
     except Exception:
-        conn.rollback()
+        if usage["depth"] == 1:
+            conn.rollback()
         raise
     finally:
-        conn.close()
+        usage["depth"] -= 1
+
+
+def close_connections() -> None:
+    """Ferme toutes les connexions du pool (arrêt de l'application)."""
+    _pool.close_all()
 
 
 def get_or_create_driver(conn: sqlite3.Connection, driver_name: str, card_number: str) -> int:
-    """Retourne l'ID du conducteur, le crée si nécessaire."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM drivers WHERE card_number = ?", (card_number,))
-    row = cursor.fetchone()
-    if row:
-        return row[0]
+    """Retourne l'ID du conducteur, le crée si nécessaire.
 
+    Sans erreur si un autre traitement concurrent crée le même conducteur.
+    """
+    cursor = conn.cursor()
     cursor.execute(
-        "INSERT INTO drivers (driver_name, card_number) VALUES (?, ?)",
+        "INSERT INTO drivers (driver_name, card_number) VALUES (?, ?) "
+        "ON CONFLICT (card_number) DO NOTHING",
         (driver_name, card_number),
     )
-    return cursor.lastrowid
+    cursor.execute("SELECT id FROM drivers WHERE card_number = ?", (card_number,))
+    return cursor.fetchone()[0]
+
+
+def _event_key(inf: Infringement) -> str:
+    """Identifie l'événement d'une infraction d'un téléchargement à l'autre."""
+    return (inf.period_start or inf.date).isoformat()
+
+
+def _refresh_totals(cursor: sqlite3.Cursor, driver_id: Optional[int] = None) -> None:
+    """Recalcule total_infringements d'après les infractions rattachées à chaque analyse."""
+    scope = "" if driver_id is None else "WHERE driver_id = :driver_id"
+    cursor.execute(f"""
+        WITH counts AS (
+            SELECT analysis_id, COUNT(*) AS total FROM infringements {scope}
+            GROUP BY analysis_id
+        )
+        UPDATE analyses SET total_infringements = COALESCE(
+            (SELECT total FROM counts WHERE counts.analysis_id = analyses.id), 0
+        )
+        {scope}
+    """, {"driver_id": driver_id})
 
 
 def save_analysis(
@@ -97,31 +257,166 @@ def save_analysis(
     filename: str,
     file_type: str,
     infringements: List[Infringement],
+    content_hash: Optional[str] = None,
+    total_activities: int = 0,
+    period: Optional[Tuple[date, date]] = None,
 ) -> int:
-    """Sauvegarde une analyse et ses infractions."""
+    """Sauvegarde une analyse et ses infractions.
+
+    Si ``content_hash`` est déjà enregistré pour ce conducteur, l'analyse
+    existante est remplacée (même ID) au lieu d'être dupliquée.
+    ``total_activities`` et ``period`` (premier et dernier jour d'activité
+    du fichier) permettent de redonner le résultat d'un fichier déjà
+    analysé (voir get_analysis_infringements).
+
+    Les infractions sont fusionnées sur leur clé naturelle (conducteur,
+    article, règle, début de la période en infraction) : une infraction
+    déjà connue (téléchargement précédent chevauchant) est rattachée à
+    cette analyse et mise à jour, et le total des analyses concernées est
+    recalculé.
+    """
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO analyses (driver_id, filename, file_type, total_infringements) VALUES (?, ?, ?, ?)",
-        (driver_id, filename, file_type, len(infringements)),
-    )
-    analysis_id = cursor.lastrowid
+    period_start, period_end = (d.isoformat() for d in period) if period else (None, None)
+    if content_hash is None:
+        cursor.execute(
+            """INSERT INTO analyses
+               (driver_id, filename, file_type, total_infringements,
+                total_activities, period_start, period_end)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (driver_id, filename, file_type, len(infringements),
+             total_activities, period_start, period_end),
+        )
+        analysis_id = cursor.lastrowid
+    else:
+        cursor.execute(
+            """INSERT INTO analyses
+               (driver_id, filename, file_type, total_infringements, content_hash,
+                total_activities, period_start, period_end)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (content_hash, driver_id) DO UPDATE SET
+                   filename = excluded.filename,
+                   file_type = excluded.file_type,
+                   total_infringements = excluded.total_infringements,
+                   total_activities = excluded.total_activities,
+                   period_start = excluded.period_start,
+                   period_end = excluded.period_end,
+                   analyzed_at = CURRENT_TIMESTAMP""",
+            (driver_id, filename, file_type, len(infringements), content_hash,
+             total_activities, period_start, period_end),
+        )
+        cursor.execute(
+            "SELECT id FROM analyses WHERE content_hash = ? AND driver_id = ?",
+            (content_hash, driver_id),
+        )
+        analysis_id = cursor.fetchone()[0]
+        cursor.execute("DELETE FROM infringements WHERE analysis_id = ?", (analysis_id,))
 
     for inf in infringements:
         cursor.execute(
             """INSERT INTO infringements
                (analysis_id, driver_id, article, rule_description, severity,
-                value, limit_value, excess, infringement_date, details)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                value, limit_value, excess, infringement_date, details, event_key)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (driver_id, article, rule_description, event_key)
+               DO UPDATE SET
+                   analysis_id = excluded.analysis_id,
+                   severity = excluded.severity,
+                   value = excluded.value,
+                   limit_value = excluded.limit_value,
+                   excess = excluded.excess,
+                   infringement_date = excluded.infringement_date,
+                   details = excluded.details""",
             (
                 analysis_id, driver_id, inf.article, inf.rule_description,
                 inf.severity.value, inf.value, inf.limit, inf.excess,
-                inf.date.isoformat(), inf.details,
+                inf.date.isoformat(), inf.details, _event_key(inf),
             ),
         )
 
+    # Les infractions reprises à des analyses précédentes en changent le total
+    _refresh_totals(cursor, driver_id)
+
     return analysis_id
 
 
+def get_analyses_by_hash(conn: sqlite3.Connection, content_hash: str) -> List[dict]:
+    """Analyses déjà enregistrées pour un contenu de fichier (une par conducteur)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT a.id AS analysis_id, a.driver_id, a.filename, a.file_type,
+                  a.analyzed_at, a.total_infringements, a.total_activities,
+                  a.period_start, a.period_end, d.driver_name, d.card_number
+           FROM analyses a
+           JOIN drivers d ON a.driver_id = d.id
+           WHERE a.content_hash = ?
+           ORDER BY a.id""",
+        (content_hash,),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def _to_infringement(row: sqlite3.Row) -> Infringement:
+    key = row["event_key"]
+    return Infringement(
+        article=row["article"],
+        rule_description=row["rule_description"],
+        severity=Severity(row["severity"]),
+        value=row["value"],
+        limit=row["limit_value"],
+        excess=row["excess"],
+        date=date.fromisoformat(row["infringement_date"]),
+        driver_name=row["driver_name"],
+        card_number=row["card_number"],
+        details=row["details"],
+        # Clé horodatée : début de la période (voir _event_key)
+        period_start=datetime.fromisoformat(key) if "T" in key else None,
+    )
+
+
+def get_analysis_infringements(conn: sqlite3.Connection, analysis: dict) -> List[Infringement]:
+    """Infractions d'un fichier déjà analysé (ligne de get_analyses_by_hash).
+
+    Les infractions d'un fichier peuvent avoir été rattachées depuis à un
+    téléchargement plus récent qui les contient aussi : on reprend donc
+    celles du conducteur sur la période couverte par le fichier (à défaut,
+    celles encore rattachées à l'analyse).
+    """
+    if analysis["period_start"] is None:
+        scope, params = "i.analysis_id = ?", (analysis["analysis_id"],)
+    else:
+        scope = "i.driver_id = ? AND i.infringement_date BETWEEN ? AND ?"
+        params = (analysis["driver_id"], analysis["period_start"], analysis["period_end"])
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""SELECT i.*, d.driver_name, d.card_number
+            FROM infringements i
+            JOIN drivers d ON i.driver_id = d.id
+            WHERE {scope}
+            ORDER BY i.infringement_date, i.id""",
+        params,
+    )
+    return [_to_infringement(row) for row in cursor.fetchall()]
+
+
+def get_compliance_state(conn: sqlite3.Connection, driver_id: int) -> Optional[ComplianceState]:
+    """Récupère l'état de conformité courant d'un conducteur."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT state FROM compliance_state WHERE driver_id = ?", (driver_id,))
+    row = cursor.fetchone()
+    return ComplianceState.model_validate_json(row[0]) if row else None
+
+
+def save_compliance_state(conn: sqlite3.Connection, driver_id: int, state: ComplianceState) -> None:
+    """Enregistre (ou remplace) l'état de conformité d'un conducteur."""
+    conn.execute(
+        """INSERT INTO compliance_state (driver_id, state, updated_at)
+           VALUES (?, ?, CURRENT_TIMESTAMP)
+           ON CONFLICT(driver_id) DO UPDATE SET
+               state = excluded.state, updated_at = excluded.updated_at""",
+        (driver_id, state.model_dump_json()),
+    )
+
+
 def get_infringements_by_driver(conn: sqlite3.Connection, driver_id: int) -> List[dict]:
     """Récupère toutes les infractions d'un conducteur."""
     cursor = conn.cursor()
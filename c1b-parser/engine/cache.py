@@ -0,0 +1,118 @@
+"""Cache des résultats d'analyse.
+
+La clé combine une empreinte de la timeline canonique du conducteur et
+une version du moteur (sources des règles + seuils de gravité). Toute
+modification du code des règles ou de SEVERITY_THRESHOLDS change la
+version, ce qui rend les entrées existantes inaccessibles.
+
+La version est calculée à la création du cache et recalculée par
+invalidate() (après un rechargement des règles ou une modification des
+seuils). L'empreinte de la timeline est recalculée à chaque accès : les
+activités sont mutables, une empreinte mémorisée par objet deviendrait
+fausse après une modification en place.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from engine import severity
+from models.activity import DriverActivity, pack_driver_activity
+from models.infringement import Infringement
+
+ENGINE_DIR = Path(__file__).parent
+DEFAULT_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_SIZE", "256"))
+
+
+def _source_digest() -> str:
+    """Empreinte des fichiers source du moteur (règles, gravité, orchestrateur)."""
+    digest = hashlib.blake2b(digest_size=16)
+    paths = sorted(ENGINE_DIR.glob("*.py")) + sorted((ENGINE_DIR / "rules").glob("*.py"))
+    for path in paths:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def timeline_fingerprint(driver: DriverActivity) -> str:
+    """Empreinte stable de la timeline (identité conducteur + activités)."""
+    name, card, tz, types, starts, ends, durations, regs, reg_table = pack_driver_activity(driver)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{name}\x00{card}\x00{tz}\x00".encode())
+    digest.update(types)
+    digest.update(starts.tobytes())
+    digest.update(ends.tobytes())
+    digest.update(durations.tobytes())
+    digest.update(regs.tobytes())
+    digest.update("\x00".join(reg_table).encode())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Cache LRU borné des infractions par (empreinte timeline, version moteur)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[Infringement]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.engine_version = self._engine_version(_source_digest())
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _engine_version(source_digest: str) -> str:
+        """Version du moteur (sources + seuils de gravité)."""
+        thresholds = repr((
+            sorted(severity.SEVERITY_THRESHOLDS.items()),
+            severity.BREAK_SEVERITY_THRESHOLDS,
+        ))
+        return hashlib.blake2b(
+            f"{source_digest}|{thresholds}".encode(), digest_size=8
+        ).hexdigest()
+
+    def key_for(self, driver: DriverActivity, *extra) -> str:
+        """Clé de cache ; ``extra`` distingue les variantes d'analyse (None = défaut)."""
+        key = f"{self.engine_version}:{timeline_fingerprint(driver)}"
+        if any(e is not None for e in extra):
+            key += ":" + repr(extra)
+        return key
+
+    def get(self, key: str) -> Optional[List[Infringement]]:
+        with self._lock:
+            infringements = self._entries.get(key)
+            if infringements is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(infringements)
+
+    def put(self, key: str, infringements: List[Infringement]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = list(infringements)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Vide le cache et recalcule la version du moteur.
+
+        À appeler après un rechargement à chaud des modules de règles ou une
+        modification des seuils de gravité.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.engine_version = self._engine_version(_source_digest())
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+analysis_cache = AnalysisCache()
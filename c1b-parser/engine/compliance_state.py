@@ -0,0 +1,209 @@
+"""État de conformité incrémental d'un conducteur (temps restants en direct).
+
+Reprend les accumulateurs de check_breaks, check_daily_driving et
+check_weekly_driving, mais les conserve d'une ingestion à l'autre : seules
+les nouvelles activités sont traitées, et la lecture de l'état ne dépend
+pas de la longueur de l'historique.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from engine.rules.breaks import MAX_DRIVING_BEFORE_BREAK, QUALIFYING_BREAK
+from engine.rules.daily_rest import MAX_REDUCED_PER_WEEK, NORMAL_DAILY_REST, REDUCED_DAILY_REST
+from engine.rules.weekly_rest import MAX_PERIOD_WITHOUT_WEEKLY_REST, REDUCED_WEEKLY_REST
+from models.activity import Activity, ActivityType
+from models.compliance import ComplianceState
+
+DAILY_DRIVING_LIMIT = 9.0 * 60
+EXTENDED_DAILY_DRIVING_LIMIT = 10.0 * 60
+MAX_EXTENDED_DAYS_PER_WEEK = 2
+WEEKLY_DRIVING_LIMIT = 56.0 * 60
+BIWEEKLY_DRIVING_LIMIT = 90.0 * 60
+RETAINED_DAYS = 21  # 2 semaines ISO complètes + semaine en cours
+
+
+def _monday_of_week(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+def _add_driving(state: ComplianceState, act: Activity) -> None:
+    """Ajoute une activité de conduite aux minutes par jour (découpée à minuit)."""
+    current = act.start
+    while current.date() < act.end.date():
+        next_day = (current + timedelta(days=1)).replace(hour=0, minute=0, second=0)
+        key = current.date().isoformat()
+        minutes = (next_day - current).total_seconds() / 60.0
+        state.daily_driving_minutes[key] = state.daily_driving_minutes.get(key, 0.0) + minutes
+        current = next_day
+    minutes = (act.end - current).total_seconds() / 60.0
+    if minutes > 0:
+        key = current.date().isoformat()
+        state.daily_driving_minutes[key] = state.daily_driving_minutes.get(key, 0.0) + minutes
+
+
+def _take_break(state: ComplianceState, minutes: float) -> None:
+    """Pause (REST ou AVAILABILITY), même logique que check_breaks."""
+    if minutes >= QUALIFYING_BREAK:
+        state.driving_since_break_minutes = 0.0
+        state.split_break_started = False
+    elif not state.split_break_started and minutes >= 15:
+        state.split_break_started = True
+    elif state.split_break_started and minutes >= 30:
+        state.driving_since_break_minutes = 0.0
+        state.split_break_started = False
+
+
+def _close_rest_block(state: ComplianceState) -> None:
+    """Clôt le bloc de repos en cours et met à jour les derniers repos."""
+    if state.rest_block_start is None:
+        return
+    minutes = (state.rest_block_end - state.rest_block_start).total_seconds() / 60.0
+    if minutes >= REDUCED_DAILY_REST:
+        state.last_daily_rest_end = state.rest_block_end
+    if minutes >= REDUCED_WEEKLY_REST:
+        state.last_weekly_rest_end = state.rest_block_end
+        state.reduced_daily_rests = 0
+    elif REDUCED_DAILY_REST <= minutes < NORMAL_DAILY_REST:
+        state.reduced_daily_rests += 1
+    state.rest_block_start = None
+    state.rest_block_end = None
+
+
+def update_compliance_state(
+    state: ComplianceState,
+    activities: Iterable[Activity],
+) -> ComplianceState:
+    """Intègre les activités postérieures à la dernière activité connue.
+
+    Les activités déjà vues (téléchargements qui se chevauchent) sont
+    ignorées, et celle qui chevauche la fin du téléchargement précédent
+    n'est comptée qu'à partir de cette fin ; le coût est proportionnel au
+    nombre de nouvelles activités.
+    """
+    for act in sorted(activities, key=lambda a: a.start):
+        if state.last_activity_end is not None and act.end <= state.last_activity_end:
+            continue
+        # Une pause reste une seule pause : sa durée complète décide si elle qualifie
+        break_minutes = act.duration_minutes
+        if state.last_activity_end is not None and act.start < state.last_activity_end:
+            act = act.model_copy(update={
+                "start": state.last_activity_end,
+                "duration_minutes": int((act.end - state.last_activity_end).total_seconds() / 60),
+            })
+
+        if act.type == ActivityType.REST:
+            if (state.rest_block_start is not None
+                    and act.start <= state.rest_block_end + timedelta(minutes=1)):
+                state.rest_block_end = max(state.rest_block_end, act.end)
+            else:
+                _close_rest_block(state)
+                state.rest_block_start = act.start
+                state.rest_block_end = act.end
+        else:
+            _close_rest_block(state)
+
+        if act.type == ActivityType.DRIVING:
+            _add_driving(state, act)
+            state.driving_since_break_minutes += act.duration_minutes
+        elif act.type in (ActivityType.REST, ActivityType.AVAILABILITY):
+            _take_break(state, break_minutes)
+
+        state.last_activity_end = act.end
+
+    if state.last_activity_end is not None:
+        oldest = (state.last_activity_end.date() - timedelta(days=RETAINED_DAYS)).isoformat()
+        state.daily_driving_minutes = {
+            day: minutes for day, minutes in state.daily_driving_minutes.items()
+            if day > oldest
+        }
+    return state
+
+
+def compliance_snapshot(state: ComplianceState, now: Optional[datetime] = None) -> dict:
+    """Temps restants à l'instant ``now`` (défaut: maintenant, UTC).
+
+    Après la dernière activité connue, le conducteur est considéré au repos
+    jusqu'à ``now`` (carte retirée) : ce repos en cours compte comme pause,
+    repos journalier ou hebdomadaire s'il est assez long, comme s'il
+    s'achevait à ``now``.
+
+    Les durées sont en minutes, les échéances en datetime ; None quand
+    l'historique ne permet pas de les calculer.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    today = now.date()
+    monday = _monday_of_week(today)
+    previous_monday = monday - timedelta(days=7)
+    daily = {date.fromisoformat(day): minutes for day, minutes in state.daily_driving_minutes.items()}
+
+    driven_today = daily.get(today, 0.0)
+    week_minutes = sum(m for d, m in daily.items() if monday <= d <= today)
+    previous_week_minutes = sum(m for d, m in daily.items() if previous_monday <= d < monday)
+    extended_days = sum(
+        1 for d, m in daily.items() if monday <= d < today and m > DAILY_DRIVING_LIMIT
+    )
+    daily_limit = (
+        EXTENDED_DAILY_DRIVING_LIMIT if extended_days < MAX_EXTENDED_DAYS_PER_WEEK
+        else DAILY_DRIVING_LIMIT
+    )
+
+    remaining_today = max(0.0, daily_limit - driven_today)
+    remaining_week = max(0.0, WEEKLY_DRIVING_LIMIT - week_minutes)
+    remaining_fortnight = max(
+        0.0, BIWEEKLY_DRIVING_LIMIT - week_minutes - previous_week_minutes
+    )
+
+    # Repos en cours : bloc de repos ouvert, prolongé jusqu'à ``now``
+    rest_start, rest_end = state.rest_block_start, state.rest_block_end
+    if state.last_activity_end is not None and now > state.last_activity_end:
+        if rest_start is None:
+            rest_start = state.last_activity_end
+        rest_end = now
+
+    driving_since_break = state.driving_since_break_minutes
+    last_daily_rest_end = state.last_daily_rest_end
+    last_weekly_rest_end = state.last_weekly_rest_end
+    reduced_daily_rests = state.reduced_daily_rests
+    if rest_start is not None:
+        ongoing = (rest_end - rest_start).total_seconds() / 60.0
+        if ongoing >= QUALIFYING_BREAK or (state.split_break_started and ongoing >= 30):
+            driving_since_break = 0.0
+        if ongoing >= REDUCED_DAILY_REST:
+            last_daily_rest_end = rest_end
+        if ongoing >= REDUCED_WEEKLY_REST:
+            last_weekly_rest_end = rest_end
+            reduced_daily_rests = 0
+        elif REDUCED_DAILY_REST <= ongoing < NORMAL_DAILY_REST:
+            reduced_daily_rests += 1
+
+    # Repos réduit (9h) tant que les 3 autorisés entre deux repos
+    # hebdomadaires ne sont pas épuisés, sinon repos normal (11h)
+    reduced_left = max(0, MAX_REDUCED_PER_WEEK - reduced_daily_rests)
+    required_rest = REDUCED_DAILY_REST if reduced_left else NORMAL_DAILY_REST
+    daily_rest_latest_start = None
+    if last_daily_rest_end is not None:
+        daily_rest_latest_start = (
+            last_daily_rest_end + timedelta(hours=24) - timedelta(minutes=required_rest)
+        )
+    weekly_rest_latest_start = None
+    if last_weekly_rest_end is not None:
+        weekly_rest_latest_start = (
+            last_weekly_rest_end + timedelta(hours=MAX_PERIOD_WITHOUT_WEEKLY_REST)
+        )
+
+    return {
+        "card_number": state.card_number,
+        "as_of": state.last_activity_end,
+        "remaining_driving_today_minutes": round(min(remaining_today, remaining_week, remaining_fortnight), 1),
+        "remaining_driving_week_minutes": round(min(remaining_week, remaining_fortnight), 1),
+        "remaining_driving_fortnight_minutes": round(remaining_fortnight, 1),
+        "driving_until_break_minutes": round(
+            max(0.0, MAX_DRIVING_BEFORE_BREAK - driving_since_break), 1
+        ),
+        "extended_days_used_this_week": extended_days,
+        "reduced_daily_rests_left": reduced_left,
+        "daily_rest_latest_start": daily_rest_latest_start,
+        "weekly_rest_latest_start": weekly_rest_latest_start,
+    }
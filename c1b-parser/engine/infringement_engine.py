@@ -1,64 +1,222 @@
 """Moteur principal de détection d'infractions.
 
-Orchestre toutes les règles du Règlement (CE) 561/2006 et retourne
-la liste complète des infractions détectées pour un conducteur.
+Orchestre les règles du Règlement (CE) 561/2006 enregistrées dans
+engine.registry et retourne la liste des infractions détectées pour un
+conducteur.
 """
 
-from typing import List
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from engine.rules.breaks import check_breaks
-from engine.rules.daily_rest import check_daily_rest
-from engine.rules.driving_time import (
-    check_biweekly_driving,
-    check_daily_driving,
-    check_weekly_driving,
+from engine.cache import analysis_cache
+from engine.registry import AnalysisContext, Rule, get_rules, run_rules
+# Import des modules de règles : enregistre Art. 6.1 à 8.6 dans le registre
+from engine.rules import breaks, daily_rest, driving_time, weekly_rest  # noqa: F401
+from engine.rules.daily_rest import weekly_rest_after, weekly_rest_before
+from engine.rules.multi_manning import check_crew
+from models.activity import (
+    Activity,
+    ActivityType,
+    DriverActivity,
+    pack_driver_activity,
+    unpack_driver_activity,
 )
-from engine.rules.weekly_rest import check_weekly_rest
-from models.activity import DriverActivity
 from models.infringement import Infringement
 
 
-def analyze(driver_activity: DriverActivity) -> List[Infringement]:
+def analyze(
+    driver_activity: DriverActivity,
+    start: Optional[Union[date, datetime]] = None,
+    end: Optional[Union[date, datetime]] = None,
+    articles: Optional[Iterable[str]] = None,
+    use_cache: bool = True,
+) -> List[Infringement]:
     """Analyse complète des activités d'un conducteur.
 
-    Applique toutes les règles 561/2006 et retourne les infractions
+    Applique les règles 561/2006 et retourne les infractions
     classifiées selon la Directive 2009/5/CE.
 
+    Avec ``start`` / ``end``, seule la tranche de timeline utile à la
+    fenêtre est évaluée : chaque règle reçoit la fenêtre elle-même plus la
+    marge qu'elle déclare (lookback / lookahead, repos hebdomadaires qui
+    encadrent la fenêtre). Le coût dépend alors de la taille de la fenêtre
+    et non de l'historique, sauf pour les règles à marge illimitée.
+
     Args:
         driver_activity: Activités du conducteur à analyser
+        start: Premier jour de la fenêtre (inclus), début de l'historique si None
+        end: Dernier jour de la fenêtre (inclus), fin de l'historique si None
+        articles: Articles à vérifier (ex: ["Art. 7"], "Art. 6" couvre 6.1 à 6.3).
+            Toutes les règles si None.
+        use_cache: Réutiliser un résultat déjà calculé pour la même timeline
 
     Returns:
         Liste des infractions détectées, triées par date
     """
-    infringements: List[Infringement] = []
+    if isinstance(articles, str):
+        articles = (articles,)
+    elif articles is not None:
+        articles = tuple(articles)
+    if isinstance(start, datetime):
+        start = start.date()
+    if isinstance(end, datetime):
+        end = end.date()
 
-    # Art. 6.1 — Temps de conduite journalier
-    infringements.extend(check_daily_driving(driver_activity))
+    windowed = start is not None or end is not None
+    if windowed:
+        bounds = _window_bounds(driver_activity, start, end, articles)
+        driver_activity = _slice(driver_activity, *_union(bounds.values()))
 
-    # Art. 6.2 — Temps de conduite hebdomadaire
-    infringements.extend(check_weekly_driving(driver_activity))
+    if use_cache:
+        key = analysis_cache.key_for(driver_activity, articles, start, end)
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            return cached
 
-    # Art. 6.3 — Temps de conduite bi-hebdomadaire
-    infringements.extend(check_biweekly_driving(driver_activity))
+    if windowed:
+        infringements = _run_windowed(driver_activity, bounds)
+    else:
+        infringements = run_rules(driver_activity, articles)
+    infringements = _filter_window(infringements, start, end)
+    if use_cache:
+        analysis_cache.put(key, infringements)
+    return infringements
 
-    # Art. 7 — Pauses
-    infringements.extend(check_breaks(driver_activity))
 
-    # Art. 8.2 — Repos journalier
-    infringements.extend(check_daily_rest(driver_activity))
+def _window_datetimes(
+    driver_activity: DriverActivity,
+    start: Optional[date],
+    end: Optional[date],
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    tz = driver_activity.activities[0].start.tzinfo
+    return (
+        None if start is None else datetime.combine(start, time.min, tzinfo=tz),
+        None if end is None else datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+    )
 
-    # Art. 8.6 — Repos hebdomadaire
-    infringements.extend(check_weekly_rest(driver_activity))
 
-    # Trier par date
-    infringements.sort(key=lambda i: i.date)
+def rule_bounds(
+    activities: List[Activity],
+    r: Rule,
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+) -> Tuple[int, int]:
+    """Indices [first, last) des activités utiles à la règle ``r`` pour une fenêtre.
+
+    La fenêtre élargie des marges de la règle (et, si elle le demande,
+    jusqu'aux repos hebdomadaires qui l'encadrent), sans couper de repos
+    en deux : une durée de repos tronquée changerait le résultat.
+    """
+    first, last = 0, len(activities)
+    if window_start is not None and r.lookback is not None:
+        first = bisect_left(activities, window_start - r.lookback, key=lambda a: a.start)
+        # Inclure les activités commencées avant la marge mais encore en cours
+        while first > 0 and activities[first - 1].end > window_start - r.lookback:
+            first -= 1
+    if window_end is not None and r.lookahead is not None:
+        last = bisect_left(activities, window_end + r.lookahead, key=lambda a: a.start)
+
+    if r.until_weekly_rest:
+        if window_start is not None:
+            first = min(first, weekly_rest_before(activities, window_start))
+        if window_end is not None:
+            last = max(last, weekly_rest_after(activities, window_end))
+
+    while 0 < first < len(activities) and (
+        activities[first].type == ActivityType.REST
+        and activities[first - 1].type == ActivityType.REST
+    ):
+        first -= 1
+    while 0 < last < len(activities) and (
+        activities[last].type == ActivityType.REST
+        and activities[last - 1].type == ActivityType.REST
+    ):
+        last += 1
+    return first, last
+
+
+def _window_bounds(
+    driver_activity: DriverActivity,
+    start: Optional[date],
+    end: Optional[date],
+    articles: Optional[Tuple[str, ...]],
+) -> Dict[Rule, Tuple[int, int]]:
+    """Tranche utile à chaque règle sélectionnée, dans l'ordre du règlement."""
+    rules = get_rules(articles)
+    if not driver_activity.activities:
+        return {r: (0, 0) for r in rules}
+    window_start, window_end = _window_datetimes(driver_activity, start, end)
+    return {
+        r: rule_bounds(driver_activity.activities, r, window_start, window_end)
+        for r in rules
+    }
+
+
+def _union(bounds: Iterable[Tuple[int, int]]) -> Tuple[int, int]:
+    firsts, lasts = zip(*bounds)
+    return min(firsts), max(lasts)
+
+
+def _slice(driver_activity: DriverActivity, first: int, last: int) -> DriverActivity:
+    if first <= 0 and last >= len(driver_activity.activities):
+        return driver_activity
+    return DriverActivity.model_construct(
+        driver_name=driver_activity.driver_name,
+        card_number=driver_activity.card_number,
+        activities=driver_activity.activities[first:last],
+    )
 
+
+def _run_windowed(
+    driver_activity: DriverActivity,
+    bounds: Dict[Rule, Tuple[int, int]],
+) -> List[Infringement]:
+    """Applique chaque règle à sa propre tranche.
+
+    ``driver_activity`` est l'union des tranches (voir _window_bounds) ; les
+    règles qui partagent une tranche partagent aussi son contexte.
+    """
+    offset = min(first for first, _ in bounds.values())
+    contexts: Dict[Tuple[int, int], AnalysisContext] = {}
+    infringements: List[Infringement] = []
+    for r, (first, last) in bounds.items():
+        span = (first - offset, last - offset)
+        context = contexts.get(span)
+        if context is None:
+            context = contexts[span] = AnalysisContext(_slice(driver_activity, *span))
+        infringements.extend(run_rules(context.driver, (r.article,), context))
+    # Même ordre que run_rules sur l'historique complet : règles puis date
+    infringements.sort(key=lambda i: i.date)
     return infringements
 
 
-def analyze_summary(driver_activity: DriverActivity) -> dict:
+def _filter_window(
+    infringements: List[Infringement],
+    start: Optional[date],
+    end: Optional[date],
+) -> List[Infringement]:
+    if start is None and end is None:
+        return infringements
+    return [
+        inf for inf in infringements
+        if (start is None or inf.date >= start) and (end is None or inf.date <= end)
+    ]
+
+
+def analyze_summary(
+    driver_activity: DriverActivity,
+    start: Optional[Union[date, datetime]] = None,
+    end: Optional[Union[date, datetime]] = None,
+    articles: Optional[Iterable[str]] = None,
+    use_cache: bool = True,
+) -> dict:
     """Retourne un résumé des infractions par article et gravité."""
-    infringements = analyze(driver_activity)
+    infringements = analyze(
+        driver_activity, start, end, articles=articles, use_cache=use_cache
+    )
 
     summary = {
         "total": len(infringements),
@@ -74,3 +232,83 @@ def analyze_summary(driver_activity: DriverActivity) -> dict:
         summary["by_article"][inf.article] += 1
 
     return summary
+
+
+def analyze_crew(driver_activities: List[DriverActivity]) -> List[Infringement]:
+    """Art. 8.5 : analyse en équipage des conducteurs d'un même fichier VU.
+
+    Chaque paire de conducteurs est jointe en un seul passage (voir
+    find_multi_manning_periods) ; chaque conducteur est vérifié une fois
+    sur l'union de ses périodes d'équipage (voir check_crew).
+    """
+    return check_crew(driver_activities)
+
+
+def _analyze_packed_chunk(chunk: List[Tuple[int, tuple]]) -> List[Tuple[int, List[Infringement]]]:
+    """Exécuté dans un processus worker : analyse un lot de timelines compactes."""
+    return [
+        (index, analyze(unpack_driver_activity(packed), use_cache=False))
+        for index, packed in chunk
+    ]
+
+
+def analyze_many(
+    driver_activities: Iterable[DriverActivity],
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+) -> Iterator[Tuple[DriverActivity, List[Infringement]]]:
+    """Analyse un lot de conducteurs en parallèle sur un pool de processus.
+
+    Les conducteurs sont regroupés par lots de ``chunksize`` et envoyés aux
+    workers sous forme compacte (voir pack_driver_activity). Les résultats
+    sont rendus au fur et à mesure de la fin de chaque lot, donc pas dans
+    l'ordre d'entrée. Les conducteurs déjà présents dans le cache d'analyse
+    sont rendus immédiatement sans passer par le pool.
+
+    Args:
+        driver_activities: Conducteurs à analyser
+        workers: Nombre de processus (défaut: nombre de CPU)
+        chunksize: Nombre de conducteurs par tâche envoyée à un worker
+
+    Yields:
+        (conducteur, infractions) pour chaque conducteur
+    """
+    drivers = list(driver_activities)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(drivers)))
+    chunksize = max(1, chunksize)
+
+    # Pas de pool pour un seul worker : le coût de démarrage domine
+    if workers == 1:
+        for driver in drivers:
+            yield driver, analyze(driver)
+        return
+
+    pending = []
+    keys = {}
+    for index, driver in enumerate(drivers):
+        key = analysis_cache.key_for(driver)
+        cached = analysis_cache.get(key)
+        if cached is not None:
+            yield driver, cached
+        else:
+            keys[index] = key
+            pending.append(index)
+
+    if not pending:
+        return
+
+    chunks = []
+    for offset in range(0, len(pending), chunksize):
+        chunks.append([
+            (index, pack_driver_activity(drivers[index]))
+            for index in pending[offset:offset + chunksize]
+        ])
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_analyze_packed_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for index, infringements in future.result():
+                analysis_cache.put(keys[index], infringements)
+                yield drivers[index], infringements
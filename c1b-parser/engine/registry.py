@@ -0,0 +1,191 @@
+"""Registre des règles du moteur d'infractions.
+
+Chaque règle déclare son article, les entrées de contexte dont elle a
+besoin et sa classe de coût. Les entrées de contexte (activités triées,
+minutes de conduite par jour, ...) sont calculées une seule fois par
+analyse et partagées entre les règles qui les demandent.
+
+Le temps d'exécution et le nombre d'appels de chaque règle sont transmis
+aux puits de métriques enregistrés (``metrics_sinks``).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.activity import DriverActivity
+from models.infringement import Infringement
+
+# Classes de coût (n = nombre d'activités)
+COST_LINEAR = "O(n)"
+COST_SORT = "O(n log n)"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Une règle enregistrée."""
+    article: str                 # ex: "Art. 6.1"
+    name: str                    # ex: "daily_driving"
+    check: Callable[..., List[Infringement]]
+    inputs: Tuple[str, ...]      # entrées de contexte passées en kwargs
+    cost: str = COST_LINEAR
+    # Historique nécessaire avant / après une fenêtre pour l'évaluer correctement
+    # (None : tout l'historique)
+    lookback: Optional[timedelta] = timedelta(0)
+    lookahead: Optional[timedelta] = timedelta(0)
+    # Étendre la marge jusqu'aux repos hebdomadaires qui encadrent la fenêtre
+    until_weekly_rest: bool = False
+
+
+_RULES: Dict[str, Rule] = {}
+_PROVIDERS: Dict[str, Callable[["AnalysisContext"], Any]] = {}
+
+
+def rule(
+    article: str,
+    name: str,
+    inputs: Sequence[str] = (),
+    cost: str = COST_LINEAR,
+    lookback: Optional[timedelta] = timedelta(0),
+    lookahead: Optional[timedelta] = timedelta(0),
+    until_weekly_rest: bool = False,
+):
+    """Décorateur : enregistre une fonction check_* comme règle.
+
+    ``lookback`` / ``lookahead`` indiquent la marge d'activités à inclure
+    autour d'une fenêtre pour que la règle y donne le même résultat que sur
+    l'historique complet (voir analyze(start=..., end=...)) ; None pour une
+    règle dont l'état dépend de tout l'historique. ``until_weekly_rest``
+    élargit en plus la marge jusqu'au repos hebdomadaire qui précède la
+    fenêtre et à celui qui la suit, pour les règles dont l'état repart de
+    zéro à chaque repos hebdomadaire.
+    """
+    def decorator(check):
+        _RULES[name] = Rule(article=article, name=name, check=check,
+                            inputs=tuple(inputs), cost=cost,
+                            lookback=lookback, lookahead=lookahead,
+                            until_weekly_rest=until_weekly_rest)
+        return check
+    return decorator
+
+
+def context_input(name: str):
+    """Décorateur : enregistre le calcul d'une entrée de contexte partagée.
+
+    La fonction reçoit l'AnalysisContext et peut demander d'autres entrées.
+    """
+    def decorator(provider):
+        _PROVIDERS[name] = provider
+        return provider
+    return decorator
+
+
+def _article_key(article: str) -> Tuple[int, ...]:
+    """'Art. 6.1' -> (6, 1), pour trier les règles dans l'ordre du règlement."""
+    digits = article.replace("Art.", "").strip()
+    try:
+        return tuple(int(part) for part in digits.split("."))
+    except ValueError:
+        return (10 ** 6,)
+
+
+def _matches(article: str, wanted: str) -> bool:
+    """'Art. 6' sélectionne 'Art. 6.1', 'Art. 6.2', ... ; 'Art. 7' sélectionne 'Art. 7'."""
+    return article == wanted or article.startswith(wanted + ".")
+
+
+def get_rules(articles: Optional[Iterable[str]] = None) -> List[Rule]:
+    """Règles enregistrées, filtrées par article, dans l'ordre du règlement."""
+    rules = sorted(_RULES.values(), key=lambda r: _article_key(r.article))
+    if articles is None:
+        return rules
+    wanted = list(articles)
+    selected = [r for r in rules if any(_matches(r.article, w) for w in wanted)]
+    if not selected:
+        raise ValueError(f"Aucune règle enregistrée pour: {', '.join(wanted)}")
+    return selected
+
+
+class AnalysisContext:
+    """Entrées partagées d'une analyse, calculées à la demande.
+
+    ``values`` permet de fournir des entrées déjà calculées (ex: dérivées
+    d'un historique commun à plusieurs analyses).
+    """
+
+    def __init__(self, driver: DriverActivity, values: Optional[Dict[str, Any]] = None):
+        self.driver = driver
+        self._values: Dict[str, Any] = dict(values or {})
+
+    def get(self, name: str) -> Any:
+        if name not in self._values:
+            provider = _PROVIDERS.get(name)
+            if provider is None:
+                raise KeyError(f"Entrée de contexte inconnue: {name}")
+            started = time.perf_counter()
+            self._values[name] = provider(self)
+            _record(f"input:{name}", None, time.perf_counter() - started)
+        return self._values[name]
+
+
+class RuleMetrics:
+    """Puits de métriques en mémoire : appels et temps cumulé par règle."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, article: Optional[str], seconds: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"article": article, "calls": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            stats["calls"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+rule_metrics = RuleMetrics()
+
+# Puits appelés après chaque règle : objets exposant record(name, article, seconds)
+metrics_sinks: List[Any] = [rule_metrics]
+
+
+def _record(name: str, article: Optional[str], seconds: float) -> None:
+    for sink in metrics_sinks:
+        sink.record(name, article, seconds)
+
+
+def run_rules(
+    driver: DriverActivity,
+    articles: Optional[Iterable[str]] = None,
+    context: Optional[AnalysisContext] = None,
+) -> List[Infringement]:
+    """Applique les règles sélectionnées et retourne les infractions triées par date."""
+    if context is None:
+        context = AnalysisContext(driver)
+    infringements: List[Infringement] = []
+
+    for r in get_rules(articles):
+        kwargs = {name: context.get(name) for name in r.inputs}
+        started = time.perf_counter()
+        infringements.extend(r.check(driver, **kwargs))
+        _record(r.name, r.article, time.perf_counter() - started)
+
+    infringements.sort(key=lambda i: i.date)
+    return infringements
+
+
+@context_input("sorted_activities")
+def _sorted_activities(context: AnalysisContext):
+    return sorted(context.driver.activities, key=lambda a: a.start)
@@ -5,8 +5,9 @@ d'au moins 45 minutes (ou fractionnée : 15min puis 30min).
 """
 
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
+from engine.registry import rule
 from engine.severity import classify_break_severity
 from models.activity import Activity, ActivityType, DriverActivity
 from models.infringement import Infringement
@@ -20,7 +21,16 @@ def _is_rest_or_break(activity: Activity) -> bool:
     return activity.type in (ActivityType.REST, ActivityType.AVAILABILITY)
 
 
-def check_breaks(driver: DriverActivity) -> List[Infringement]:
+@rule(
+    article="Art. 7",
+    name="breaks",
+    inputs=("sorted_activities",),
+    lookback=timedelta(days=1),
+)
+def check_breaks(
+    driver: DriverActivity,
+    sorted_activities: Optional[List[Activity]] = None,
+) -> List[Infringement]:
     """Art. 7 : Vérifie les pauses après 4h30 de conduite.
 
     Logique :
@@ -29,18 +39,19 @@ def check_breaks(driver: DriverActivity) -> List[Infringement]:
     - Si conduite cumulative > 4h30 sans pause qualifiante -> infraction
     """
     infringements = []
-    sorted_activities = sorted(driver.activities, key=lambda a: a.start)
+    if sorted_activities is None:
+        sorted_activities = sorted(driver.activities, key=lambda a: a.start)
 
     cumulative_driving_minutes = 0.0
     longest_break_since_reset = 0.0
     first_split_taken = False  # Pour la pause fractionnée 15+30
     split_first_part = 0.0
-    driving_start_date = None
+    driving_start = None
 
     for act in sorted_activities:
         if act.type == ActivityType.DRIVING:
-            if driving_start_date is None:
-                driving_start_date = act.start.date()
+            if driving_start is None:
+                driving_start = act.start
             cumulative_driving_minutes += act.duration_minutes
 
             # Vérifier si on dépasse 4h30 sans pause qualifiante
@@ -58,6 +69,7 @@ def check_breaks(driver: DriverActivity) -> List[Infringement]:
                     date=act.start.date(),
                     driver_name=driver.driver_name,
                     card_number=driver.card_number,
+                    period_start=driving_start,
                     details=f"Plus longue pause prise: {longest_break_since_reset:.0f}min",
                 ))
                 # Reset après infraction (le conducteur reprend un nouveau cycle)
@@ -65,7 +77,7 @@ def check_breaks(driver: DriverActivity) -> List[Infringement]:
                 longest_break_since_reset = 0.0
                 first_split_taken = False
                 split_first_part = 0.0
-                driving_start_date = None
+                driving_start = None
 
         elif _is_rest_or_break(act):
             break_minutes = act.duration_minutes
@@ -79,7 +91,7 @@ def check_breaks(driver: DriverActivity) -> List[Infringement]:
                 longest_break_since_reset = 0.0
                 first_split_taken = False
                 split_first_part = 0.0
-                driving_start_date = None
+                driving_start = None
                 continue
 
             # Pause fractionnée : première partie >= 15min
@@ -95,6 +107,6 @@ def check_breaks(driver: DriverActivity) -> List[Infringement]:
                 longest_break_since_reset = 0.0
                 first_split_taken = False
                 split_first_part = 0.0
-                driving_start_date = None
+                driving_start = None
 
     return infringements
@@ -7,12 +7,14 @@ journalier d'au moins :
 - 9h (repos réduit, max 3 entre 2 repos hebdomadaires)
 
 Art. 8.5 : En équipage, repos de 9h minimum dans une période de 30h
-(non implémenté ici, nécessite info multi-conducteur).
+(voir engine/rules/multi_manning.py, nécessite les deux conducteurs).
 """
 
+from bisect import bisect_left
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
+from engine.registry import context_input, rule
 from engine.severity import classify_severity
 from models.activity import Activity, ActivityType, DriverActivity
 from models.infringement import Infringement
@@ -20,6 +22,7 @@ from models.infringement import Infringement
 NORMAL_DAILY_REST = 11.0 * 60   # 11h en minutes
 REDUCED_DAILY_REST = 9.0 * 60   # 9h en minutes
 MAX_REDUCED_PER_WEEK = 3
+WEEKLY_REST = 24.0 * 60         # repos hebdomadaire (réduit) minimum : remet à zéro le compte
 
 
 def _find_rest_periods(activities: List[Activity]) -> List[Tuple[datetime, datetime, float]]:
@@ -61,21 +64,107 @@ def _find_rest_periods(activities: List[Activity]) -> List[Tuple[datetime, datet
     return rest_periods
 
 
-def check_daily_rest(driver: DriverActivity) -> List[Infringement]:
+def _is_weekly_rest(block_start: datetime, block_end: datetime) -> bool:
+    return (block_end - block_start).total_seconds() / 60.0 >= WEEKLY_REST
+
+
+def weekly_rest_before(activities: List[Activity], at: datetime) -> int:
+    """Indice de la première activité du dernier repos hebdomadaire commencé avant ``at``.
+
+    Les repos consécutifs sont fusionnés comme dans _find_rest_periods ; un
+    repos en cours à ``at`` compte avec toute sa durée. Recherche
+    dichotomique puis parcours à rebours : le coût dépend de la distance au
+    repos trouvé, pas de la longueur de l'historique. 0 si aucun.
+    """
+    index = bisect_left(activities, at, key=lambda a: a.start)
+    # Compléter le repos éventuellement en cours à ``at``
+    while index < len(activities) and activities[index].type == ActivityType.REST:
+        index += 1
+
+    block_first = None
+    block_start = block_end = None
+    for i in range(index - 1, -1, -1):
+        act = activities[i]
+        if act.type == ActivityType.REST and (
+            block_start is not None and act.end >= block_start - timedelta(minutes=1)
+        ):
+            block_first, block_start = i, min(block_start, act.start)
+            continue
+        if (block_start is not None and block_start < at
+                and _is_weekly_rest(block_start, block_end)):
+            return block_first
+        block_first = block_start = block_end = None
+        if act.type == ActivityType.REST:
+            block_first, block_start, block_end = i, act.start, act.end
+
+    if block_start is not None and block_start < at and _is_weekly_rest(block_start, block_end):
+        return block_first
+    return 0
+
+
+def weekly_rest_after(activities: List[Activity], at: datetime) -> int:
+    """Indice suivant la dernière activité du premier repos hebdomadaire finissant après ``at``.
+
+    Pendant de weekly_rest_before ; len(activities) si aucun.
+    """
+    index = bisect_left(activities, at, key=lambda a: a.start)
+    # Reprendre au début du repos éventuellement en cours à ``at``
+    while index > 0 and activities[index - 1].type == ActivityType.REST:
+        index -= 1
+
+    block_start = block_end = None
+    for i in range(index, len(activities)):
+        act = activities[i]
+        if act.type == ActivityType.REST and (
+            block_end is not None and act.start <= block_end + timedelta(minutes=1)
+        ):
+            block_end = max(block_end, act.end)
+            continue
+        if block_end is not None and block_end > at and _is_weekly_rest(block_start, block_end):
+            return i
+        block_start = block_end = None
+        if act.type == ActivityType.REST:
+            block_start, block_end = act.start, act.end
+
+    return len(activities)
+
+
+@context_input("rest_periods")
+def _rest_periods_input(context) -> List[Tuple[datetime, datetime, float]]:
+    return _find_rest_periods(context.get("sorted_activities"))
+
+
+@rule(
+    article="Art. 8.2",
+    name="daily_rest",
+    inputs=("sorted_activities", "rest_periods"),
+    lookback=timedelta(days=7),
+    lookahead=timedelta(days=1),
+    until_weekly_rest=True,
+)
+def check_daily_rest(
+    driver: DriverActivity,
+    sorted_activities: Optional[List[Activity]] = None,
+    rest_periods: Optional[List[Tuple[datetime, datetime, float]]] = None,
+) -> List[Infringement]:
     """Art. 8.2 : Vérifie le repos journalier.
 
     Logique :
     - Identifier chaque période de 24h à partir de la fin du dernier repos qualifiant
     - Vérifier qu'un repos >= 11h (ou >= 9h réduit) a été pris
-    - Maximum 3 repos réduits entre 2 repos hebdomadaires
+    - Maximum 3 repos réduits entre 2 repos hebdomadaires : le compte
+      repart de zéro à chaque repos d'au moins 24h
     """
     infringements = []
-    sorted_acts = sorted(driver.activities, key=lambda a: a.start)
+    sorted_acts = sorted_activities
+    if sorted_acts is None:
+        sorted_acts = sorted(driver.activities, key=lambda a: a.start)
 
     if not sorted_acts:
         return infringements
 
-    rest_periods = _find_rest_periods(sorted_acts)
+    if rest_periods is None:
+        rest_periods = _find_rest_periods(sorted_acts)
     reduced_count = 0
 
     # Analyser les périodes entre deux repos qualifiants
@@ -96,6 +185,9 @@ def check_daily_rest(driver: DriverActivity) -> List[Infringement]:
                 # Le repos trouvé ne couvre pas la période de 24h correctement
                 pass
 
+        if duration_min >= WEEKLY_REST:
+            reduced_count = 0
+
         if duration_min >= NORMAL_DAILY_REST:
             # Repos normal (>= 11h) : OK
             last_qualifying_rest_end = rest_end
@@ -121,6 +213,7 @@ def check_daily_rest(driver: DriverActivity) -> List[Infringement]:
                 date=rest_start.date(),
                 driver_name=driver.driver_name,
                 card_number=driver.card_number,
+                period_start=rest_start,
                 details=f"Repos réduit #{reduced_count} (max {MAX_REDUCED_PER_WEEK} autorisés)",
             ))
             last_qualifying_rest_end = rest_end
@@ -139,6 +232,7 @@ def check_daily_rest(driver: DriverActivity) -> List[Infringement]:
             date=rest_start.date(),
             driver_name=driver.driver_name,
             card_number=driver.card_number,
+            period_start=rest_start,
         ))
         last_qualifying_rest_end = rest_end
 
@@ -179,6 +273,7 @@ def _check_24h_periods_without_rest(
                 date=first_act.start.date(),
                 driver_name=driver.driver_name,
                 card_number=driver.card_number,
+                period_start=first_act.start,
             ))
         return
 
@@ -207,4 +302,5 @@ def _check_24h_periods_without_rest(
                 date=end1.date(),
                 driver_name=driver.driver_name,
                 card_number=driver.card_number,
+                period_start=end1,
             ))
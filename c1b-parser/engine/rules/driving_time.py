@@ -7,8 +7,9 @@ Art. 6.3 : Temps de conduite sur 2 semaines consécutives max 90h
 
 from collections import defaultdict
 from datetime import date, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from engine.registry import COST_SORT, context_input, rule
 from engine.severity import classify_severity
 from models.activity import ActivityType, DriverActivity
 from models.infringement import Infringement
@@ -49,14 +50,38 @@ def _driving_minutes_per_week(daily_minutes: Dict[date, float]) -> Dict[date, fl
     return dict(weekly)
 
 
-def check_daily_driving(driver: DriverActivity) -> List[Infringement]:
+@context_input("daily_driving_minutes")
+def _daily_driving_minutes_input(context) -> Dict[date, float]:
+    return _driving_minutes_per_day(context.driver)
+
+
+@context_input("weekly_driving_minutes")
+def _weekly_driving_minutes_input(context) -> Dict[date, float]:
+    return _driving_minutes_per_week(context.get("daily_driving_minutes"))
+
+
+# Les marges couvrent la semaine (tolérance 10h, total 56h) ou les deux
+# semaines (90h) qui contiennent chaque jour de la fenêtre.
+@rule(
+    article="Art. 6.1",
+    name="daily_driving",
+    inputs=("daily_driving_minutes",),
+    cost=COST_SORT,
+    lookback=timedelta(days=7),
+)
+def check_daily_driving(
+    driver: DriverActivity,
+    daily_driving_minutes: Optional[Dict[date, float]] = None,
+) -> List[Infringement]:
     """Art. 6.1 : Vérifie le temps de conduite journalier.
 
     - Max 9h par jour
     - Tolérance 10h maximum 2 fois par semaine
     """
     infringements = []
-    daily_minutes = _driving_minutes_per_day(driver)
+    daily_minutes = daily_driving_minutes
+    if daily_minutes is None:
+        daily_minutes = _driving_minutes_per_day(driver)
 
     # Compter les jours à 10h par semaine pour gérer la tolérance
     weekly_extended_days: Dict[date, int] = defaultdict(int)
@@ -120,11 +145,23 @@ def check_daily_driving(driver: DriverActivity) -> List[Infringement]:
     return infringements
 
 
-def check_weekly_driving(driver: DriverActivity) -> List[Infringement]:
+@rule(
+    article="Art. 6.2",
+    name="weekly_driving",
+    inputs=("weekly_driving_minutes",),
+    cost=COST_SORT,
+    lookback=timedelta(days=7),
+    lookahead=timedelta(days=7),
+)
+def check_weekly_driving(
+    driver: DriverActivity,
+    weekly_driving_minutes: Optional[Dict[date, float]] = None,
+) -> List[Infringement]:
     """Art. 6.2 : Vérifie le temps de conduite hebdomadaire (max 56h)."""
     infringements = []
-    daily_minutes = _driving_minutes_per_day(driver)
-    weekly_minutes = _driving_minutes_per_week(daily_minutes)
+    weekly_minutes = weekly_driving_minutes
+    if weekly_minutes is None:
+        weekly_minutes = _driving_minutes_per_week(_driving_minutes_per_day(driver))
 
     for monday, minutes in sorted(weekly_minutes.items()):
         hours = minutes / 60.0
@@ -148,11 +185,23 @@ def check_weekly_driving(driver: DriverActivity) -> List[Infringement]:
     return infringements
 
 
-def check_biweekly_driving(driver: DriverActivity) -> List[Infringement]:
+@rule(
+    article="Art. 6.3",
+    name="biweekly_driving",
+    inputs=("weekly_driving_minutes",),
+    cost=COST_SORT,
+    lookback=timedelta(weeks=2),
+    lookahead=timedelta(days=7),
+)
+def check_biweekly_driving(
+    driver: DriverActivity,
+    weekly_driving_minutes: Optional[Dict[date, float]] = None,
+) -> List[Infringement]:
     """Art. 6.3 : Vérifie le temps de conduite sur 2 semaines consécutives (max 90h)."""
     infringements = []
-    daily_minutes = _driving_minutes_per_day(driver)
-    weekly_minutes = _driving_minutes_per_week(daily_minutes)
+    weekly_minutes = weekly_driving_minutes
+    if weekly_minutes is None:
+        weekly_minutes = _driving_minutes_per_week(_driving_minutes_per_day(driver))
 
     sorted_weeks = sorted(weekly_minutes.keys())
     for i in range(len(sorted_weeks) - 1):
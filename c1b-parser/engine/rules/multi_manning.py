@@ -0,0 +1,196 @@
+"""Règle de repos en équipage — Article 8.5 du Règlement (CE) 561/2006.
+
+Art. 8.5 : En équipage (plusieurs conducteurs à bord), chaque conducteur
+doit avoir pris un nouveau repos journalier d'au moins 9h dans les 30h
+suivant la fin de son repos journalier ou hebdomadaire précédent.
+
+Les périodes d'équipage sont détectées en joignant les timelines des deux
+conducteurs (fichier VU : slots conducteur et second conducteur). Avec
+plus de deux conducteurs, chacun est vérifié une fois sur l'union de ses
+périodes d'équipage avec tous les autres (voir check_crew).
+"""
+
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+from engine.rules.daily_rest import REDUCED_DAILY_REST, _find_rest_periods
+from engine.severity import classify_severity
+from models.activity import Activity, ActivityType, DriverActivity
+from models.infringement import Infringement
+
+MULTI_MANNING_WINDOW = 30.0 * 60  # 30h en minutes
+MULTI_MANNING_REST = REDUCED_DAILY_REST  # 9h en minutes
+# Deux chevauchements séparés de moins d'1h appartiennent à la même période d'équipage
+MERGE_TOLERANCE = timedelta(hours=1)
+
+
+def _same_vehicle(a: Activity, b: Activity) -> bool:
+    """Immatriculation identique, ou inconnue d'un côté (même fichier VU)."""
+    if a.vehicle_registration is None or b.vehicle_registration is None:
+        return True
+    return a.vehicle_registration == b.vehicle_registration
+
+
+def find_multi_manning_periods(
+    driver_a: DriverActivity,
+    driver_b: DriverActivity,
+) -> List[Tuple[datetime, datetime]]:
+    """Périodes où les deux conducteurs sont en service à bord du même véhicule.
+
+    Jointure tri-fusion des deux timelines triées : chaque activité n'est
+    visitée qu'une fois, sans comparaison de toutes les paires d'intervalles.
+    Seules les périodes comportant de la conduite sont retenues.
+
+    Returns:
+        Liste triée de (début, fin)
+    """
+    acts_a = sorted(driver_a.activities, key=lambda a: a.start)
+    acts_b = sorted(driver_b.activities, key=lambda a: a.start)
+
+    periods: List[Tuple[datetime, datetime, bool]] = []
+    i = j = 0
+    while i < len(acts_a) and j < len(acts_b):
+        a, b = acts_a[i], acts_b[j]
+        start = max(a.start, b.start)
+        end = min(a.end, b.end)
+
+        if (start < end
+                and a.type != ActivityType.REST and b.type != ActivityType.REST
+                and _same_vehicle(a, b)):
+            driving = ActivityType.DRIVING in (a.type, b.type)
+            if periods and start - periods[-1][1] <= MERGE_TOLERANCE:
+                last_start, last_end, last_driving = periods[-1]
+                periods[-1] = (last_start, max(last_end, end), last_driving or driving)
+            else:
+                periods.append((start, end, driving))
+
+        # Avancer la timeline dont l'activité courante se termine en premier
+        if a.end <= b.end:
+            i += 1
+        else:
+            j += 1
+
+    return [(start, end) for start, end, driving in periods if driving]
+
+
+def _overlaps(
+    periods: List[Tuple[datetime, datetime]],
+    start: datetime,
+    end: datetime,
+    from_index: int,
+) -> Tuple[bool, int]:
+    """Teste si [start, end) chevauche une période ; périodes parcourues une seule fois."""
+    k = from_index
+    while k < len(periods) and periods[k][1] <= start:
+        k += 1
+    return k < len(periods) and periods[k][0] < end, k
+
+
+def _check_driver(
+    driver: DriverActivity,
+    periods: List[Tuple[datetime, datetime]],
+) -> List[Infringement]:
+    """Vérifie le repos de 9h dans 30h pour un conducteur sur ses périodes d'équipage."""
+    infringements = []
+    rest_periods = _find_rest_periods(driver.activities)
+    qualifying = [p for p in rest_periods if p[2] >= MULTI_MANNING_REST]
+    window = timedelta(minutes=MULTI_MANNING_WINDOW)
+    k = 0  # curseur dans les périodes d'équipage
+    r = 0  # curseur dans les repos
+
+    for (_, end1, _), (start2, end2, _) in zip(qualifying, qualifying[1:]):
+        crew, k = _overlaps(periods, end1, start2, k)
+        if not crew:
+            continue
+
+        deadline = end1 + window
+        if start2 + timedelta(minutes=MULTI_MANNING_REST) <= deadline:
+            continue
+
+        # Repos effectivement pris dans la fenêtre de 30h : le plus long des
+        # repos courts intermédiaires, ou le début du repos suivant
+        taken = max(0.0, (min(end2, deadline) - start2).total_seconds() / 60.0)
+        while r < len(rest_periods) and rest_periods[r][0] < end1:
+            r += 1
+        while r < len(rest_periods) and rest_periods[r][0] < start2:
+            r_start, r_end, _ = rest_periods[r]
+            if r_start < deadline:
+                taken = max(taken, (min(r_end, deadline) - r_start).total_seconds() / 60.0)
+            r += 1
+
+        missing_hours = (MULTI_MANNING_REST - taken) / 60.0
+        if missing_hours <= 0:
+            continue
+
+        infringements.append(Infringement(
+            article="Art. 8.5",
+            rule_description="Repos journalier insuffisant en équipage (9h dans 30h)",
+            severity=classify_severity("daily_rest", missing_hours),
+            value=round(taken / 60.0, 2),
+            limit=9.0,
+            excess=round(missing_hours, 2),
+            date=end1.date(),
+            driver_name=driver.driver_name,
+            card_number=driver.card_number,
+            period_start=end1,
+            details=f"Repos de 9h attendu avant {deadline.isoformat()}",
+        ))
+
+    return infringements
+
+
+def check_multi_manning(
+    driver_a: DriverActivity,
+    driver_b: DriverActivity,
+    periods: Optional[List[Tuple[datetime, datetime]]] = None,
+) -> List[Infringement]:
+    """Art. 8.5 : Vérifie le repos journalier des deux membres d'un équipage.
+
+    Logique :
+    - Détecter les périodes d'équipage (jointure des deux timelines)
+    - Pour chaque intervalle entre deux repos >= 9h d'un conducteur qui
+      recoupe une période d'équipage, le repos suivant doit être achevé
+      dans les 30h suivant la fin du précédent
+    """
+    if periods is None:
+        periods = find_multi_manning_periods(driver_a, driver_b)
+    if not periods:
+        return []
+
+    infringements = _check_driver(driver_a, periods) + _check_driver(driver_b, periods)
+    infringements.sort(key=lambda i: i.date)
+    return infringements
+
+
+def _merge_periods(periods: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Union de périodes : liste triée de périodes disjointes."""
+    merged: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def check_crew(drivers: List[DriverActivity]) -> List[Infringement]:
+    """Art. 8.5 pour un équipage de deux conducteurs ou plus.
+
+    Chaque paire est jointe une fois (find_multi_manning_periods) ; chaque
+    conducteur est ensuite vérifié une seule fois sur l'union de ses
+    périodes d'équipage, de sorte qu'un repos manquant n'est signalé
+    qu'une fois quel que soit le nombre de coéquipiers.
+    """
+    periods: Dict[int, List[Tuple[datetime, datetime]]] = {i: [] for i in range(len(drivers))}
+    for i, j in combinations(range(len(drivers)), 2):
+        shared = find_multi_manning_periods(drivers[i], drivers[j])
+        periods[i].extend(shared)
+        periods[j].extend(shared)
+
+    infringements: List[Infringement] = []
+    for i, driver in enumerate(drivers):
+        if periods[i]:
+            infringements.extend(_check_driver(driver, _merge_periods(periods[i])))
+    infringements.sort(key=lambda i: i.date)
+    return infringements
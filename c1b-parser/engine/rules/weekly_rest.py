@@ -9,70 +9,155 @@ Un repos hebdomadaire doit commencer au plus tard à la fin de 6 périodes
 de 24h après le repos hebdomadaire précédent.
 """
 
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Deque, List, Optional, Tuple
 
+from engine.registry import rule
+from engine.rules.daily_rest import _find_rest_periods
 from engine.severity import classify_severity
-from models.activity import Activity, ActivityType, DriverActivity
+from models.activity import Activity, DriverActivity
 from models.infringement import Infringement
 
 NORMAL_WEEKLY_REST = 45.0 * 60   # 45h en minutes
 REDUCED_WEEKLY_REST = 24.0 * 60  # 24h en minutes
 MAX_PERIOD_WITHOUT_WEEKLY_REST = 6 * 24  # 6 périodes de 24h = 144h
+COMPENSATION_WEEKS = 3  # compensation avant la fin de la 3ème semaine suivante
+COMPENSATION_ATTACHMENT_REST = 9.0 * 60  # repos minimum auquel rattacher la compensation
+NORMAL_DAILY_REST = 11.0 * 60
+
+
+def _compensation_deadline(rest_start: datetime) -> datetime:
+    """Fin de la 3ème semaine suivant la semaine du repos réduit (lundi 00h)."""
+    monday = (rest_start - timedelta(days=rest_start.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return monday + timedelta(weeks=COMPENSATION_WEEKS + 1)
+
+
+def _check_reduced_rest_compensation(
+    driver: DriverActivity,
+    rest_periods: List[Tuple[datetime, datetime, float]],
+    observed_until: datetime,
+    infringements: List[Infringement],
+) -> None:
+    """Art. 8.6 : Vérifie la compensation des repos hebdomadaires réduits.
+
+    Chaque repos réduit (24h <= repos < 45h) crée un manque (45h - durée)
+    à compenser en bloc, rattaché à un repos d'au moins 9h, avant la fin de
+    la 3ème semaine suivante. Un manque n'est compensé que par un seul
+    repos dont le surplus (au-delà de 11h pour un repos journalier, de 45h
+    pour un repos hebdomadaire normal) le couvre entièrement ; des surplus
+    partiels répartis sur plusieurs repos ne comptent pas, et un manque non
+    compensé est en infraction pour sa totalité. Un même repos peut porter
+    plusieurs compensations, les manques les plus anciens d'abord.
+
+    Les manques en attente sont gardés dans une file : leurs échéances
+    arrivent dans l'ordre des repos réduits, donc un seul parcours des
+    repos suffit.
+    """
+    # (échéance, début du repos réduit, durée, manque)
+    outstanding: Deque[Tuple[datetime, datetime, float, float]] = deque()
 
+    def expire(until: datetime) -> None:
+        while outstanding and outstanding[0][0] <= until:
+            deadline, rest_start, duration, deficit = outstanding.popleft()
+            missing_hours = deficit / 60.0
+            infringements.append(Infringement(
+                article="Art. 8.6",
+                rule_description="Repos hebdomadaire réduit non compensé",
+                severity=classify_severity("weekly_rest", missing_hours),
+                value=0.0,
+                limit=round(missing_hours, 2),
+                excess=round(missing_hours, 2),
+                date=rest_start.date(),
+                driver_name=driver.driver_name,
+                card_number=driver.card_number,
+                period_start=rest_start,
+                details=(
+                    f"Repos réduit de {duration / 60.0:.1f}h, compensation due "
+                    f"avant le {deadline.date().isoformat()}"
+                ),
+            ))
 
-def _find_long_rest_periods(activities: List[Activity]) -> List[Tuple[datetime, datetime, float]]:
-    """Identifie les périodes de repos potentiellement hebdomadaires (>= 24h)."""
-    sorted_acts = sorted(activities, key=lambda a: a.start)
-    rest_periods = []
-
-    current_start = None
-    current_end = None
-
-    for act in sorted_acts:
-        if act.type == ActivityType.REST:
-            if current_start is None:
-                current_start = act.start
-                current_end = act.end
-            elif act.start <= current_end + timedelta(minutes=1):
-                current_end = max(current_end, act.end)
-            else:
-                duration = (current_end - current_start).total_seconds() / 60.0
-                if duration >= REDUCED_WEEKLY_REST * 0.5:
-                    # Inclure les repos potentiels (même sous le seuil pour détection)
-                    rest_periods.append((current_start, current_end, duration))
-                current_start = act.start
-                current_end = act.end
-        else:
-            if current_start is not None:
-                duration = (current_end - current_start).total_seconds() / 60.0
-                if duration >= REDUCED_WEEKLY_REST * 0.5:
-                    rest_periods.append((current_start, current_end, duration))
-                current_start = None
-                current_end = None
-
-    if current_start is not None:
-        duration = (current_end - current_start).total_seconds() / 60.0
-        if duration >= REDUCED_WEEKLY_REST * 0.5:
-            rest_periods.append((current_start, current_end, duration))
+    for rest_start, rest_end, duration_min in rest_periods:
+        expire(rest_start)
 
-    return rest_periods
+        if duration_min < COMPENSATION_ATTACHMENT_REST:
+            continue
 
+        if duration_min >= NORMAL_WEEKLY_REST:
+            surplus = duration_min - NORMAL_WEEKLY_REST
+        elif duration_min >= REDUCED_WEEKLY_REST:
+            surplus = 0.0
+        else:
+            # Seul le temps au-delà d'un repos journalier normal compte :
+            # un repos de 11h ne compense rien
+            surplus = max(0.0, duration_min - NORMAL_DAILY_REST)
+
+        if surplus > 0 and outstanding:
+            pending = []
+            for item in outstanding:
+                if item[3] <= surplus:
+                    surplus -= item[3]  # compensé en bloc par ce repos
+                else:
+                    pending.append(item)
+            outstanding.clear()
+            outstanding.extend(pending)
+
+        if REDUCED_WEEKLY_REST <= duration_min < NORMAL_WEEKLY_REST:
+            outstanding.append((
+                _compensation_deadline(rest_start), rest_start, duration_min,
+                NORMAL_WEEKLY_REST - duration_min,
+            ))
 
-def check_weekly_rest(driver: DriverActivity) -> List[Infringement]:
+    # Les manques dont l'échéance dépasse la fin des données restent en attente
+    expire(observed_until)
+
+
+# Marges : avant la fenêtre, les manques encore en attente (repos réduits
+# des 3 semaines précédentes, plus la semaine entamée) et l'intervalle de
+# 6×24h ; après, suivi des compensations sur les 3 semaines suivant un repos
+# réduit. Les deux marges vont en plus jusqu'aux repos hebdomadaires qui
+# encadrent la fenêtre. Limite : un manque antérieur à la marge qui aurait
+# pris le surplus destiné à un manque de la marge n'est pas vu (chaîne de
+# compensations de plus de 4 semaines, jamais rencontrée sur les timelines
+# de test).
+@rule(
+    article="Art. 8.6",
+    name="weekly_rest",
+    inputs=("sorted_activities", "rest_periods"),
+    lookback=timedelta(weeks=COMPENSATION_WEEKS + 1, hours=MAX_PERIOD_WITHOUT_WEEKLY_REST),
+    lookahead=timedelta(weeks=COMPENSATION_WEEKS + 1),
+    until_weekly_rest=True,
+)
+def check_weekly_rest(
+    driver: DriverActivity,
+    sorted_activities: Optional[List[Activity]] = None,
+    rest_periods: Optional[List[Tuple[datetime, datetime, float]]] = None,
+) -> List[Infringement]:
     """Art. 8.6 : Vérifie le repos hebdomadaire.
 
     Vérifie :
     1. Qu'un repos hebdomadaire (>= 24h) existe avant la fin de 6×24h
     2. Que le repos est suffisant (45h normal ou 24h réduit)
+    3. Que chaque repos réduit est compensé avant la fin de la 3ème semaine
     """
     infringements = []
-    sorted_acts = sorted(driver.activities, key=lambda a: a.start)
+    sorted_acts = sorted_activities
+    if sorted_acts is None:
+        sorted_acts = sorted(driver.activities, key=lambda a: a.start)
 
     if not sorted_acts:
         return infringements
 
-    rest_periods = _find_long_rest_periods(sorted_acts)
+    if rest_periods is None:
+        rest_periods = _find_rest_periods(sorted_acts)
+    all_rest_periods = rest_periods
+    rest_periods = [
+        period for period in all_rest_periods
+        if period[2] >= REDUCED_WEEKLY_REST * 0.5
+    ]
 
     # Filtrer les repos qualifiants comme repos hebdomadaires (>= 24h)
     weekly_rests = [
@@ -119,6 +204,7 @@ def check_weekly_rest(driver: DriverActivity) -> List[Infringement]:
                     date=first_act.start.date(),
                     driver_name=driver.driver_name,
                     card_number=driver.card_number,
+                    period_start=first_act.start,
                 ))
             return infringements
 
@@ -140,17 +226,11 @@ def check_weekly_rest(driver: DriverActivity) -> List[Infringement]:
                 date=end1.date(),
                 driver_name=driver.driver_name,
                 card_number=driver.card_number,
+                period_start=end1,
             ))
 
-    # Vérifier les repos insuffisants
-    for rest_start, rest_end, duration_min in weekly_rests:
-        if duration_min >= NORMAL_WEEKLY_REST:
-            continue  # OK
-
-        if duration_min >= REDUCED_WEEKLY_REST:
-            # Repos réduit — pas d'infraction immédiate mais signalement
-            # La compensation doit avoir lieu avant la fin de la 3ème semaine
-            # (nécessite un suivi sur plusieurs semaines, simplifié ici)
-            continue
+    # 3. Compensation des repos réduits avant la fin de la 3ème semaine suivante
+    observed_until = max(act.end for act in sorted_acts)
+    _check_reduced_rest_compensation(driver, all_rest_periods, observed_until, infringements)
 
     return infringements
@@ -0,0 +1,282 @@
+"""Mode shadow : double exécution moteur de référence / moteur optimisé.
+
+Le moteur optimisé (``analyze`` : registre, entrées partagées, tranches de
+fenêtre, cache) doit rester strictement équivalent au moteur de référence,
+qui appelle chaque règle seule sur la timeline complète, sans entrée
+partagée ni cache, puis ne garde que les infractions de la fenêtre
+demandée. Une fraction des analyses de production (SHADOW_SAMPLE_RATE,
+0 par défaut) passe par les deux moteurs ; en cas de divergence, la
+timeline est réduite (delta debugging) à un sous-ensemble minimal
+d'activités qui diverge encore, et celui-ci est journalisé depuis un
+thread de fond pour ne pas retarder l'analyse.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import date
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from engine.infringement_engine import analyze
+from engine.registry import get_rules
+from models.activity import Activity, DriverActivity
+from models.infringement import Infringement
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "0"))
+MAX_SHRINK_STEPS = 200
+# Divergences en attente de réduction au-delà desquelles on journalise sans réduire
+MAX_PENDING_MISMATCHES = int(os.environ.get("SHADOW_MAX_PENDING", "8"))
+
+
+def reference_analyze(
+    driver_activity: DriverActivity,
+    articles: Optional[Iterable[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Infringement]:
+    """Moteur de référence : chaque règle calcule elle-même ses entrées.
+
+    Toujours sur la timeline complète ; la fenêtre ne filtre que le résultat.
+    """
+    infringements: List[Infringement] = []
+    for r in get_rules(articles):
+        infringements.extend(r.check(driver_activity))
+    infringements.sort(key=lambda i: i.date)
+    return [
+        inf for inf in infringements
+        if (start is None or inf.date >= start) and (end is None or inf.date <= end)
+    ]
+
+
+def optimized_analyze(
+    driver_activity: DriverActivity,
+    articles: Optional[Iterable[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Infringement]:
+    """Moteur optimisé, hors cache (le cache masquerait une divergence)."""
+    return analyze(driver_activity, start, end, articles=articles, use_cache=False)
+
+
+def _signature(infringements: List[Infringement]) -> List[Tuple]:
+    """Forme comparable d'un résultat, indépendante de l'ordre à date égale."""
+    return sorted(
+        (
+            inf.article, inf.date.isoformat(), inf.rule_description, inf.severity.value,
+            round(inf.value, 2), round(inf.limit, 2), round(inf.excess, 2),
+        )
+        for inf in infringements
+    )
+
+
+def diverges(
+    driver_activity: DriverActivity,
+    articles: Optional[Sequence[str]] = None,
+    reference: Callable = reference_analyze,
+    optimized: Callable = optimized_analyze,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> bool:
+    """True si les deux moteurs ne donnent pas les mêmes infractions sur la fenêtre."""
+    return _signature(reference(driver_activity, articles, start, end)) != _signature(
+        optimized(driver_activity, articles, start, end)
+    )
+
+
+def shrink_divergence(
+    driver_activity: DriverActivity,
+    articles: Optional[Sequence[str]] = None,
+    reference: Callable = reference_analyze,
+    optimized: Callable = optimized_analyze,
+    max_steps: int = MAX_SHRINK_STEPS,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> DriverActivity:
+    """Réduit la timeline à un sous-ensemble minimal qui diverge encore (ddmin).
+
+    ``max_steps`` borne le nombre de doubles analyses ; le résultat est
+    alors le plus petit sous-ensemble trouvé.
+    """
+    steps = 0
+
+    def still_diverges(activities: List[Activity]) -> bool:
+        nonlocal steps
+        steps += 1
+        candidate = driver_activity.model_copy(update={"activities": activities})
+        return diverges(candidate, articles, reference, optimized, start, end)
+
+    activities = list(driver_activity.activities)
+    granularity = 2
+    while len(activities) >= 2 and steps < max_steps:
+        chunk = max(1, len(activities) // granularity)
+        subsets = [activities[i:i + chunk] for i in range(0, len(activities), chunk)]
+        reduced = False
+
+        for i, subset in enumerate(subsets):
+            if steps >= max_steps:
+                break
+            if still_diverges(subset):
+                activities, granularity, reduced = subset, 2, True
+                break
+            complement = [a for j, s in enumerate(subsets) if j != i for a in s]
+            if len(subsets) > 2 and still_diverges(complement):
+                activities, granularity, reduced = complement, max(granularity - 1, 2), True
+                break
+
+        if not reduced:
+            if granularity >= len(activities):
+                break
+            granularity = min(granularity * 2, len(activities))
+
+    return driver_activity.model_copy(update={"activities": activities})
+
+
+class ShadowStats:
+    """Compteurs du mode shadow (analyses comparées, divergences)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compared = 0
+        self.mismatches = 0
+
+    def record(self, mismatch: bool) -> None:
+        with self._lock:
+            self.compared += 1
+            if mismatch:
+                self.mismatches += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"compared": self.compared, "mismatches": self.mismatches}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.compared = 0
+            self.mismatches = 0
+
+
+shadow_stats = ShadowStats()
+
+
+def _log_mismatch(
+    driver_activity: DriverActivity,
+    articles: Optional[Sequence[str]],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> None:
+    minimal = shrink_divergence(driver_activity, articles, start=start, end=end)
+    logger.warning(
+        "Divergence moteur de référence / moteur optimisé (carte %s, %d activités -> %d) : %s",
+        driver_activity.card_number,
+        len(driver_activity.activities),
+        len(minimal.activities),
+        json.dumps({
+            "articles": list(articles) if articles else None,
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "activities": [a.model_dump(mode="json") for a in minimal.activities],
+            "reference": [
+                i.model_dump(mode="json") for i in reference_analyze(minimal, articles, start, end)
+            ],
+            "optimized": [
+                i.model_dump(mode="json") for i in optimized_analyze(minimal, articles, start, end)
+            ],
+        }, ensure_ascii=False),
+    )
+
+
+class MismatchLogger:
+    """Réduit et journalise les divergences dans un thread de fond.
+
+    La réduction coûte jusqu'à MAX_SHRINK_STEPS doubles analyses : elle ne
+    doit pas s'exécuter dans la requête qui a été échantillonnée. La file
+    est bornée ; quand elle est pleine, la divergence est journalisée sans
+    réduction.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_MISMATCHES):
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        driver_activity: DriverActivity,
+        articles: Optional[Sequence[str]],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> bool:
+        """Met la divergence en file ; False si la file est pleine."""
+        # Copie de la liste : l'appelant peut modifier sa timeline ensuite
+        snapshot = driver_activity.model_copy(
+            update={"activities": list(driver_activity.activities)}
+        )
+        try:
+            self._queue.put_nowait((snapshot, articles, start, end))
+        except queue.Full:
+            logger.warning(
+                "Divergence moteur de référence / moteur optimisé (carte %s, %d activités), "
+                "non réduite : %d divergences déjà en attente",
+                driver_activity.card_number, len(driver_activity.activities),
+                self._queue.maxsize,
+            )
+            return False
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="shadow-mismatch", daemon=True
+                )
+                self._thread.start()
+        return True
+
+    def wait(self) -> None:
+        """Attend que les divergences en file soient journalisées."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                _log_mismatch(*item)
+            except Exception:
+                logger.exception("Échec de la réduction d'une divergence")
+            finally:
+                self._queue.task_done()
+
+
+mismatch_logger = MismatchLogger()
+
+
+def analyze_shadowed(
+    driver_activity: DriverActivity,
+    articles: Optional[Iterable[str]] = None,
+    sample_rate: Optional[float] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Infringement]:
+    """``analyze`` avec comparaison au moteur de référence sur un échantillon.
+
+    Le résultat retourné est toujours celui du moteur optimisé ; la
+    comparaison n'a d'effet que sur les journaux et ``shadow_stats``. La
+    réduction d'une divergence est confiée à ``mismatch_logger``.
+    """
+    if isinstance(articles, str):
+        articles = (articles,)
+    elif articles is not None:
+        articles = tuple(articles)
+    infringements = analyze(driver_activity, start, end, articles=articles)
+
+    rate = DEFAULT_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate > 0 and random.random() < rate:
+        mismatch = _signature(
+            reference_analyze(driver_activity, articles, start, end)
+        ) != _signature(infringements)
+        shadow_stats.record(mismatch)
+        if mismatch:
+            mismatch_logger.submit(driver_activity, articles, start, end)
+    return infringements
@@ -0,0 +1,231 @@
+"""Évaluation de plannings hypothétiques (what-if) sur l'historique d'un conducteur.
+
+Pour chaque planning candidat (suite d'activités futures), retourne les
+infractions que ce planning provoquerait compte tenu de l'historique réel
+récent. Les entrées dérivées de l'historique (minutes de conduite par
+jour, périodes de repos, infractions déjà présentes) sont calculées une
+seule fois puis partagées par tous les candidats : seule la partie propre
+à chaque candidat est recalculée.
+"""
+
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from engine.infringement_engine import rule_bounds
+from engine.registry import AnalysisContext, Rule, get_rules, run_rules
+# Import des modules de règles : enregistre Art. 6.1 à 8.6 dans le registre
+from engine.rules import breaks, daily_rest, driving_time, weekly_rest  # noqa: F401
+from engine.rules.daily_rest import _find_rest_periods
+from engine.rules.driving_time import _driving_minutes_per_day
+from models.activity import (
+    Activity,
+    ActivityType,
+    DriverActivity,
+    pack_driver_activity,
+    unpack_driver_activity,
+)
+from models.infringement import Infringement
+
+RestPeriod = Tuple[datetime, datetime, float]
+
+
+def _infringement_key(inf: Infringement) -> tuple:
+    return (inf.article, inf.date, inf.rule_description, inf.value, inf.excess)
+
+
+class _Tail:
+    """Historique utile à un groupe de règles et ses entrées dérivées."""
+
+    def __init__(self, activities: List[Activity]):
+        self.activities = activities
+        self.daily_minutes: Dict[Any, float] = {}
+        self.rest_periods: List[RestPeriod] = []
+        self.baseline: set = set()
+
+
+class HistoryContext:
+    """Entrées dérivées de l'historique, partagées par tous les candidats.
+
+    Chaque règle ne reçoit que l'historique de sa marge (voir
+    infringement_engine.rule_bounds) : les règles à marge courte
+    (Art. 6, 7) ne repassent pas sur tout l'historique pour chaque
+    candidat, même si une autre règle sélectionnée en a besoin.
+    """
+
+    def __init__(
+        self,
+        history: DriverActivity,
+        plan_start: datetime,
+        articles: Optional[Tuple[str, ...]] = None,
+    ):
+        self.articles = articles
+        self.driver_name = history.driver_name
+        self.card_number = history.card_number
+
+        # Historique utile : la marge des règles avant le début du planning,
+        # l'activité en cours étant coupée au début du planning
+        activities = history.activities
+        last = bisect_left(activities, plan_start, key=lambda a: a.start)
+        tails: Dict[int, _Tail] = {}
+        self.rules: List[Tuple[Rule, _Tail]] = []
+        for r in get_rules(articles):
+            first = rule_bounds(activities, r, plan_start, None)[0] if activities else 0
+            tail = tails.get(first)
+            if tail is None:
+                tail = tails[first] = _Tail(self._clip(activities[first:last], plan_start))
+            self.rules.append((r, tail))
+
+        for tail in tails.values():
+            tail.daily_minutes = _driving_minutes_per_day(self._driver(tail.activities))
+            tail.rest_periods = _find_rest_periods(tail.activities)
+            tail_driver = self._driver(tail.activities)
+            context = AnalysisContext(
+                tail_driver, self._seed(tail.activities, tail.daily_minutes, tail.rest_periods)
+            )
+            tail_articles = tuple(r.article for r, t in self.rules if t is tail)
+            tail.baseline = {
+                _infringement_key(inf)
+                for inf in run_rules(tail_driver, tail_articles, context)
+            }
+
+        # Historique le plus long, transmis aux workers
+        self.tail = max((t.activities for t in tails.values()), key=len, default=[])
+
+    @staticmethod
+    def _clip(activities: List[Activity], plan_start: datetime) -> List[Activity]:
+        tail = []
+        for act in activities:
+            if act.end > plan_start:
+                act = act.model_copy(update={
+                    "end": plan_start,
+                    "duration_minutes": int((plan_start - act.start).total_seconds() / 60),
+                })
+                if act.duration_minutes <= 0:
+                    continue
+            tail.append(act)
+        return tail
+
+    def _driver(self, activities: List[Activity]) -> DriverActivity:
+        return DriverActivity.model_construct(
+            driver_name=self.driver_name,
+            card_number=self.card_number,
+            activities=activities,
+        )
+
+    @staticmethod
+    def _seed(activities, daily_minutes, rest_periods) -> Dict[str, Any]:
+        return {
+            "sorted_activities": activities,
+            "daily_driving_minutes": daily_minutes,
+            "rest_periods": rest_periods,
+        }
+
+    @staticmethod
+    def _join_rest_periods(tail: _Tail, candidate: List[Activity]) -> List[RestPeriod]:
+        """Périodes de repos historique + candidat, fusionnées à la jonction."""
+        candidate_periods = _find_rest_periods(candidate)
+        if not (tail.rest_periods and candidate_periods and tail.activities):
+            return tail.rest_periods + candidate_periods
+
+        last_act, first_act = tail.activities[-1], candidate[0]
+        h_start, h_end, _ = tail.rest_periods[-1]
+        c_start, c_end, _ = candidate_periods[0]
+        if (last_act.type == ActivityType.REST and first_act.type == ActivityType.REST
+                and c_start <= h_end + timedelta(minutes=1)):
+            end = max(h_end, c_end)
+            merged = (h_start, end, (end - h_start).total_seconds() / 60.0)
+            return tail.rest_periods[:-1] + [merged] + candidate_periods[1:]
+        return tail.rest_periods + candidate_periods
+
+    def evaluate(self, candidate: Sequence[Activity]) -> List[Infringement]:
+        """Infractions provoquées par un candidat (absentes de l'historique seul)."""
+        candidate = sorted(candidate, key=lambda a: a.start)
+        candidate_minutes = _driving_minutes_per_day(self._driver(candidate))
+        contexts: Dict[int, AnalysisContext] = {}
+        infringements: List[Infringement] = []
+
+        for r, tail in self.rules:
+            context = contexts.get(id(tail))
+            if context is None:
+                activities = tail.activities + candidate
+                daily_minutes = dict(tail.daily_minutes)
+                for day, minutes in candidate_minutes.items():
+                    daily_minutes[day] = daily_minutes.get(day, 0.0) + minutes
+                context = contexts[id(tail)] = AnalysisContext(
+                    self._driver(activities),
+                    self._seed(activities, daily_minutes, self._join_rest_periods(tail, candidate)),
+                )
+            infringements.extend(
+                inf for inf in run_rules(context.driver, (r.article,), context)
+                if _infringement_key(inf) not in tail.baseline
+            )
+        # Même ordre qu'une analyse complète : règles puis date
+        infringements.sort(key=lambda i: i.date)
+        return infringements
+
+
+def _evaluate_chunk(
+    packed_history: tuple,
+    plan_start: datetime,
+    articles: Optional[Tuple[str, ...]],
+    chunk: List[Tuple[int, List[Activity]]],
+) -> List[Tuple[int, List[Infringement]]]:
+    """Exécuté dans un processus worker : contexte historique recalculé une fois par lot."""
+    history = HistoryContext(unpack_driver_activity(packed_history), plan_start, articles)
+    return [(index, history.evaluate(candidate)) for index, candidate in chunk]
+
+
+def evaluate_candidates(
+    history: DriverActivity,
+    candidates: Sequence[Sequence[Activity]],
+    articles: Optional[Iterable[str]] = None,
+    workers: int = 1,
+) -> List[List[Infringement]]:
+    """Évalue N plannings candidats contre l'historique d'un conducteur.
+
+    Args:
+        history: Timeline réelle du conducteur (triée par début)
+        candidates: Plannings hypothétiques, chacun une liste d'activités futures
+        articles: Articles à vérifier (toutes les règles si None)
+        workers: Nombre de processus ; au-delà de 1, les candidats sont
+            répartis par lots et chaque worker calcule le contexte une fois
+
+    Returns:
+        Pour chaque candidat (même ordre), les infractions qu'il provoquerait
+    """
+    if isinstance(articles, str):
+        articles = (articles,)
+    elif articles is not None:
+        articles = tuple(articles)
+
+    starts = [min(a.start for a in c) for c in candidates if c]
+    if not starts:
+        return [[] for _ in candidates]
+    plan_start = min(starts)
+
+    results: List[List[Infringement]] = [[] for _ in candidates]
+    indexed = [(i, list(c)) for i, c in enumerate(candidates) if c]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(indexed)))
+
+    context = HistoryContext(history, plan_start, articles)
+    if workers == 1:
+        for index, candidate in indexed:
+            results[index] = context.evaluate(candidate)
+        return results
+
+    # Les workers ne reçoivent que l'historique utile (la marge des règles)
+    packed = pack_driver_activity(context._driver(context.tail))
+    chunksize = -(-len(indexed) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_evaluate_chunk, packed, plan_start, articles,
+                        indexed[offset:offset + chunksize])
+            for offset in range(0, len(indexed), chunksize)
+        ]
+        for future in futures:
+            for index, infringements in future.result():
+                results[index] = infringements
+    return results
@@ -0,0 +1,73 @@
+"""Journal des événements de progression des jobs (flux SSE).
+
+Les workers publient les étapes de chaque job ; les abonnés (route
+GET /jobs/{id}/events) relisent le journal depuis leur position et
+attendent la suite dans leur boucle asyncio, sans occuper de thread :
+``publish`` (appelé depuis les workers) les réveille avec
+``call_soon_threadsafe``. Le journal est en mémoire et limité aux derniers
+jobs : après un redémarrage, seul l'état final du job (file de jobs)
+reste disponible.
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+Event = Tuple[int, str, dict]  # (numéro, nom, données)
+Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Event]
+
+TERMINAL_EVENTS = ("done", "failed")
+MAX_JOBS = 256
+
+
+class JobEvents:
+    """Événements numérotés par job, avec attente des suivants."""
+
+    def __init__(self, max_jobs: int = MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._logs: "OrderedDict[str, List[Event]]" = OrderedDict()
+        self._waiters: Dict[str, Set[Waiter]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, job_id: str, event: str, data: Optional[dict] = None) -> None:
+        with self._lock:
+            log = self._logs.setdefault(job_id, [])
+            self._logs.move_to_end(job_id)
+            log.append((len(log), event, data or {}))
+            while len(self._logs) > self.max_jobs:
+                self._logs.popitem(last=False)
+            waiters = list(self._waiters.get(job_id, ()))
+        for loop, ready in waiters:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # boucle fermée : l'abonné est parti
+
+    def known(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._logs
+
+    async def wait(self, job_id: str, cursor: int, timeout: float) -> List[Event]:
+        """Événements à partir de ``cursor`` ; attend au plus ``timeout`` s s'il n'y en a pas."""
+        waiter: Waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            events = list(self._logs.get(job_id, ())[cursor:])
+            if events:
+                return events
+            self._waiters.setdefault(job_id, set()).add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[job_id]
+                return list(self._logs.get(job_id, ())[cursor:])
+
+
+job_events = JobEvents()
@@ -0,0 +1,260 @@
+"""Files de jobs d'analyse : interface et implémentations.
+
+``JobQueue`` est l'interface attendue par les workers et les routes ;
+``SQLiteJobQueue`` est l'implémentation par défaut (durable : les jobs
+en attente ou interrompus par un arrêt brutal sont repris),
+``InMemoryJobQueue`` sert aux tests et aux déploiements sans disque.
+
+Un job en cours appartient au worker qui l'a pris (``owner``) et porte
+un bail (``heartbeat_at``) que ce worker renouvelle. Seuls les jobs dont
+le bail a expiré sont remis en attente : plusieurs processus peuvent
+partager la même file sans reprendre les jobs des autres.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from models.job import Job, JobStatus
+
+DEFAULT_QUEUE_PATH = Path(__file__).parent.parent / "data" / "jobs" / "queue.db"
+# Un job dont le bail n'a pas été renouvelé depuis ce délai est considéré abandonné
+LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "60"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _timestamp(value: datetime) -> str:
+    # Précision fixe : les horodatages sont comparés comme chaînes en SQL
+    return value.isoformat(timespec="microseconds")
+
+
+def new_job(filename: str, file_type: str, path: str) -> Job:
+    return Job(
+        id=uuid.uuid4().hex, filename=filename, file_type=file_type,
+        path=path, created_at=_now(),
+    )
+
+
+class JobQueue(ABC):
+    """File de jobs partagée entre l'API (dépôt, suivi) et les workers."""
+
+    @abstractmethod
+    def enqueue(self, job: Job) -> Job:
+        """Ajoute un job en attente."""
+
+    @abstractmethod
+    def claim(self, owner: Optional[str] = None) -> Optional[Job]:
+        """Prend le plus ancien job en attente et le passe en cours (None si vide).
+
+        ``owner`` identifie le worker ; le bail du job part de maintenant.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, owner: Optional[str] = None) -> bool:
+        """Renouvelle le bail d'un job en cours ; False s'il n'appartient plus à ``owner``."""
+
+    @abstractmethod
+    def complete(self, job_id: str, result: dict) -> None:
+        """Marque un job terminé avec son résultat."""
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str) -> None:
+        """Marque un job en échec."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne un job, quel que soit son état."""
+
+    def recover(self, lease: float = LEASE_SECONDS) -> int:
+        """Remet en attente les jobs en cours dont le bail a expiré. Retourne leur nombre."""
+        return 0
+
+
+class InMemoryJobQueue(JobQueue):
+    """File en mémoire (non durable)."""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enqueue(self, job: Job) -> Job:
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def claim(self, owner: Optional[str] = None) -> Optional[Job]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JobStatus.QUEUED:
+                    now = _now()
+                    job.status, job.started_at = JobStatus.RUNNING, now
+                    job.owner, job.heartbeat_at = owner, now
+                    return job.model_copy()
+        return None
+
+    def heartbeat(self, job_id: str, owner: Optional[str] = None) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JobStatus.RUNNING or job.owner != owner:
+                return False
+            job.heartbeat_at = _now()
+            return True
+
+    def complete(self, job_id: str, result: dict) -> None:
+        self._finish(job_id, JobStatus.DONE, result=result)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, JobStatus.FAILED, error=error)
+
+    def _finish(self, job_id: str, status: JobStatus, **fields) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status, job.finished_at = status, _now()
+            for name, value in fields.items():
+                setattr(job, name, value)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+
+class SQLiteJobQueue(JobQueue):
+    """File durable dans une base SQLite dédiée."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = str(db_path or DEFAULT_QUEUE_PATH)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    heartbeat_at TIMESTAMP
+                )
+            """)
+            # Migration : bases créées avant les baux
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("owner TEXT", "heartbeat_at TIMESTAMP"):
+                if column.split()[0] not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        data: Dict = dict(row)
+        data["result"] = json.loads(data["result"]) if data["result"] else None
+        return Job(**data)
+
+    def enqueue(self, job: Job) -> Job:
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO jobs (id, status, filename, file_type, path, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (job.id, job.status.value, job.filename, job.file_type, job.path,
+                 job.created_at.isoformat()),
+            )
+        return job
+
+    def claim(self, owner: Optional[str] = None) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE : un seul worker à la fois sélectionne et réserve un job
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JobStatus.QUEUED.value,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            started_at = _now()
+            conn.execute(
+                """UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ?
+                   WHERE id = ?""",
+                (JobStatus.RUNNING.value, started_at.isoformat(), owner,
+                 _timestamp(started_at), row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = self._to_job(row)
+        job.status, job.started_at = JobStatus.RUNNING, started_at
+        job.owner, job.heartbeat_at = owner, started_at
+        return job
+
+    def heartbeat(self, job_id: str, owner: Optional[str] = None) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET heartbeat_at = ?
+                   WHERE id = ? AND status = ? AND owner IS ?""",
+                (_timestamp(_now()), job_id, JobStatus.RUNNING.value, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ? WHERE id = ?",
+                (JobStatus.DONE.value, _now().isoformat(), json.dumps(result, default=str), job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (JobStatus.FAILED.value, _now().isoformat(), error, job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def recover(self, lease: float = LEASE_SECONDS) -> int:
+        expired = _timestamp(_now() - timedelta(seconds=lease))
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = ?, started_at = NULL, owner = NULL, heartbeat_at = NULL
+                   WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)""",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value, expired),
+            )
+            return cursor.rowcount
+
+
+def create_queue(url: Optional[str] = None) -> JobQueue:
+    """File décrite par une URL : ``memory://`` ou ``sqlite:///chemin`` (défaut)."""
+    if url == "memory://":
+        return InMemoryJobQueue()
+    if url and url.startswith("sqlite:///"):
+        return SQLiteJobQueue(url[len("sqlite:///"):])
+    if url:
+        raise ValueError(f"File de jobs inconnue : {url}")
+    return SQLiteJobQueue()
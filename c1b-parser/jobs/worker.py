@@ -0,0 +1,132 @@
+"""Pool de workers qui exécutent les jobs d'analyse en arrière-plan.
+
+Chaque worker prend un job dans la file, fait passer le fichier stocké
+par la chaîne de ``api.pipeline`` (décodage, normalisation, analyse,
+enregistrement) puis supprime le fichier. Les workers sont réveillés à
+chaque dépôt et interrogent la file périodiquement (jobs repris après un
+arrêt brutal, dépôts d'un autre processus).
+
+Le pool renouvelle le bail de ses jobs en cours et remet en attente ceux
+dont le bail a expiré (worker d'un processus arrêté brutalement).
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Optional, Set
+
+from api.pipeline import process_file
+from jobs.events import job_events
+from jobs.queue import LEASE_SECONDS, JobQueue
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+POLL_INTERVAL = 1.0
+
+
+def run_job(job: Job) -> dict:
+    """Traite le fichier d'un job et retourne le résultat (format de /upload).
+
+    La progression est publiée dans ``job_events``.
+    """
+    def progress(event: str, data: dict) -> None:
+        job_events.publish(job.id, event, data)
+
+    results = process_file(job.path, job.filename, job.file_type, progress)
+    return {
+        "filename": job.filename,
+        "file_type": job.file_type,
+        "drivers_found": len(results),
+        "results": results,
+    }
+
+
+class WorkerPool:
+    """Threads qui vident la file de jobs."""
+
+    def __init__(self, queue: JobQueue, workers: int = DEFAULT_WORKERS,
+                 poll_interval: float = POLL_INTERVAL, lease: float = LEASE_SECONDS):
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.lease = lease
+        # Identifie ce pool parmi les processus qui partagent la file
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._recover()
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Arrête les workers après leur job en cours."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Signale un nouveau job aux workers en attente."""
+        self._wakeup.set()
+
+    def _recover(self) -> None:
+        recovered = self.queue.recover(self.lease)
+        if recovered:
+            logger.info("%d job(s) abandonné(s) remis en attente", recovered)
+            self._wakeup.set()
+
+    def _heartbeat(self) -> None:
+        """Renouvelle les baux des jobs en cours et reprend les baux expirés."""
+        while not self._stopping.wait(self.lease / 3):
+            with self._running_lock:
+                running = list(self._running)
+            for job_id in running:
+                if not self.queue.heartbeat(job_id, self.owner):
+                    logger.warning("Bail du job %s perdu par %s", job_id, self.owner)
+            self._recover()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            job = self.queue.claim(self.owner)
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            with self._running_lock:
+                self._running.add(job.id)
+            try:
+                self._process(job)
+            finally:
+                with self._running_lock:
+                    self._running.discard(job.id)
+
+    def _process(self, job: Job) -> None:
+        job_events.publish(job.id, "running")
+        try:
+            result = run_job(job)
+        except Exception as e:
+            logger.warning("Job %s (%s) en échec : %s", job.id, job.filename, e)
+            self.queue.fail(job.id, str(e))
+            job_events.publish(job.id, "failed", {"error": str(e)})
+        else:
+            self.queue.complete(job.id, result)
+            job_events.publish(job.id, "done", {"result": result})
+        finally:
+            Path(job.path).unlink(missing_ok=True)
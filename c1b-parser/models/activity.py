@@ -1,8 +1,9 @@
 """Modèles de données pour les activités conducteur tachygraphiques."""
 
-from datetime import datetime
+from array import array
+from datetime import datetime, timedelta, tzinfo
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -39,3 +40,109 @@ class DriverActivity(BaseModel):
 
     def rest_activities(self) -> List[Activity]:
         return [a for a in self.activities if a.type == ActivityType.REST]
+
+    def activities_between(self, start: datetime, end: datetime) -> List[Activity]:
+        """Activités qui chevauchent [start, end), par recherche dichotomique.
+
+        Suppose les activités triées par début (garanti par normalize_*).
+        """
+        acts = self.activities
+        lo, hi = 0, len(acts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if acts[mid].start < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = lo
+        # Inclure les activités commencées avant start mais encore en cours
+        while first > 0 and acts[first - 1].end > start:
+            first -= 1
+
+        lo, hi = lo, len(acts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if acts[mid].start < end:
+                lo = mid + 1
+            else:
+                hi = mid
+        return acts[first:lo]
+
+
+# Forme compacte d'une DriverActivity, utilisée pour transmettre des timelines
+# entre processus sans sérialiser une liste de modèles Pydantic.
+# (driver_name, card_number, tzinfo, types, starts, ends, durations, regs, reg_table)
+# - types : bytes, index dans ACTIVITY_TYPE_CODES
+# - starts / ends : array("q") en secondes epoch
+# - durations : array("l") en minutes
+# - regs : array("l"), index dans reg_table (-1 = pas d'immatriculation)
+ACTIVITY_TYPE_CODES: List[ActivityType] = list(ActivityType)
+_TYPE_INDEX = {t: i for i, t in enumerate(ACTIVITY_TYPE_CODES)}
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch_seconds(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        return (dt - _NAIVE_EPOCH) // timedelta(seconds=1)
+    return int(dt.timestamp())
+
+
+def _from_epoch_seconds(seconds: int, tz: Optional[tzinfo]) -> datetime:
+    if tz is None:
+        return _NAIVE_EPOCH + timedelta(seconds=seconds)
+    return datetime.fromtimestamp(seconds, tz=tz)
+
+
+def pack_driver_activity(driver: DriverActivity) -> tuple:
+    """Encode une DriverActivity sous forme compacte (tableaux parallèles).
+
+    Le fuseau de la première activité est conservé et réappliqué à toutes
+    les activités au décodage (les timelines normalisées sont en UTC).
+    """
+    tz = driver.activities[0].start.tzinfo if driver.activities else None
+    types = bytearray()
+    starts = array("q")
+    ends = array("q")
+    durations = array("l")
+    regs = array("l")
+    reg_table: List[str] = []
+    reg_index: Dict[str, int] = {}
+
+    for act in driver.activities:
+        types.append(_TYPE_INDEX[act.type])
+        starts.append(_to_epoch_seconds(act.start))
+        ends.append(_to_epoch_seconds(act.end))
+        durations.append(act.duration_minutes)
+        reg = act.vehicle_registration
+        if reg is None:
+            regs.append(-1)
+        else:
+            if reg not in reg_index:
+                reg_index[reg] = len(reg_table)
+                reg_table.append(reg)
+            regs.append(reg_index[reg])
+
+    return (
+        driver.driver_name, driver.card_number, tz,
+        bytes(types), starts, ends, durations, regs, reg_table,
+    )
+
+
+def unpack_driver_activity(packed: tuple) -> DriverActivity:
+    """Reconstruit une DriverActivity depuis pack_driver_activity()."""
+    driver_name, card_number, tz, types, starts, ends, durations, regs, reg_table = packed
+    activities = [
+        Activity.model_construct(
+            type=ACTIVITY_TYPE_CODES[types[i]],
+            start=_from_epoch_seconds(starts[i], tz),
+            end=_from_epoch_seconds(ends[i], tz),
+            duration_minutes=durations[i],
+            vehicle_registration=reg_table[regs[i]] if regs[i] >= 0 else None,
+        )
+        for i in range(len(types))
+    ]
+    return DriverActivity.model_construct(
+        driver_name=driver_name,
+        card_number=card_number,
+        activities=activities,
+    )
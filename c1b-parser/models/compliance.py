@@ -0,0 +1,28 @@
+"""Modèle de l'état de conformité courant d'un conducteur."""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ComplianceState(BaseModel):
+    """Accumulateurs des règles 561/2006, mis à jour à chaque ingestion.
+
+    Permet de répondre sans ré-analyser l'historique : temps de conduite
+    restant, pause et repos à venir.
+    """
+    card_number: str
+    last_activity_end: Optional[datetime] = None
+    # Art. 7 : conduite depuis la dernière pause qualifiante
+    driving_since_break_minutes: float = 0.0
+    split_break_started: bool = False
+    # Art. 6.1 à 6.3 : minutes de conduite par jour (ISO date), 3 dernières semaines
+    daily_driving_minutes: Dict[str, float] = {}
+    # Art. 8.2 / 8.6 : bloc de repos en cours et fin des derniers repos
+    rest_block_start: Optional[datetime] = None
+    rest_block_end: Optional[datetime] = None
+    last_daily_rest_end: Optional[datetime] = None
+    last_weekly_rest_end: Optional[datetime] = None
+    # Art. 8.2 : repos journaliers réduits depuis le dernier repos hebdomadaire
+    reduced_daily_rests: int = 0
@@ -1,6 +1,6 @@
 """Modèles de données pour les infractions détectées."""
 
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 
@@ -26,3 +26,6 @@ class Infringement(BaseModel):
     driver_name: str
     card_number: str
     details: Optional[str] = None
+    # Début de la période en infraction : identifie l'événement d'un
+    # téléchargement à l'autre (None : la date — jour ou semaine — suffit)
+    period_start: Optional[datetime] = None
@@ -0,0 +1,30 @@
+"""Modèle d'un job d'analyse asynchrone."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """Un fichier à analyser hors de la requête HTTP."""
+    id: str
+    status: JobStatus = JobStatus.QUEUED
+    filename: str
+    file_type: str             # "card" ou "vu"
+    path: str                  # fichier stocké en attente de traitement
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    owner: Optional[str] = None            # worker qui exécute le job
+    heartbeat_at: Optional[datetime] = None  # bail renouvelé par ce worker
+    finished_at: Optional[datetime] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
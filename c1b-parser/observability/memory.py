@@ -0,0 +1,126 @@
+"""Traçage mémoire par étape, pour un échantillon de requêtes.
+
+Activé par MEMORY_TRACE_SAMPLE_RATE (0 par défaut : désactivé). Pour une
+requête échantillonnée, tracemalloc est démarré le temps de la requête ;
+chaque étape chronométrée par ``stage_timer`` (décodage, normalisation,
+analyse, enregistrement) relève :
+- le pic de mémoire tracée pendant l'étape, au-delà de la mémoire déjà
+  tracée à son début (histogramme tacho_stage_peak_memory_bytes) ;
+- la mémoire encore retenue en fin d'étape et ses principaux sites
+  d'allocation (journalisés).
+
+tracemalloc est global au processus : une seule requête est tracée à la
+fois, et les allocations des requêtes concurrentes sont comptées avec
+elle. Le surcoût (x2 à x4 sur les étapes tracées) justifie l'échantillonnage.
+"""
+
+import logging
+import os
+import random
+import threading
+import tracemalloc
+from contextvars import ContextVar
+from typing import List, Optional
+
+from observability.metrics import Histogram, registry, stage_hooks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = float(os.environ.get("MEMORY_TRACE_SAMPLE_RATE", "0"))
+TOP_ALLOCATION_SITES = int(os.environ.get("MEMORY_TRACE_TOP", "5"))
+MEMORY_BUCKETS = tuple(float(2 ** n) for n in range(20, 31))  # 1 Mo -> 1 Go
+
+STAGE_PEAK_MEMORY = Histogram(
+    "tacho_stage_peak_memory_bytes",
+    "Pic de mémoire Python allouée par étape (requêtes échantillonnées).",
+    ("stage", "file_type"),
+    buckets=MEMORY_BUCKETS,
+)
+registry.append(STAGE_PEAK_MEMORY)
+
+# Relevés de la requête tracée en cours (None si la requête n'est pas tracée)
+_memory_records: ContextVar[Optional[List[dict]]] = ContextVar("memory_records", default=None)
+_tracing_lock = threading.Lock()
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+class StageMemoryTracer:
+    """Observateur d'étapes (voir metrics.stage_hooks) relevant la mémoire."""
+
+    def begin(self, stage: str, file_type: str):
+        records = _memory_records.get()
+        if records is None or not tracemalloc.is_tracing():
+            return None
+        baseline = _snapshot() if TOP_ALLOCATION_SITES else None
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return records, stage, file_type, current, baseline
+
+    def end(self, state, outcome: str) -> None:
+        if state is None or not tracemalloc.is_tracing():
+            return
+        records, stage, file_type, start_bytes, baseline = state
+        current, peak = tracemalloc.get_traced_memory()
+        top = []
+        if baseline is not None:
+            top = [
+                {"site": str(diff.traceback[0]), "bytes": diff.size_diff}
+                for diff in _snapshot().compare_to(baseline, "lineno")[:TOP_ALLOCATION_SITES]
+                if diff.size_diff > 0
+            ]
+        peak_bytes = max(0, peak - start_bytes)
+        STAGE_PEAK_MEMORY.observe(peak_bytes, stage=stage, file_type=file_type)
+        records.append({
+            "stage": stage,
+            "file_type": file_type,
+            "outcome": outcome,
+            "peak_bytes": peak_bytes,
+            "retained_bytes": current - start_bytes,
+            "top_allocations": top,
+        })
+
+
+stage_hooks.append(StageMemoryTracer())
+
+
+def _log_records(method: str, path: str, records: List[dict]) -> None:
+    for record in records:
+        logger.info(
+            "Mémoire %s %s [%s/%s] pic %.0f Ko, retenu %.0f Ko, sites : %s",
+            method, path, record["stage"], record["file_type"],
+            record["peak_bytes"] / 1024, record["retained_bytes"] / 1024,
+            ", ".join(f"{s['site']} ({s['bytes'] / 1024:.0f} Ko)" for s in record["top_allocations"]),
+        )
+
+
+class MemoryTracingMiddleware:
+    """Middleware ASGI : trace la mémoire d'une fraction des requêtes HTTP."""
+
+    def __init__(self, app, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        rate = DEFAULT_SAMPLE_RATE if self.sample_rate is None else self.sample_rate
+        if (scope["type"] != "http" or rate <= 0 or random.random() >= rate
+                or tracemalloc.is_tracing() or not _tracing_lock.acquire(blocking=False)):
+            await self.app(scope, receive, send)
+            return
+
+        records: List[dict] = []
+        token = _memory_records.set(records)
+        tracemalloc.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tracemalloc.stop()
+            _memory_records.reset(token)
+            _tracing_lock.release()
+            _log_records(scope.get("method", ""), scope.get("path", ""), records)
@@ -0,0 +1,158 @@
+"""Métriques de latence par étape (décodage, normalisation, analyse, BDD, PDF).
+
+Chaque étape chronométrée par ``stage_timer`` alimente :
+- un histogramme Prometheus, exposé en texte par ``render_prometheus``
+  (endpoint /metrics), étiqueté par étape, type de fichier et issue ;
+- les durées de la requête en cours, renvoyées dans l'en-tête
+  ``Server-Timing`` par ``ServerTimingMiddleware``.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Histogramme cumulatif au format d'exposition Prometheus."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [compte par bucket (+Inf en dernier), somme]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted((k, ([*v[0]], v[1])) for k, v in self._series.items())
+        for key, (counts, total) in series:
+            labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+STAGE_SECONDS = Histogram(
+    "tacho_stage_duration_seconds",
+    "Durée des étapes du traitement (décodage, normalisation, analyse, BDD, PDF).",
+    ("stage", "file_type", "outcome"),
+)
+
+registry: List[Histogram] = [STAGE_SECONDS]
+
+
+def render_prometheus() -> str:
+    """Toutes les métriques, au format texte Prometheus."""
+    return "".join(metric.render() for metric in registry)
+
+
+# Observateurs supplémentaires des étapes (ex: traçage mémoire) :
+# begin(stage, file_type) -> état, puis end(état, issue) en fin d'étape
+stage_hooks: List = []
+
+# Durées des étapes de la requête HTTP en cours (None hors requête)
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def stage_timer(stage: str, file_type: str = "none") -> Iterator[None]:
+    """Chronomètre une étape ; l'issue vaut "error" si elle lève une exception."""
+    hooks = [(hook, hook.begin(stage, file_type)) for hook in stage_hooks]
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage, file_type=file_type, outcome=outcome)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+        for hook, state in reversed(hooks):
+            hook.end(state, outcome)
+
+
+def server_timing_header(timings: List[Tuple[str, float]]) -> str:
+    """Valeur de l'en-tête Server-Timing (durées cumulées par étape, en ms)."""
+    totals: Dict[str, float] = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+class ServerTimingMiddleware:
+    """Middleware ASGI : ajoute l'en-tête Server-Timing aux réponses HTTP.
+
+    Seules les étapes terminées avant l'envoi des en-têtes y figurent ; le
+    travail fait pendant le streaming du corps reste visible dans /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and timings:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
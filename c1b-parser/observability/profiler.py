@@ -0,0 +1,154 @@
+"""Profileur statistique par échantillonnage des piles de threads.
+
+Un thread échantillonneur lit ``sys._current_frames()`` à intervalle
+fixe et compte les piles rencontrées ; aucune instrumentation des
+fonctions, donc un surcoût faible et indépendant du code profilé. Le
+résultat est au format « collapsed stacks » (une pile par ligne, cadres
+séparés par « ; », suivie du nombre d'échantillons), directement
+utilisable par flamegraph.pl, speedscope ou inferno.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Callable, Iterable, Optional, Set
+
+DEFAULT_INTERVAL = 0.01  # 100 échantillons par seconde
+MAX_STORED_PROFILES = 32
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_name}"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Échantillonne les piles de tous les threads (ou de ``thread_ids``).
+
+    Le thread échantillonneur et ceux de ``exclude`` ne sont jamais comptés.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        thread_ids: Optional[Iterable[int]] = None,
+        exclude: Iterable[int] = (),
+    ):
+        self.interval = interval
+        self.thread_ids: Optional[Set[int]] = set(thread_ids) if thread_ids is not None else None
+        self.exclude = set(exclude)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id in self.exclude:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.samples[_collapse(frame)] += 1
+            self._stop.wait(self.interval)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def collapsed(self) -> str:
+        """Piles au format collapsed, les plus fréquentes en premier."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL) -> str:
+    """Profile tous les threads du processus pendant ``seconds`` secondes."""
+    profiler = SamplingProfiler(interval, exclude={threading.get_ident()}).start()
+    time.sleep(seconds)
+    profiler.stop()
+    return profiler.collapsed()
+
+
+class ProfileStore:
+    """Derniers profils par requête, consultables par identifiant."""
+
+    def __init__(self, max_entries: int = MAX_STORED_PROFILES):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, collapsed: str, profile_id: Optional[str] = None) -> str:
+        profile_id = profile_id or uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profile_store = ProfileStore()
+
+
+class RequestProfilerMiddleware:
+    """Middleware ASGI : profile une requête portant l'en-tête ``X-Profile``.
+
+    Seul le thread qui sert la requête est échantillonné (les routes
+    ``async`` comme /upload y exécutent décodage, normalisation, analyse
+    et enregistrement). ``authorize`` reçoit les en-têtes et décide si
+    l'appelant a le droit de profiler ; le profil est conservé dans
+    ``profile_store`` et son identifiant renvoyé dans ``X-Profile-Id``.
+    """
+
+    def __init__(self, app, authorize: Callable[[dict], bool], interval: float = DEFAULT_INTERVAL):
+        self.app = app
+        self.authorize = authorize
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", []))
+        if PROFILE_HEADER not in headers or not self.authorize(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profiler = SamplingProfiler(self.interval, thread_ids={threading.get_ident()}).start()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            profile_store.put(profiler.collapsed(), profile_id)
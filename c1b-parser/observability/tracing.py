@@ -0,0 +1,370 @@
+"""Traces de bout en bout d'une requête (spans imbriqués).
+
+Activé par TRACE_EXPORTER :
+- ``file:/chemin/traces.jsonl`` : une ligne OTLP/JSON par trace, lisible
+  par le récepteur ``otlpjsonfile`` d'un collecteur OpenTelemetry ;
+- ``http://collecteur:4318/v1/traces`` : envoi OTLP/HTTP JSON.
+
+Sans TRACE_EXPORTER, ``span`` ne fait rien. Le contexte W3C
+``traceparent`` reçu (proxy Next.js) est repris : la trace de l'API est
+rattachée à celle de l'appelant, et le ``traceparent`` du span racine est
+renvoyé dans la réponse.
+
+Les spans viennent de plusieurs sources :
+- le middleware (requête HTTP, réception du corps multipart) ;
+- ``span`` dans le code (écriture du fichier temporaire, sous-processus
+  dddparser, chargement JSON, blocs VU normalisés, tri par conducteur) ;
+- les étapes de ``stage_timer`` (via metrics.stage_hooks) ;
+- chaque règle et entrée partagée du moteur (via registry.metrics_sinks) ;
+- chaque requête SQL (``TracedConnection``).
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from observability.metrics import stage_hooks
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "c1b-parser"
+TRACEPARENT_HEADER = b"traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """Un intervalle de temps nommé d'une trace."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], start_ns: int, attributes):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.error = False
+
+    def finish(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self.trace.spans.append(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        payload = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2 if self.error else 1},
+        }
+        if self.parent_id:
+            payload["parentSpanId"] = self.parent_id
+        return payload
+
+
+class Trace:
+    """Spans terminés d'une requête, exportés ensemble à la fin."""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List[Span] = []
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp_json(spans: List[Span]) -> dict:
+    """Document OTLP/JSON (ExportTraceServiceRequest) pour une liste de spans."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": SERVICE_NAME},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }],
+    }
+
+
+class FileExporter:
+    """Ajoute une ligne OTLP/JSON par trace à un fichier."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(to_otlp_json(spans), separators=(",", ":"))
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class HttpExporter:
+    """Envoie chaque trace à un collecteur OTLP/HTTP (JSON)."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(to_otlp_json(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def exporter_from_env(value: Optional[str] = None):
+    """Exporteur décrit par TRACE_EXPORTER (None : traçage désactivé)."""
+    value = value if value is not None else os.environ.get("TRACE_EXPORTER", "")
+    if value.startswith("file:"):
+        return FileExporter(value[len("file:"):])
+    if value.startswith(("http://", "https://")):
+        return HttpExporter(value)
+    return None
+
+
+_configured_exporter: Tuple[Optional[str], Any] = (None, None)
+
+
+def configured_exporter():
+    """Exporteur courant, recréé seulement quand TRACE_EXPORTER change."""
+    global _configured_exporter
+    value = os.environ.get("TRACE_EXPORTER", "")
+    if _configured_exporter[0] != value:
+        _configured_exporter = (value, exporter_from_env(value))
+    return _configured_exporter[1]
+
+
+class _ExportWorker:
+    """Exporte les traces hors du chemin de la requête (thread dédié)."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple[Any, List[Span]]]" = queue.Queue(maxsize=1000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, exporter, spans: List[Span]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((exporter, spans))
+        except queue.Full:
+            logger.warning("File d'export des traces pleine : trace abandonnée")
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            exporter, spans = self._queue.get()
+            try:
+                exporter.export(spans)
+            except Exception as e:  # un collecteur indisponible ne doit pas casser l'API
+                logger.warning("Export de trace impossible : %s", e)
+            finally:
+                self._queue.task_done()
+
+
+export_worker = _ExportWorker()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes) -> Tuple[Optional[Span], Any]:
+    """Ouvre un span enfant du span courant (rien hors trace)."""
+    parent = _current_span.get()
+    if parent is None:
+        return None, None
+    child = Span(parent.trace, name, parent.span_id, time.time_ns(), attributes)
+    return child, _current_span.set(child)
+
+
+def end_span(child: Optional[Span], token, error: bool = False) -> None:
+    if child is None:
+        return
+    child.error = error
+    child.finish()
+    _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Span enfant du span courant ; sans trace active, ne fait rien."""
+    child, token = start_span(name, **attributes)
+    error = False
+    try:
+        yield child
+    except BaseException:
+        error = True
+        raise
+    finally:
+        end_span(child, token, error)
+
+
+def record_span(name: str, seconds: float, **attributes) -> None:
+    """Ajoute un span déjà terminé (durée mesurée ailleurs) sous le span courant."""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    end_ns = time.time_ns()
+    Span(parent.trace, name, parent.span_id, end_ns - int(seconds * 1e9), attributes).finish(end_ns)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, échantillonné) d'un en-tête W3C traceparent."""
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+class StageSpanHook:
+    """Observateur d'étapes (metrics.stage_hooks) : un span par étape."""
+
+    def begin(self, stage: str, file_type: str):
+        return start_span(stage, file_type=file_type)
+
+    def end(self, state, outcome: str) -> None:
+        child, token = state
+        end_span(child, token, error=outcome != "ok")
+
+
+class RuleSpanSink:
+    """Puits de métriques du moteur (registry.metrics_sinks) : un span par règle."""
+
+    def record(self, name: str, article: Optional[str], seconds: float) -> None:
+        if article is None:
+            record_span(name, seconds)
+        else:
+            record_span(f"rule:{name}", seconds, article=article)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Curseur SQLite qui ouvre un span par requête exécutée."""
+
+    def execute(self, sql, parameters=()):
+        # Hors trace, pas de span : la requête n'est pas non plus reformatée
+        if _current_span.get() is None:
+            return super().execute(sql, parameters)
+        with span("sqlite", statement=" ".join(sql.split())):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if _current_span.get() is None:
+            return super().executemany(sql, seq_of_parameters)
+        with span("sqlite", statement=" ".join(sql.split()), batch=True):
+            return super().executemany(sql, seq_of_parameters)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connexion SQLite dont toutes les requêtes passent par TracedCursor."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+stage_hooks.append(StageSpanHook())
+
+
+class TracingMiddleware:
+    """Middleware ASGI : une trace par requête HTTP, exportée à la fin.
+
+    Le span racine couvre la requête ; un span ``http.receive`` couvre la
+    réception du corps (upload multipart).
+    """
+
+    def __init__(self, app, exporter=None):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        exporter = self.exporter if self.exporter is not None else configured_exporter()
+        if scope["type"] != "http" or exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        remote = parse_traceparent(headers.get(TRACEPARENT_HEADER, b"").decode("latin-1"))
+        if remote is not None and not remote[2]:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(remote[0] if remote else None)
+        root = Span(
+            trace, f"{scope.get('method', '')} {scope.get('path', '')}",
+            remote[1] if remote else None, time.time_ns(),
+            {"http.method": scope.get("method", ""), "http.target": scope.get("path", "")},
+        )
+        token = _current_span.set(root)
+        receive_started: List[int] = []
+
+        async def traced_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                if not receive_started:
+                    receive_started.append(time.time_ns())
+                if not message.get("more_body", False):
+                    Span(trace, "http.receive", root.span_id, receive_started[0], {}).finish()
+            return message
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                root.error = message["status"] >= 500
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (TRACEPARENT_HEADER, root.traceparent.encode())],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, traced_receive, send_with_traceparent)
+        except BaseException:
+            root.error = True
+            raise
+        finally:
+            root.finish()
+            _current_span.reset(token)
+            export_worker.submit(exporter, trace.spans)
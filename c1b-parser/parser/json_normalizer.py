@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
 from models.activity import Activity, ActivityType, DriverActivity
+from observability.tracing import span
 
 # Mapping des types d'activité tachoparser -> nos types
 ACTIVITY_TYPE_MAP = {
@@ -306,81 +307,129 @@ def normalize_vu_data(raw_json: dict) -> List[DriverActivity]:
             continue
 
         if isinstance(vu_activities, list):
-            for block in vu_activities:
-                _process_vu_activity_block(block, drivers)
+            blocks = vu_activities
         elif isinstance(vu_activities, dict):
-            _process_vu_activity_block(vu_activities, drivers)
+            blocks = [vu_activities]
+        else:
+            continue
+
+        # Le travail par conducteur (attribution des changements d'activité)
+        # se fait bloc par bloc, conducteurs mêlés
+        with span("normalize.blocks", key=key, blocks=len(blocks)):
+            for block in blocks:
+                _process_vu_activity_block(block, drivers)
+
+    # Trier par date de début (les blocs Gen1/Gen2 peuvent se chevaucher dans le temps)
+    for driver in drivers.values():
+        with span("normalize.sort", card_number=driver.card_number,
+                  activities=len(driver.activities)):
+            driver.activities.sort(key=lambda a: a.start)
 
     return list(drivers.values())
 
 
+def _is_co_driver_change(change: dict) -> bool:
+    """Vrai si le changement d'activité concerne le slot second conducteur.
+
+    tachoparser expose le bit de slot sous la clé "driver"
+    (false : conducteur, true : second conducteur).
+    """
+    return change.get("driver") is True
+
+
+def _card_slot_identity(slot: dict, default_card: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Retourne (numéro de carte, nom) pour un slot de carte VU."""
+    if not slot:
+        return default_card, default_card
+    card_number = slot.get("card_number", {}).get("driver_identification", default_card)
+    driver_name = slot.get("card_holder_name", {}).get("name", card_number)
+    return card_number, driver_name
+
+
 def _process_vu_activity_block(block: dict, drivers: Dict[str, DriverActivity]) -> None:
-    """Traite un bloc d'activités VU et ajoute aux conducteurs."""
+    """Traite un bloc d'activités VU et ajoute aux conducteurs.
+
+    Les changements d'activité du slot second conducteur sont attribués à la
+    carte insérée dans card_slot_2 lorsqu'elle est connue.
+    """
     daily_records = block.get("vu_activity_daily_data", [])
     if not daily_records:
         daily_records = block.get("activity_data", [])
 
     for record in daily_records:
-        # Identifier le conducteur
-        slot1 = record.get("card_slot_1", {})
-        card_number = slot1.get("card_number", {}).get("driver_identification", "UNKNOWN")
-        driver_name = slot1.get("card_holder_name", {}).get("name", card_number)
-
-        if card_number not in drivers:
-            drivers[card_number] = DriverActivity(
-                driver_name=driver_name,
-                card_number=card_number,
-                activities=[],
-            )
+        # Identifier le(s) conducteur(s)
+        card_number, driver_name = _card_slot_identity(record.get("card_slot_1", {}), "UNKNOWN")
+        co_card_number, co_driver_name = _card_slot_identity(record.get("card_slot_2", {}), None)
 
-        # Extraire les activités
         activity_changes = record.get("activity_change_info", [])
-        record_date = _parse_timestamp(record.get("activity_record_date"))
+        slots = [(card_number, driver_name, activity_changes)]
+        if co_card_number:
+            slots = [
+                (card_number, driver_name,
+                 [c for c in activity_changes if not _is_co_driver_change(c)]),
+                (co_card_number, co_driver_name,
+                 [c for c in activity_changes if _is_co_driver_change(c)]),
+            ]
+
+        for slot_card, slot_name, changes in slots:
+            if slot_card not in drivers:
+                drivers[slot_card] = DriverActivity(
+                    driver_name=slot_name,
+                    card_number=slot_card,
+                    activities=[],
+                )
+            _append_vu_activities(record, changes, drivers[slot_card])
 
-        if not activity_changes or record_date is None:
-            continue
 
-        for i, change in enumerate(activity_changes):
-            activity_type_val = change.get("activity", change.get("activity_type"))
-            slot_begin = change.get("time", change.get("minutes_since_midnight", 0))
+def _append_vu_activities(record: dict, activity_changes: list, driver: DriverActivity) -> None:
+    """Reconstruit les activités d'un slot à partir de ses changements."""
+    # Extraire les activités
+    record_date = _parse_timestamp(record.get("activity_record_date"))
 
-            act_type = _resolve_activity_type(activity_type_val)
+    if not activity_changes or record_date is None:
+        return
 
-            if isinstance(slot_begin, int) and slot_begin < 1440:
-                start = record_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=slot_begin)
-            else:
-                start = _parse_timestamp(slot_begin)
-                if start is None:
-                    continue
+    for i, change in enumerate(activity_changes):
+        activity_type_val = change.get("activity", change.get("activity_type"))
+        slot_begin = change.get("time", change.get("minutes_since_midnight", 0))
 
-            if i + 1 < len(activity_changes):
-                next_begin = activity_changes[i + 1].get(
-                    "time", activity_changes[i + 1].get("minutes_since_midnight", 0)
-                )
-                if isinstance(next_begin, int) and next_begin < 1440:
-                    end = record_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=next_begin)
-                else:
-                    end = _parse_timestamp(next_begin)
-                    if end is None:
-                        end = start + timedelta(minutes=1)
-            else:
-                end = record_date.replace(hour=23, minute=59, second=0)
-
-            if end <= start:
-                continue
+        act_type = _resolve_activity_type(activity_type_val)
 
-            duration_minutes = int((end - start).total_seconds() / 60)
-            if duration_minutes <= 0:
+        if isinstance(slot_begin, int) and slot_begin < 1440:
+            start = record_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=slot_begin)
+        else:
+            start = _parse_timestamp(slot_begin)
+            if start is None:
                 continue
 
-            vehicle_reg = record.get("vehicle_registration_number", {}).get(
-                "code_page_and_text", None
+        if i + 1 < len(activity_changes):
+            next_begin = activity_changes[i + 1].get(
+                "time", activity_changes[i + 1].get("minutes_since_midnight", 0)
             )
+            if isinstance(next_begin, int) and next_begin < 1440:
+                end = record_date.replace(hour=0, minute=0, second=0) + timedelta(minutes=next_begin)
+            else:
+                end = _parse_timestamp(next_begin)
+                if end is None:
+                    end = start + timedelta(minutes=1)
+        else:
+            end = record_date.replace(hour=23, minute=59, second=0)
 
-            drivers[card_number].activities.append(Activity(
-                type=act_type,
-                start=start,
-                end=end,
-                duration_minutes=duration_minutes,
-                vehicle_registration=vehicle_reg,
-            ))
+        if end <= start:
+            continue
+
+        duration_minutes = int((end - start).total_seconds() / 60)
+        if duration_minutes <= 0:
+            continue
+
+        vehicle_reg = record.get("vehicle_registration_number", {}).get(
+            "code_page_and_text", None
+        )
+
+        driver.activities.append(Activity(
+            type=act_type,
+            start=start,
+            end=end,
+            duration_minutes=duration_minutes,
+            vehicle_registration=vehicle_reg,
+        ))
@@ -9,6 +9,8 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from observability.tracing import span
+
 
 # Chemin par défaut vers le binaire dddparser
 DEFAULT_BINARY_PATH = Path(__file__).parent.parent / "bin" / "dddparser"
@@ -80,11 +82,12 @@ def parse_file(
         cmd.append("-format")
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=60,
-        )
+        with span("dddparser", file_type=file_type):
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                timeout=60,
+            )
     except subprocess.TimeoutExpired:
         raise TachoParserError(f"Timeout lors du parsing de {file_path}")
 
@@ -99,6 +102,7 @@ def parse_file(
         raise TachoParserError(f"dddparser n'a produit aucune sortie pour {file_path}")
 
     try:
-        return json.loads(stdout)
+        with span("json.loads", bytes=len(result.stdout)):
+            return json.loads(stdout)
     except json.JSONDecodeError as e:
         raise TachoParserError(f"JSON invalide retourné par dddparser: {e}")
@@ -33,3 +33,31 @@ def make_activity(
 def make_driver(activities, name="Test Driver", card="TEST0001") -> DriverActivity:
     """Helper pour créer un DriverActivity."""
     return DriverActivity(driver_name=name, card_number=card, activities=activities)
+
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """Client HTTP sur l'application, avec une base SQLite temporaire."""
+    from fastapi.testclient import TestClient
+
+    import database.db
+    from api.main import app
+
+    monkeypatch.setattr(database.db, "DB_PATH", tmp_path / "test.db")
+    monkeypatch.setenv("JOB_QUEUE_URL", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setenv("JOB_STORAGE_DIR", str(tmp_path / "jobs"))
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def fake_decoder(monkeypatch):
+    """Remplace dddparser : tout fichier décodé renvoie ``fake_decoder.raw_json``."""
+    import api.pipeline
+
+    class FakeDecoder:
+        raw_json: dict = {}
+
+    decoder = FakeDecoder()
+    monkeypatch.setattr(api.pipeline, "parse_file", lambda *a, **k: decoder.raw_json)
+    return decoder
@@ -0,0 +1,235 @@
+"""Générateurs de timelines reproductibles (tests de propriétés, benchmarks).
+
+- random_timeline : activités tirées au hasard, pour couvrir les cas limites ;
+- synthetic_driver / synthetic_fleet : plannings réalistes de flotte
+  (postes, pauses fractionnées, repos réduits, traversées en ferry) ;
+- card_raw_json / vu_raw_json : mêmes timelines au format JSON de
+  tachoparser, pour mesurer la normalisation.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from models.activity import Activity, ActivityType, DriverActivity
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)  # lundi
+
+
+def _append(activities, act_type, start, minutes):
+    end = start + timedelta(minutes=minutes)
+    activities.append(Activity(type=act_type, start=start, end=end, duration_minutes=minutes))
+    return end
+
+
+def random_timeline(seed: int, days: int = 28, card: str = "GEN0001") -> DriverActivity:
+    """Timeline contiguë de ``days`` jours, déterminée par ``seed``.
+
+    Les journées mêlent conduite, travail, disponibilité et pauses de
+    durées variées, séparées par des repos journaliers de 6h à 14h, avec
+    de temps en temps un repos long (20h à 50h) : assez de variété pour
+    franchir les seuils de chaque article sans les franchir à chaque fois.
+    """
+    rng = random.Random(seed)
+    activities = []
+    current = START + timedelta(hours=rng.randint(4, 8))
+    end_of_timeline = START + timedelta(days=days)
+
+    while current < end_of_timeline:
+        for _ in range(rng.randint(3, 10)):
+            roll = rng.random()
+            if roll < 0.5:
+                current = _append(activities, ActivityType.DRIVING, current, rng.randint(20, 300))
+            elif roll < 0.7:
+                current = _append(activities, ActivityType.WORK, current, rng.randint(10, 120))
+            elif roll < 0.8:
+                current = _append(activities, ActivityType.AVAILABILITY, current, rng.randint(5, 60))
+            else:
+                current = _append(activities, ActivityType.REST, current, rng.choice((10, 15, 30, 45, 60)))
+        if rng.random() < 0.15:
+            rest_minutes = rng.randint(20 * 60, 50 * 60)
+        else:
+            rest_minutes = rng.randint(6 * 60, 14 * 60)
+        current = _append(activities, ActivityType.REST, current, rest_minutes)
+
+    return DriverActivity(driver_name=f"Generated {seed}", card_number=card, activities=activities)
+
+
+# Codes d'activité tachoparser (inverse de parser.json_normalizer.ACTIVITY_TYPE_MAP)
+TACHO_CODES = {
+    ActivityType.REST: 0,
+    ActivityType.AVAILABILITY: 1,
+    ActivityType.WORK: 2,
+    ActivityType.DRIVING: 3,
+}
+
+
+def _shift(rng: random.Random, activities: list, current: datetime, vehicle: str) -> datetime:
+    """Un poste : blocs de conduite <= 4h30 séparés par des pauses 45' ou 15'+30'."""
+    daily_target = rng.choice((7, 8, 9, 9, 9, 10)) * 60 + rng.randint(-30, 15)
+    driven = 0
+    current = _append(activities, ActivityType.WORK, current, rng.randint(15, 45))
+    activities[-1].vehicle_registration = vehicle
+
+    while driven < daily_target:
+        block_target = min(rng.randint(150, 270), daily_target - driven)
+        if rng.random() < 0.3:
+            # Pause fractionnée : 15' après la première partie du bloc, 30' en fin de bloc
+            first = max(1, block_target // 2)
+            current = _append(activities, ActivityType.DRIVING, current, first)
+            current = _append(activities, ActivityType.REST, current, 15)
+            current = _append(activities, ActivityType.DRIVING, current, block_target - first)
+            current = _append(activities, ActivityType.REST, current, 30)
+        else:
+            current = _append(activities, ActivityType.DRIVING, current, block_target)
+            if rng.random() < 0.3:
+                current = _append(activities, ActivityType.WORK, current, rng.randint(15, 60))
+            current = _append(activities, ActivityType.REST, current, 45)
+        driven += block_target
+        for act in activities[-4:]:
+            act.vehicle_registration = vehicle
+
+    current = _append(activities, ActivityType.WORK, current, rng.randint(10, 40))
+    activities[-1].vehicle_registration = vehicle
+    return current
+
+
+def _daily_rest(rng: random.Random, activities: list, current: datetime, reduced: bool) -> datetime:
+    """Repos journalier, éventuellement réduit ou interrompu par un ferry."""
+    minutes = rng.randint(9 * 60, 10 * 60) if reduced else rng.randint(11 * 60, 13 * 60)
+    if rng.random() < 0.05:
+        # Ferry : repos interrompu par l'embarquement / le débarquement (Art. 9)
+        first = rng.randint(3 * 60, 5 * 60)
+        current = _append(activities, ActivityType.REST, current, first)
+        current = _append(activities, ActivityType.WORK, current, rng.randint(20, 60))
+        return _append(activities, ActivityType.REST, current, minutes - first)
+    return _append(activities, ActivityType.REST, current, minutes)
+
+
+def synthetic_driver(
+    rng: random.Random,
+    weeks: int = 4,
+    card: str = "SYN0000001",
+    name: str = "Synthetic Driver",
+    start: datetime = START,
+) -> DriverActivity:
+    """Planning réaliste de ``weeks`` semaines pour un conducteur.
+
+    5 ou 6 postes par semaine, jusqu'à 3 repos journaliers réduits,
+    repos hebdomadaire normal ou réduit, et parfois un trou de données
+    (carte retirée pendant un repos).
+    """
+    activities: List[Activity] = []
+    vehicle = f"AB-{rng.randint(100, 999)}-CD"
+    current = start + timedelta(hours=rng.randint(5, 8), minutes=rng.randint(0, 59))
+
+    for _ in range(weeks):
+        reduced_left = 3
+        for day in range(rng.choice((5, 5, 6))):
+            current = _shift(rng, activities, current, vehicle)
+            reduced = reduced_left > 0 and rng.random() < 0.25
+            reduced_left -= reduced
+            current = _daily_rest(rng, activities, current, reduced)
+        weekly = rng.randint(24 * 60, 35 * 60) if rng.random() < 0.3 else rng.randint(45 * 60, 60 * 60)
+        if rng.random() < 0.1:
+            # Carte retirée : pas d'enregistrement pendant une partie du repos
+            gap = rng.randint(60, 12 * 60)
+            current = _append(activities, ActivityType.REST, current, weekly - gap)
+            current += timedelta(minutes=gap)
+        else:
+            current = _append(activities, ActivityType.REST, current, weekly)
+
+    return DriverActivity(driver_name=name, card_number=card, activities=activities)
+
+
+def synthetic_crew(
+    rng: random.Random,
+    weeks: int = 2,
+    cards: Tuple[str, str] = ("SYN_CREW_A", "SYN_CREW_B"),
+) -> Tuple[DriverActivity, DriverActivity]:
+    """Équipage de deux conducteurs qui se relaient au volant du même véhicule."""
+    lead = synthetic_driver(rng, weeks, card=cards[0], name="Crew A")
+    partner = []
+    for act in lead.activities:
+        if act.type == ActivityType.DRIVING:
+            partner_type = ActivityType.AVAILABILITY
+        elif act.type == ActivityType.AVAILABILITY:
+            partner_type = ActivityType.DRIVING
+        else:
+            partner_type = act.type
+        partner.append(act.model_copy(update={"type": partner_type}))
+    return lead, DriverActivity(driver_name="Crew B", card_number=cards[1], activities=partner)
+
+
+def synthetic_fleet(n_drivers: int, weeks: int = 4, seed: int = 0) -> List[DriverActivity]:
+    """Flotte de ``n_drivers`` conducteurs (de 1 à plusieurs milliers), reproductible."""
+    rng = random.Random(seed)
+    return [
+        synthetic_driver(rng, weeks, card=f"SYN{i:07d}", name=f"Driver {i}")
+        for i in range(n_drivers)
+    ]
+
+
+def _changes_by_day(activities: List[Activity]) -> Dict[datetime, List[Tuple[ActivityType, int]]]:
+    """Découpe une timeline en changements d'activité par jour (minutes depuis minuit)."""
+    days: Dict[datetime, List[Tuple[ActivityType, int]]] = {}
+    for act in activities:
+        current = act.start
+        while current < act.end:
+            midnight = current.replace(hour=0, minute=0, second=0, microsecond=0)
+            minute = int((current - midnight).total_seconds() // 60)
+            days.setdefault(midnight, []).append((act.type, minute))
+            current = min(act.end, midnight + timedelta(days=1))
+    return days
+
+
+def card_raw_json(driver: DriverActivity) -> dict:
+    """JSON tachoparser d'une carte conducteur Gen1 contenant ``driver``."""
+    records = [
+        {
+            "activity_record_date": int(day.timestamp()),
+            "activity_change_info": [
+                {"work_type": TACHO_CODES[act_type], "minutes": minute}
+                for act_type, minute in changes
+            ],
+        }
+        for day, changes in sorted(_changes_by_day(driver.activities).items())
+    ]
+    return {
+        "card_identification_and_driver_card_holder_identification_1": {
+            "driver_card_holder_identification": {
+                "card_holder_name": {"holder_surname": driver.driver_name, "holder_first_names": ""},
+            },
+            "card_identification": {"card_number": driver.card_number},
+        },
+        "card_driver_activity_1": {"decoded_activity_daily_records": records},
+    }
+
+
+def vu_raw_json(driver: DriverActivity, co_driver: Optional[DriverActivity] = None) -> dict:
+    """JSON tachoparser d'un téléchargement VU Gen1 (un ou deux conducteurs)."""
+    slot1 = _changes_by_day(driver.activities)
+    slot2 = _changes_by_day(co_driver.activities) if co_driver else {}
+
+    def slot(d: DriverActivity) -> dict:
+        return {
+            "card_number": {"driver_identification": d.card_number},
+            "card_holder_name": {"name": d.driver_name},
+        }
+
+    records = []
+    for day in sorted(set(slot1) | set(slot2)):
+        record = {
+            "activity_record_date": int(day.timestamp()),
+            "card_slot_1": slot(driver),
+            "activity_change_info": [
+                {"activity": TACHO_CODES[t], "time": m, "driver": False} for t, m in slot1.get(day, [])
+            ],
+        }
+        if co_driver:
+            record["card_slot_2"] = slot(co_driver)
+            record["activity_change_info"] += [
+                {"activity": TACHO_CODES[t], "time": m, "driver": True} for t, m in slot2.get(day, [])
+            ]
+        records.append(record)
+    return {"vu_activities_1": [{"vu_activity_daily_data": records}]}
@@ -0,0 +1,51 @@
+"""Tests de POST /analyze (timeline déjà normalisée)."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.pipeline import activities_payload
+from api.wire import columnar_timeline
+from engine.infringement_engine import analyze
+from tests.generators import synthetic_driver
+
+
+def _driver():
+    return synthetic_driver(random.Random(9), weeks=4)
+
+
+def test_parse_format_and_columnar_give_same_result(api_client):
+    driver = _driver()
+
+    from_parse = api_client.post("/analyze", json={"timeline": activities_payload(driver)})
+    from_columnar = api_client.post("/analyze", json={"columnar": columnar_timeline(driver)})
+
+    assert from_parse.status_code == 200
+    assert from_parse.json() == from_columnar.json()
+    assert from_parse.json()["total"] == len(analyze(driver))
+
+
+def test_persist_records_analysis(api_client):
+    driver = _driver()
+
+    result = api_client.post(
+        "/analyze", json={"timeline": activities_payload(driver), "persist": True}
+    ).json()
+
+    stored = api_client.get(f"/infringements/{result['driver_id']}").json()
+    assert result["analysis_id"]
+    assert stored["total"] == result["total"]
+
+
+def test_invalid_requests_are_422(api_client):
+    driver = _driver()
+    columnar = columnar_timeline(driver)
+    columnar["types"] = columnar["types"][:-1]
+
+    assert api_client.post("/analyze", json={}).status_code == 422
+    assert api_client.post("/analyze", json={"columnar": columnar}).status_code == 422
+    assert api_client.post(
+        "/analyze", json={"timeline": activities_payload(driver), "articles": ["Art. 99"]}
+    ).status_code == 422
@@ -0,0 +1,143 @@
+"""Tests de l'upload d'archives (/upload/bulk, réponse NDJSON)."""
+
+import io
+import json
+import random
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.generators import card_raw_json, synthetic_driver
+
+
+def _zip(members: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_zip_streams_one_line_per_driver(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(4), weeks=1))
+    archive = _zip({"jour/a.C1B": b"\x00", "jour/b.C1B": b"\x00", "jour/lisez-moi.txt": b"-"})
+
+    response = api_client.post("/upload/bulk", files={"file": ("jour.zip", archive)})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = _lines(response)
+    assert sorted(line["member"] for line in lines) == ["jour/a.C1B", "jour/b.C1B"]
+    assert all(line["file_type"] == "card" and "infringements" in line for line in lines)
+
+
+def test_tar_archive_is_accepted(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(5), weeks=1))
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        info = tarfile.TarInfo("a.C1B")
+        info.size = 1
+        archive.addfile(info, io.BytesIO(b"\x00"))
+
+    response = api_client.post("/upload/bulk", files={"file": ("jour.tar.gz", buffer.getvalue())})
+
+    assert [line["member"] for line in _lines(response)] == ["a.C1B"]
+
+
+def test_unreadable_member_yields_error_line(api_client, monkeypatch):
+    import api.pipeline
+    from parser.tacho_parser import TachoParserError
+
+    def broken(*args, **kwargs):
+        raise TachoParserError("signature invalide")
+
+    monkeypatch.setattr(api.pipeline, "parse_file", broken)
+    response = api_client.post("/upload/bulk", files={"file": ("jour.zip", _zip({"a.DDD": b"\x00"}))})
+
+    assert _lines(response) == [
+        {"member": "a.DDD", "file_type": "vu", "error": "Erreur de parsing: signature invalide"}
+    ]
+
+
+def test_oversize_member_does_not_stop_archive(api_client, fake_decoder, monkeypatch):
+    """Un membre trop volumineux donne sa ligne d'erreur ; les suivants sont traités."""
+    import api.archive
+
+    monkeypatch.setattr(api.archive, "MAX_MEMBER_BYTES", 8)
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(2), weeks=1))
+    archive = _zip({"gros.C1B": b"\x00" * 64, "b.C1B": b"\x00", "c.C1B": b"\x00"})
+
+    lines = _lines(api_client.post("/upload/bulk", files={"file": ("jour.zip", archive)}))
+
+    errors = [line for line in lines if "error" in line]
+    assert [line["member"] for line in errors] == ["gros.C1B"]
+    assert "trop volumineux" in errors[0]["error"]
+    assert sorted(line["member"] for line in lines if "error" not in line) == ["b.C1B", "c.C1B"]
+
+
+def _patch_member(archive: bytes, name: str, offset: int, value: int) -> bytes:
+    """Modifie un champ 16 bits du membre ``name`` (en-tête local et répertoire central)."""
+    data = bytearray(archive)
+    for signature, header_offset in ((b"PK\x03\x04", 0), (b"PK\x01\x02", 2)):
+        start = 0
+        while (start := data.find(signature, start)) != -1:
+            name_offset = start + (30 if header_offset == 0 else 46)
+            if data[name_offset:name_offset + len(name)] == name.encode():
+                at = start + offset + header_offset
+                data[at:at + 2] = value.to_bytes(2, "little")
+            start += 4
+    return bytes(data)
+
+
+def test_unreadable_members_do_not_stop_archive(api_client, fake_decoder):
+    """Membres chiffré et en deflate64 : une ligne d'erreur chacun, les suivants sont traités."""
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(2), weeks=1))
+    archive = _zip({"chiffre.C1B": b"\x00", "deflate64.C1B": b"\x00", "b.C1B": b"\x00"})
+    archive = _patch_member(archive, "chiffre.C1B", 6, 0x1)      # drapeau « chiffré »
+    archive = _patch_member(archive, "deflate64.C1B", 8, 9)      # méthode 9 : deflate64
+
+    lines = _lines(api_client.post("/upload/bulk", files={"file": ("jour.zip", archive)}))
+
+    errors = {line["member"]: line["error"] for line in lines if "error" in line}
+    assert set(errors) == {"chiffre.C1B", "deflate64.C1B"}
+    assert all(error.startswith("Membre illisible") for error in errors.values())
+    assert [line["member"] for line in lines if "error" not in line] == ["b.C1B"]
+
+
+def test_in_flight_members_are_bounded(api_client, monkeypatch):
+    import api.routes.upload as upload
+
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def slow_process(path, filename, file_type):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return []
+
+    monkeypatch.setattr(upload, "process_file", slow_process)
+    monkeypatch.setattr(upload, "BULK_CONCURRENCY", 2)
+    archive = _zip({f"{i}.C1B": b"\x00" for i in range(8)})
+
+    response = api_client.post("/upload/bulk", files={"file": ("jour.zip", archive)})
+
+    assert response.status_code == 200
+    assert 1 <= state["peak"] <= 2
+
+
+def test_non_archive_is_rejected(api_client):
+    response = api_client.post("/upload/bulk", files={"file": ("jour.zip", b"pas une archive")})
+    assert response.status_code == 422
@@ -0,0 +1,56 @@
+"""Tests du mode lot de compare_with_certified."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from compare_with_certified import compare_batch, find_discrepancies
+
+HEADER = "date,conducteur,carte,conduite_h,repos_h,infractions\n"
+
+
+def _write_driver(our_dir, certified_dir, card, ours, certified):
+    (our_dir / f"{card}.json").write_text(json.dumps({
+        day: {"conducteur": "X", "carte": card, "conduite_h": hours} for day, hours in ours.items()
+    }))
+    with open(certified_dir / f"{card}.csv", "w") as f:
+        f.write(HEADER)
+        for day, hours in certified.items():
+            f.write(f"{day},X,{card},{hours},11,\n")
+
+
+def test_find_discrepancies_joins_on_days():
+    ours = {"2025-09-26": {"conducteur": "X", "carte": "C1", "conduite_h": 9.2}}
+    certified = {
+        "2025-09-26": {"conducteur": "X", "carte": "C1", "conduite_h": 9.2},
+        "2025-09-27": {"conducteur": "X", "carte": "C1", "conduite_h": 8.0},
+    }
+    discrepancies, matches, errors = find_discrepancies(ours, certified)
+    assert matches == 1
+    assert [d["type"] for d in discrepancies] == ["MISSING"]
+    assert errors == [0.0]
+
+
+def test_compare_batch_pairs_by_card_and_aggregates(tmp_path):
+    our_dir, certified_dir = tmp_path / "ours", tmp_path / "certified"
+    our_dir.mkdir()
+    certified_dir.mkdir()
+    _write_driver(our_dir, certified_dir, "C1",
+                  {"2025-09-26": 9.0, "2025-09-27": 8.0}, {"2025-09-26": 9.0, "2025-09-27": 8.0})
+    _write_driver(our_dir, certified_dir, "C2",
+                  {"2025-09-26": 9.0}, {"2025-09-26": 10.0, "2025-09-27": 4.0})
+    (our_dir / "C3.json").write_text(json.dumps({"2025-09-26": {"carte": "C3", "conduite_h": 1}}))
+
+    report = compare_batch(our_dir, certified_dir, workers=2)
+
+    summary = report["summary"]
+    assert summary["drivers"] == 2
+    assert summary["days"] == 4
+    assert summary["matching_days"] == 2
+    assert summary["accuracy"] == 0.5
+    assert summary["discrepancies_by_type"] == {"DRIVING_TIME": 1, "MISSING": 1}
+    assert summary["driving_max_error_h"] == 1.0
+    assert report["unpaired"] == {"ours": ["C3"], "certified": []}
+    json.dumps(report)  # rapport sérialisable tel quel
@@ -0,0 +1,131 @@
+"""Tests pour l'état de conformité incrémental (temps restants en direct)."""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.compliance_state import compliance_snapshot, update_compliance_state
+from models.activity import ActivityType
+from models.compliance import ComplianceState
+from tests.conftest import make_activity
+
+
+def _week():
+    """Lundi 15/01 -> mercredi 17/01 : 9h de conduite/jour, repos de nuit 11h+."""
+    activities = []
+    for day in (15, 16, 17):
+        activities += [
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 6, 0, 10, 30),
+            make_activity(ActivityType.REST, 2024, 1, day, 10, 30, 11, 15),
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 11, 15, 15, 45),
+            make_activity(ActivityType.REST, 2024, 1, day, 15, 45, 6, 0),
+        ]
+    return activities
+
+
+def test_snapshot_remaining_times():
+    """Jeudi matin : 27h conduites dans la semaine, journée pas encore entamée."""
+    state = update_compliance_state(ComplianceState(card_number="TEST0001"), _week())
+    now = datetime(2024, 1, 18, 6, 0, tzinfo=timezone.utc)
+    snapshot = compliance_snapshot(state, now)
+
+    assert snapshot["remaining_driving_today_minutes"] == 600
+    assert snapshot["remaining_driving_week_minutes"] == 56 * 60 - 27 * 60
+    assert snapshot["driving_until_break_minutes"] == 270
+    assert snapshot["extended_days_used_this_week"] == 0
+    # Repos en cours (depuis mercredi 15h45) déjà >= 9h : dernier repos journalier,
+    # aucun repos réduit consommé -> 9h suffisent
+    assert snapshot["reduced_daily_rests_left"] == 3
+    assert snapshot["daily_rest_latest_start"] == datetime(2024, 1, 18, 21, 0, tzinfo=timezone.utc)
+
+
+def test_rest_in_progress_since_last_activity_counts():
+    """Carte retirée après la conduite : le temps écoulé jusqu'à ``now`` est du repos."""
+    activities = [make_activity(ActivityType.DRIVING, 2024, 1, 15, 6, 0, 9, 0)]
+    state = update_compliance_state(ComplianceState(card_number="TEST0001"), activities)
+
+    snapshot = compliance_snapshot(state, datetime(2024, 1, 15, 9, 30, tzinfo=timezone.utc))
+    assert snapshot["driving_until_break_minutes"] == 90
+
+    snapshot = compliance_snapshot(state, datetime(2024, 1, 15, 9, 45, tzinfo=timezone.utc))
+    assert snapshot["driving_until_break_minutes"] == 270
+
+    # 9h30 de repos réduit en cours : il compte comme dernier repos journalier
+    snapshot = compliance_snapshot(state, datetime(2024, 1, 15, 18, 30, tzinfo=timezone.utc))
+    assert snapshot["reduced_daily_rests_left"] == 2
+    assert snapshot["daily_rest_latest_start"] == datetime(2024, 1, 16, 9, 30, tzinfo=timezone.utc)
+
+
+def test_daily_rest_latest_start_without_reduced_rests_left():
+    """Trois repos réduits déjà pris : le prochain repos journalier doit faire 11h."""
+    activities = []
+    for day in (15, 16, 17):
+        activities += [
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 6, 0, 10, 0),
+            make_activity(ActivityType.REST, 2024, 1, day, 10, 0, 10, 45),
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 10, 45, 14, 30),
+            make_activity(ActivityType.REST, 2024, 1, day, 14, 30, 23, 30),
+            make_activity(ActivityType.WORK, 2024, 1, day, 23, 30, 6, 0),
+        ]
+    state = update_compliance_state(ComplianceState(card_number="TEST0001"), activities)
+    assert state.reduced_daily_rests == 3
+
+    snapshot = compliance_snapshot(state, datetime(2024, 1, 18, 6, 0, tzinfo=timezone.utc))
+    assert snapshot["reduced_daily_rests_left"] == 0
+    # Dernier repos terminé mercredi 23h30 -> 23h30 + 24h - 11h
+    assert snapshot["daily_rest_latest_start"] == datetime(2024, 1, 18, 12, 30, tzinfo=timezone.utc)
+
+
+def test_break_countdown_after_partial_driving():
+    """3h de conduite sans pause -> 1h30 avant la pause obligatoire."""
+    activities = [make_activity(ActivityType.DRIVING, 2024, 1, 15, 6, 0, 9, 0)]
+    state = update_compliance_state(ComplianceState(card_number="TEST0001"), activities)
+    snapshot = compliance_snapshot(state, datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc))
+    assert snapshot["driving_until_break_minutes"] == 90
+    assert snapshot["remaining_driving_today_minutes"] == 600 - 180
+
+
+def test_incremental_updates_match_single_update():
+    """Ingestion en deux téléchargements qui se chevauchent == ingestion unique."""
+    activities = _week()
+    once = update_compliance_state(ComplianceState(card_number="TEST0001"), activities)
+
+    incremental = ComplianceState(card_number="TEST0001")
+    update_compliance_state(incremental, activities[:6])
+    update_compliance_state(incremental, activities[2:])
+
+    assert incremental == once
+
+
+def test_state_json_roundtrip():
+    """L'état se sérialise pour être persisté en base."""
+    state = update_compliance_state(ComplianceState(card_number="TEST0001"), _week())
+    restored = ComplianceState.model_validate_json(state.model_dump_json())
+    assert restored == state
+
+
+def test_activity_straddling_previous_download_is_counted_once():
+    state = ComplianceState(card_number="TEST0001")
+    update_compliance_state(state, [make_activity(ActivityType.DRIVING, 2024, 1, 2, 8, 0, 9, 0)])
+    # Téléchargement suivant : la même conduite, prolongée jusqu'à 10h
+    update_compliance_state(state, [make_activity(ActivityType.DRIVING, 2024, 1, 2, 8, 0, 10, 0)])
+
+    assert state.daily_driving_minutes == {"2024-01-02": 120.0}
+    assert state.driving_since_break_minutes == 120
+
+
+def test_rest_straddling_previous_download_extends_rest_block():
+    state = ComplianceState(card_number="TEST0001")
+    update_compliance_state(state, [
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 8, 0, 12, 0),
+        make_activity(ActivityType.REST, 2024, 1, 2, 12, 0, 12, 30),
+    ])
+    update_compliance_state(state, [
+        make_activity(ActivityType.REST, 2024, 1, 2, 12, 0, 21, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 21, 0, 22, 0),
+    ])
+
+    assert state.last_daily_rest_end == datetime(2024, 1, 2, 21, 0, tzinfo=timezone.utc)
+    assert state.driving_since_break_minutes == 60
@@ -0,0 +1,62 @@
+"""Harnais de corpus : non-régression de bout en bout sur fichiers réels."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+import corpus_harness
+from database.db import init_db
+from tests.generators import card_raw_json, synthetic_driver
+
+
+def test_corpus_has_no_regression():
+    """Chaque fichier de tests/corpus reste dans les marges de la référence."""
+    if not corpus_harness.decoder_available():
+        pytest.skip("Binaire dddparser absent")
+    files = corpus_harness.corpus_files()
+    if not files:
+        pytest.skip("Corpus vide")
+    baseline = corpus_harness.load_baseline()
+    if not baseline:
+        pytest.skip("Pas de référence (corpus_harness.py --update-baseline)")
+
+    results = corpus_harness.run_corpus(files)
+    assert corpus_harness.compare(results, baseline) == []
+
+
+def test_run_file_measures_every_stage(monkeypatch, tmp_path):
+    driver = synthetic_driver(random.Random(5), weeks=2)
+    monkeypatch.setattr(corpus_harness, "parse_file", lambda *a, **k: card_raw_json(driver))
+    db_path = str(tmp_path / "corpus.db")
+    init_db(db_path)
+
+    result = corpus_harness.run_file(tmp_path / "synthetic.C1B", db_path)
+
+    assert result["file_type"] == "card"
+    assert result["drivers"] == 1
+    assert set(result["stages"]) == set(corpus_harness.STAGES)
+    assert all(stage["peak_rss_kb"] >= 0 for stage in result["stages"].values())
+
+
+def _result(seconds=0.1, rss=1000, by_article=None):
+    return {
+        "by_article": by_article or {"Art. 7": 1},
+        "stages": {
+            stage: {"seconds": seconds, "peak_rss_kb": rss} for stage in corpus_harness.STAGES
+        },
+    }
+
+
+def test_compare_flags_latency_memory_and_result_changes():
+    baseline = {"a.C1B": _result()}
+
+    assert corpus_harness.compare({"a.C1B": _result(seconds=0.11)}, baseline) == []
+    assert len(corpus_harness.compare({"a.C1B": _result(seconds=0.2)}, baseline)) == 4
+    assert len(corpus_harness.compare({"a.C1B": _result(rss=2000)}, baseline)) == 4
+    assert corpus_harness.compare({"a.C1B": _result(by_article={"Art. 7": 2})}, baseline)
+    # Fichier absent de la référence : rien à comparer
+    assert corpus_harness.compare({"b.C1B": _result(seconds=9)}, baseline) == []
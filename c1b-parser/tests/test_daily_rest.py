@@ -1,7 +1,7 @@
 """Tests pour la règle de repos journalier (Art. 8.2)."""
 
 import sys
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -48,3 +48,32 @@ def test_insufficient_daily_rest_infringement():
     # Au moins une infraction pour repos < 9h
     rest_infractions = [i for i in infringements if "8.2" in i.article]
     assert len(rest_infractions) >= 1
+
+
+def _reduced_rest_days(days):
+    """Un poste de 8h suivi d'un repos réduit de 10h01 pour chaque jour."""
+    activities = []
+    for day in days:
+        activities.append(make_activity(ActivityType.DRIVING, 2024, 1, day, 6, 0, 14, 0))
+        activities.append(make_activity(ActivityType.REST, 2024, 1, day, 14, 0, 23, 59))
+        activities.append(make_activity(ActivityType.REST, 2024, 1, day + 1, 0, 0, 0, 1))
+    return activities
+
+
+def test_reduced_rest_count_resets_after_weekly_rest():
+    """3 repos réduits, un repos hebdomadaire, 3 repos réduits -> pas d'infraction."""
+    activities = _reduced_rest_days((15, 16, 17)) + [
+        make_activity(ActivityType.DRIVING, 2024, 1, 18, 0, 1, 6, 0),
+        make_activity(ActivityType.REST, 2024, 1, 18, 6, 0, 23, 59),
+        make_activity(ActivityType.REST, 2024, 1, 19, 0, 0, 23, 59),
+        make_activity(ActivityType.REST, 2024, 1, 20, 0, 0, 6, 0),   # 48h
+    ] + _reduced_rest_days((20, 21, 22))
+    infringements = check_daily_rest(make_driver(activities))
+    assert not [i for i in infringements if "trop de repos réduits" in i.rule_description]
+
+
+def test_fourth_reduced_rest_without_weekly_rest_is_reported():
+    """Sans repos hebdomadaire entre eux, le 4e repos réduit reste une infraction."""
+    infringements = check_daily_rest(make_driver(_reduced_rest_days((15, 16, 17, 18))))
+    too_many = [i for i in infringements if "trop de repos réduits" in i.rule_description]
+    assert [i.date for i in too_many] == [date(2024, 1, 18)]
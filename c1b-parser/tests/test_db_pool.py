@@ -0,0 +1,75 @@
+"""Tests du pool de connexions SQLite."""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from database.db import (
+    close_connections,
+    get_connection,
+    get_or_create_driver,
+    init_db,
+    save_analysis,
+)
+from engine.infringement_engine import analyze
+from tests.generators import synthetic_driver
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    init_db(path)
+    yield path
+    close_connections()
+
+
+def test_connection_is_reused_and_tuned(db_path):
+    with get_connection(db_path) as first:
+        pass
+    with get_connection(db_path) as second:
+        assert second is first
+        assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert second.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert second.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+
+def test_nested_block_shares_outer_transaction(db_path):
+    with pytest.raises(RuntimeError):
+        with get_connection(db_path) as conn:
+            with get_connection(db_path) as inner:
+                get_or_create_driver(inner, "Imbriqué", "NEST0001")
+            raise RuntimeError("échec après le bloc imbriqué")
+
+    with get_connection(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM drivers").fetchone()[0] == 0
+
+
+def test_concurrent_writers_do_not_fail(db_path):
+    import random
+
+    drivers = [synthetic_driver(random.Random(i), weeks=1, card=f"POOL{i:04d}") for i in range(8)]
+    errors = []
+
+    def write(driver):
+        try:
+            infringements = analyze(driver, use_cache=False)
+            for _ in range(5):
+                with get_connection(db_path) as conn:
+                    driver_id = get_or_create_driver(conn, driver.driver_name, driver.card_number)
+                    save_analysis(conn, driver_id, "f.C1B", "card", infringements)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(d,)) for d in drivers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with get_connection(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 40
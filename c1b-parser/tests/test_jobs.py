@@ -0,0 +1,185 @@
+"""Tests de la file de jobs et de l'analyse asynchrone."""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jobs.queue import InMemoryJobQueue, SQLiteJobQueue, new_job
+from models.job import JobStatus
+from tests.generators import card_raw_json, synthetic_crew, synthetic_driver, vu_raw_json
+
+
+def _wait_finished(client, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} non terminé")
+
+
+def test_queues_claim_in_submission_order(tmp_path):
+    for queue in (InMemoryJobQueue(), SQLiteJobQueue(tmp_path / "jobs.db")):
+        first = queue.enqueue(new_job("a.C1B", "card", "/tmp/a"))
+        queue.enqueue(new_job("b.C1B", "card", "/tmp/b"))
+
+        claimed = queue.claim()
+        assert claimed.id == first.id
+        assert claimed.status == JobStatus.RUNNING
+        queue.complete(claimed.id, {"drivers_found": 1})
+        assert queue.get(first.id).result == {"drivers_found": 1}
+        assert queue.claim().filename == "b.C1B"
+        assert queue.claim() is None
+
+
+def test_sqlite_queue_requeues_expired_leases(tmp_path):
+    queue = SQLiteJobQueue(tmp_path / "jobs.db")
+    job = queue.enqueue(new_job("a.C1B", "card", "/tmp/a"))
+    queue.claim("worker-a")
+
+    # Redémarrage : nouvelle instance sur la même base, bail expiré
+    restarted = SQLiteJobQueue(tmp_path / "jobs.db")
+    assert restarted.recover(lease=0) == 1
+    claimed = restarted.claim("worker-b")
+    assert claimed.id == job.id
+    assert claimed.owner == "worker-b"
+    # L'ancien worker a perdu le job
+    assert not queue.heartbeat(job.id, "worker-a")
+
+
+def test_sqlite_queue_keeps_live_leases(tmp_path):
+    queue = SQLiteJobQueue(tmp_path / "jobs.db")
+    job = queue.enqueue(new_job("a.C1B", "card", "/tmp/a"))
+    queue.claim("worker-a")
+
+    # Un autre processus démarre pendant que worker-a traite le job
+    other = SQLiteJobQueue(tmp_path / "jobs.db")
+    assert other.recover(lease=60) == 0
+    assert other.claim("worker-b") is None
+    assert queue.heartbeat(job.id, "worker-a")
+    assert queue.get(job.id).status == JobStatus.RUNNING
+
+
+def test_sqlite_queue_migrates_jobs_table_without_leases(tmp_path):
+    import sqlite3
+
+    conn = sqlite3.connect(tmp_path / "jobs.db")
+    conn.execute("""CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL,
+                    filename TEXT NOT NULL, file_type TEXT NOT NULL, path TEXT NOT NULL,
+                    created_at TIMESTAMP NOT NULL, started_at TIMESTAMP, finished_at TIMESTAMP,
+                    result TEXT, error TEXT)""")
+    conn.execute("INSERT INTO jobs (id, status, filename, file_type, path, created_at) "
+                 "VALUES ('old', 'running', 'a.C1B', 'card', '/tmp/a', '2024-01-01T00:00:00+00:00')")
+    conn.commit()
+    conn.close()
+
+    queue = SQLiteJobQueue(tmp_path / "jobs.db")
+    # Job en cours sans bail : repris
+    assert queue.recover() == 1
+    assert queue.claim("worker-a").id == "old"
+
+
+def test_job_runs_in_background(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(3), weeks=1))
+
+    response = api_client.post("/jobs", files={"file": ("carte.C1B", b"\x00", "application/octet-stream")})
+
+    assert response.status_code == 202
+    job = _wait_finished(api_client, response.json()["job_id"])
+    assert job["status"] == "done"
+    assert job["result"]["file_type"] == "card"
+    assert job["result"]["drivers_found"] == 1
+    assert "path" not in job
+
+
+def test_failed_job_reports_error(api_client, monkeypatch):
+    import api.pipeline
+    from parser.tacho_parser import TachoParserError
+
+    def broken(*args, **kwargs):
+        raise TachoParserError("signature invalide")
+
+    monkeypatch.setattr(api.pipeline, "parse_file", broken)
+    job_id = api_client.post("/jobs", files={"file": ("carte.C1B", b"\x00")}).json()["job_id"]
+
+    job = _wait_finished(api_client, job_id)
+    assert job["status"] == "failed"
+    assert "signature invalide" in job["error"]
+
+
+def test_unknown_job_is_404(api_client):
+    assert api_client.get("/jobs/inconnu").status_code == 404
+
+
+def _sse_events(response) -> list:
+    events, current = [], {}
+    for line in response.iter_lines():
+        if not line:
+            if current:
+                events.append(current)
+            current = {}
+        elif line.startswith("event: "):
+            current["event"] = line[len("event: "):]
+        elif line.startswith("data: "):
+            current["data"] = json.loads(line[len("data: "):])
+    return events
+
+
+def test_job_events_report_progress_per_driver(api_client, fake_decoder):
+    first, second = synthetic_crew(random.Random(10), weeks=1)
+    fake_decoder.raw_json = vu_raw_json(first, co_driver=second)
+    job_id = api_client.post("/jobs", files={"file": ("vehicule.DDD", b"\x00")}).json()["job_id"]
+
+    with api_client.stream("GET", f"/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response)
+
+    names = [e["event"] for e in events]
+    assert names[:3] == ["running", "decoded", "normalized"]
+    assert names[-1] == "done"
+    drivers = events[2]["data"]["drivers"]
+    analyzed = [e["data"] for e in events if e["event"] == "driver_analyzed"]
+    assert [(d["index"], d["total"]) for d in analyzed] == [(i, drivers) for i in range(1, drivers + 1)]
+    partial = [e["data"]["result"] for e in events if e["event"] == "driver_result"]
+    assert partial == events[-1]["data"]["result"]["results"]
+
+
+def test_job_events_after_restart_report_final_state(api_client):
+    import api.routes.jobs as jobs_routes
+
+    jobs_routes.stop_job_workers()
+    job = jobs_routes.job_queue.enqueue(new_job("a.C1B", "card", "/tmp/absent"))
+    jobs_routes.job_queue.claim()
+    jobs_routes.job_queue.complete(job.id, {"drivers_found": 0})
+
+    with api_client.stream("GET", f"/jobs/{job.id}/events") as response:
+        assert _sse_events(response) == [{"event": "done", "data": {"result": {"drivers_found": 0}}}]
+
+
+def test_job_events_wake_async_waiters_from_worker_threads():
+    import asyncio
+    import threading
+
+    from jobs.events import JobEvents
+
+    events = JobEvents()
+
+    async def scenario():
+        # L'abonné attend dans la boucle ; le worker publie depuis son thread
+        waiting = asyncio.create_task(events.wait("job", 0, timeout=5))
+        await asyncio.sleep(0)
+        publisher = threading.Thread(target=events.publish, args=("job", "running"))
+        publisher.start()
+        publisher.join()
+        received = await asyncio.wait_for(waiting, 1)
+        return received, await events.wait("job", 1, timeout=0.01)
+
+    received, empty = asyncio.run(scenario())
+    assert received == [(0, "running", {})]
+    assert empty == []
+    assert events._waiters == {}
@@ -0,0 +1,44 @@
+"""Tests du traçage mémoire par étape (requêtes échantillonnées)."""
+
+import logging
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import observability.memory
+from observability.memory import STAGE_PEAK_MEMORY
+from tests.generators import card_raw_json, synthetic_driver
+
+UPLOAD = {"file": ("carte.C1B", b"\x00", "application/octet-stream")}
+
+
+def test_sampled_upload_records_memory_per_stage(api_client, fake_decoder, monkeypatch, caplog):
+    monkeypatch.setattr(observability.memory, "DEFAULT_SAMPLE_RATE", 1.0)
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(4), weeks=4))
+    STAGE_PEAK_MEMORY.reset()
+
+    with caplog.at_level(logging.INFO, logger="observability.memory"):
+        response = api_client.post("/upload", files=UPLOAD)
+
+    assert response.status_code == 200
+    assert not tracemalloc.is_tracing()
+    stages = [r.getMessage().split("[")[1].split("/")[0] for r in caplog.records]
+    assert stages == ["decode", "normalize", "analyze", "persist"]
+
+    metrics = api_client.get("/metrics").text
+    assert 'tacho_stage_peak_memory_bytes_count{stage="normalize",file_type="card"} 1' in metrics
+
+
+def test_unsampled_upload_is_not_traced(api_client, fake_decoder, monkeypatch, caplog):
+    monkeypatch.setattr(observability.memory, "DEFAULT_SAMPLE_RATE", 0.0)
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(4), weeks=1))
+    STAGE_PEAK_MEMORY.reset()
+
+    with caplog.at_level(logging.INFO, logger="observability.memory"):
+        api_client.post("/upload", files=UPLOAD)
+
+    assert not caplog.records
+    assert "tacho_stage_peak_memory_bytes_count" not in api_client.get("/metrics").text
@@ -0,0 +1,58 @@
+"""Tests de l'instrumentation par étape (Server-Timing, /metrics)."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from observability.metrics import (
+    STAGE_SECONDS,
+    Histogram,
+    server_timing_header,
+    stage_timer,
+)
+from tests.generators import card_raw_json, synthetic_driver
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+
+    text = histogram.render()
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a"} 3' in text
+
+
+def test_stage_timer_labels_errors():
+    STAGE_SECONDS.reset()
+    with pytest.raises(ValueError):
+        with stage_timer("decode", "card"):
+            raise ValueError("fichier illisible")
+
+    assert 'stage="decode",file_type="card",outcome="error"' in STAGE_SECONDS.render()
+
+
+def test_server_timing_header_sums_repeated_stages():
+    header = server_timing_header([("analyze", 0.010), ("persist", 0.002), ("analyze", 0.005)])
+    assert header == "analyze;dur=15.0, persist;dur=2.0"
+
+
+def test_upload_reports_stage_timings(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(2), weeks=1))
+    STAGE_SECONDS.reset()
+
+    response = api_client.post("/upload", files={"file": ("carte.C1B", b"\x00", "application/octet-stream")})
+
+    assert response.status_code == 200
+    stages = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+    assert stages == ["decode", "normalize", "analyze", "persist"]
+
+    metrics = api_client.get("/metrics").text
+    assert 'tacho_stage_duration_seconds_count{stage="persist",file_type="card",outcome="ok"} 1' in metrics
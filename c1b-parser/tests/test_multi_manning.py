@@ -0,0 +1,108 @@
+"""Tests pour la règle de repos en équipage (Art. 8.5)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.infringement_engine import analyze_crew
+from engine.rules.multi_manning import check_multi_manning, find_multi_manning_periods
+from models.activity import ActivityType
+from parser.json_normalizer import normalize_vu_data
+from tests.conftest import make_activity, make_driver
+
+
+def _crew():
+    """Deux conducteurs qui se relaient au volant du 14/01 22h au 15/01 16h."""
+    a = make_driver([
+        make_activity(ActivityType.REST, 2024, 1, 14, 10, 0, 22, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 14, 22, 0, 23, 59),
+        make_activity(ActivityType.DRIVING, 2024, 1, 15, 0, 0, 3, 0),
+        make_activity(ActivityType.AVAILABILITY, 2024, 1, 15, 3, 0, 8, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 15, 8, 0, 12, 0),
+        make_activity(ActivityType.AVAILABILITY, 2024, 1, 15, 12, 0, 16, 0),
+        make_activity(ActivityType.REST, 2024, 1, 15, 16, 0, 3, 0),
+    ], name="A", card="CARD_A")
+    b = make_driver([
+        make_activity(ActivityType.REST, 2024, 1, 14, 10, 0, 22, 0),
+        make_activity(ActivityType.AVAILABILITY, 2024, 1, 14, 22, 0, 23, 59),
+        make_activity(ActivityType.AVAILABILITY, 2024, 1, 15, 0, 0, 3, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 15, 3, 0, 8, 0),
+        make_activity(ActivityType.AVAILABILITY, 2024, 1, 15, 8, 0, 12, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 15, 12, 0, 16, 0),
+        make_activity(ActivityType.REST, 2024, 1, 15, 16, 0, 3, 0),
+    ], name="B", card="CARD_B")
+    return a, b
+
+
+def test_multi_manning_period_detected():
+    a, b = _crew()
+    periods = find_multi_manning_periods(a, b)
+    assert len(periods) == 1
+    start, end = periods[0]
+    assert (start.day, start.hour) == (14, 22)
+    assert (end.day, end.hour) == (15, 16)
+
+
+def test_no_overlap_no_period():
+    a, _ = _crew()
+    b = make_driver([
+        make_activity(ActivityType.DRIVING, 2024, 2, 1, 6, 0, 10, 0),
+    ], card="CARD_B")
+    assert find_multi_manning_periods(a, b) == []
+
+
+def test_crew_rest_ok():
+    """Repos de 11h achevé 29h après la fin du repos précédent -> pas d'infraction."""
+    a, b = _crew()
+    assert check_multi_manning(a, b) == []
+
+
+def test_crew_rest_too_late_infringement():
+    """Repos pris, mais trop tard : fin du repos au-delà des 30h."""
+    a, b = _crew()
+    # A ne se repose qu'à partir du 16/01 00h : 4h de repos avant l'échéance de 04h
+    a.activities[-1] = make_activity(ActivityType.WORK, 2024, 1, 15, 16, 0, 23, 59)
+    a.activities.append(make_activity(ActivityType.REST, 2024, 1, 16, 0, 0, 12, 0))
+    infringements = check_multi_manning(a, b)
+    assert [i.card_number for i in infringements] == ["CARD_A"]
+    assert infringements[0].article == "Art. 8.5"
+    assert infringements[0].excess == 5.0
+
+
+def test_three_driver_crew_reports_each_missing_rest_once():
+    """Avec deux coéquipiers, le repos manquant de A n'est signalé qu'une fois."""
+    a, b = _crew()
+    a.activities[-1] = make_activity(ActivityType.WORK, 2024, 1, 15, 16, 0, 23, 59)
+    a.activities.append(make_activity(ActivityType.REST, 2024, 1, 16, 0, 0, 12, 0))
+    c = b.model_copy(deep=True)
+    c.driver_name, c.card_number = "C", "CARD_C"
+
+    infringements = analyze_crew([a, b, c])
+
+    assert [i.card_number for i in infringements] == ["CARD_A"]
+    assert infringements == check_multi_manning(a, b)
+
+
+def test_normalize_vu_splits_card_slots():
+    raw = {"vu_activities_1": [{"vu_activity_daily_data": [{
+        "activity_record_date": "2024-01-15T00:00:00Z",
+        "card_slot_1": {"card_number": {"driver_identification": "CARD_A"}},
+        "card_slot_2": {"card_number": {"driver_identification": "CARD_B"}},
+        "activity_change_info": [
+            {"driver": False, "activity": 3, "time": 360},
+            {"driver": True, "activity": 1, "time": 360},
+            {"driver": False, "activity": 0, "time": 600},
+            {"driver": True, "activity": 3, "time": 600},
+        ],
+    }]}]}
+    drivers = {d.card_number: d for d in normalize_vu_data(raw)}
+    assert set(drivers) == {"CARD_A", "CARD_B"}
+    assert [a.type for a in drivers["CARD_A"].activities] == [
+        ActivityType.DRIVING, ActivityType.REST,
+    ]
+    assert drivers["CARD_A"].activities[0].duration_minutes == 240
+    assert [a.type for a in drivers["CARD_B"].activities] == [
+        ActivityType.AVAILABILITY, ActivityType.DRIVING,
+    ]
+    assert analyze_crew(list(drivers.values())) == []
@@ -0,0 +1,40 @@
+"""Tests de la réponse NDJSON de /parse."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.generators import synthetic_crew, vu_raw_json
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def test_streamed_parse_matches_json_response(api_client, fake_decoder, monkeypatch):
+    import api.routes.upload as upload
+
+    monkeypatch.setattr(upload, "PARSE_CHUNK_SIZE", 7)
+    first, second = synthetic_crew(random.Random(6), weeks=1)
+    fake_decoder.raw_json = vu_raw_json(first, co_driver=second)
+    files = {"file": ("vehicule.DDD", b"\x00")}
+
+    body = api_client.post("/parse", files=files).json()
+    response = api_client.post("/parse", files=files, headers=NDJSON)
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {
+        "kind": "file", "filename": "vehicule.DDD", "file_type": "vu",
+        "drivers_found": body["drivers_found"],
+    }
+    assert all(len(l["activities"]) <= 7 for l in lines if l["kind"] == "activities")
+
+    streamed = {}
+    for line in lines[1:]:
+        if line["kind"] == "driver":
+            streamed[line["card_number"]] = []
+        else:
+            streamed[line["card_number"]].extend(line["activities"])
+    assert streamed == {r["card_number"]: r["activities"] for r in body["results"]}
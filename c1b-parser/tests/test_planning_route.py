@@ -0,0 +1,40 @@
+"""Tests de POST /what-if (plannings candidats contre un historique fourni)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.pipeline import activities_payload, activity_payload
+from api.routes import planning
+from tests.generators import random_timeline
+
+
+def _request(candidates=6):
+    driver = random_timeline(5, days=21)
+    cut = len(driver.activities) - 30
+    history = driver.model_copy(update={"activities": driver.activities[:cut]})
+    plans = [
+        [activity_payload(a) for a in driver.activities[cut:cut + 5 + n]]
+        for n in range(candidates)
+    ]
+    return {"history": activities_payload(history), "candidates": plans}
+
+
+def test_parallel_route_matches_sequential(api_client, monkeypatch):
+    body = _request()
+    sequential = api_client.post("/what-if", json=body)
+
+    monkeypatch.setattr(planning, "PARALLEL_MIN_CANDIDATES", 2)
+    monkeypatch.setattr(planning, "WHAT_IF_WORKERS", 2)
+    parallel = api_client.post("/what-if", json=body)
+
+    assert sequential.status_code == parallel.status_code == 200
+    assert parallel.json() == sequential.json()
+    assert len(parallel.json()["candidates"]) == 6
+
+
+def test_too_many_candidates_rejected(api_client, monkeypatch):
+    monkeypatch.setattr(planning, "MAX_CANDIDATES", 3)
+    response = api_client.post("/what-if", json=_request(candidates=4))
+    assert response.status_code == 422
@@ -0,0 +1,71 @@
+"""Tests du profileur par échantillonnage et des routes /debug."""
+
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from observability.profiler import SamplingProfiler
+from tests.generators import card_raw_json, synthetic_driver
+
+TOKEN = "secret-admin"
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_thread_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,))
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001, thread_ids={worker.ident}).start()
+    time.sleep(0.1)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    collapsed = profiler.collapsed()
+    assert "tests.test_profiler._busy_loop" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("threading.") and int(count) > 0
+
+
+def test_profile_endpoint_requires_admin_token(api_client, monkeypatch):
+    assert api_client.get("/debug/profile?seconds=0.1").status_code == 403
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    assert api_client.get(
+        "/debug/profile?seconds=0.1", headers={"X-Admin-Token": "wrong"}
+    ).status_code == 403
+
+    response = api_client.get(
+        "/debug/profile?seconds=0.1&interval_ms=1", headers={"X-Admin-Token": TOKEN}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+def test_per_request_profile(api_client, fake_decoder, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(3), weeks=8))
+    upload = {"file": ("carte.C1B", b"\x00", "application/octet-stream")}
+
+    # Sans jeton valide, l'en-tête X-Profile est ignoré
+    response = api_client.post("/upload", files=upload, headers={"X-Profile": "1"})
+    assert "x-profile-id" not in response.headers
+
+    response = api_client.post(
+        "/upload", files=upload, headers={"X-Profile": "1", "X-Admin-Token": TOKEN}
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    profile = api_client.get(f"/debug/profile/{profile_id}", headers={"X-Admin-Token": TOKEN})
+    assert profile.status_code == 200
+    assert api_client.get(
+        "/debug/profile/inconnu", headers={"X-Admin-Token": TOKEN}
+    ).status_code == 404
@@ -0,0 +1,74 @@
+"""Tests pour le registre de règles et ses métriques."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from engine.infringement_engine import analyze
+from engine.registry import get_rules, rule_metrics
+from engine.rules.breaks import check_breaks
+from engine.rules.daily_rest import check_daily_rest
+from engine.rules.driving_time import (
+    check_biweekly_driving,
+    check_daily_driving,
+    check_weekly_driving,
+)
+from engine.rules.weekly_rest import check_weekly_rest
+from models.activity import ActivityType
+from tests.conftest import make_activity, make_driver
+
+
+def _driver():
+    activities = []
+    for day in range(15, 22):
+        activities.append(make_activity(ActivityType.DRIVING, 2024, 1, day, 5, 0, 11, 0))
+        activities.append(make_activity(ActivityType.REST, 2024, 1, day, 11, 0, 11, 20))
+        activities.append(make_activity(ActivityType.DRIVING, 2024, 1, day, 11, 20, 16, 0))
+        activities.append(make_activity(ActivityType.REST, 2024, 1, day, 16, 0, 23, 0))
+    return make_driver(activities)
+
+
+def test_rules_in_regulation_order():
+    articles = [r.article for r in get_rules()]
+    assert articles == ["Art. 6.1", "Art. 6.2", "Art. 6.3", "Art. 7", "Art. 8.2", "Art. 8.6"]
+
+
+def test_registry_matches_direct_checks():
+    """Le registre donne le même résultat que les règles appelées une à une."""
+    driver = _driver()
+    expected = []
+    for check in (check_daily_driving, check_weekly_driving, check_biweekly_driving,
+                  check_breaks, check_daily_rest, check_weekly_rest):
+        expected.extend(check(driver))
+    expected.sort(key=lambda i: i.date)
+    assert analyze(driver, use_cache=False) == expected
+
+
+def test_article_subset():
+    driver = _driver()
+    infringements = analyze(driver, articles=["Art. 7"], use_cache=False)
+    assert infringements
+    assert {i.article for i in infringements} == {"Art. 7"}
+
+
+def test_article_prefix_selects_sub_articles():
+    assert [r.article for r in get_rules(["Art. 6"])] == ["Art. 6.1", "Art. 6.2", "Art. 6.3"]
+
+
+def test_unknown_article():
+    with pytest.raises(ValueError):
+        get_rules(["Art. 99"])
+
+
+def test_metrics_recorded():
+    rule_metrics.reset()
+    analyze(_driver(), articles=["Art. 6"], use_cache=False)
+    stats = rule_metrics.snapshot()
+    assert stats["daily_driving"]["calls"] == 1
+    assert stats["daily_driving"]["article"] == "Art. 6.1"
+    assert "breaks" not in stats
+    # Entrée partagée calculée une seule fois pour les trois règles
+    assert stats["input:daily_driving_minutes"]["calls"] == 1
@@ -0,0 +1,136 @@
+"""Tests du mode shadow : équivalence moteur de référence / moteur optimisé."""
+
+import logging
+import os
+import random
+import sys
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from engine.infringement_engine import analyze
+from engine.shadow import (
+    analyze_shadowed,
+    diverges,
+    mismatch_logger,
+    optimized_analyze,
+    shadow_stats,
+    shrink_divergence,
+)
+from tests.generators import random_timeline
+
+PROPERTY_CASES = int(os.environ.get("SHADOW_PROPERTY_CASES", "40"))
+
+
+@pytest.mark.parametrize("seed", range(PROPERTY_CASES))
+def test_engines_agree_on_random_timelines(seed):
+    """Propriété : les deux moteurs donnent les mêmes infractions."""
+    driver = random_timeline(seed)
+    if diverges(driver):
+        minimal = shrink_divergence(driver)
+        pytest.fail(f"Divergence (seed={seed}) sur : {minimal.activities}")
+
+
+@pytest.mark.parametrize("seed", range(PROPERTY_CASES))
+def test_engines_agree_on_random_windows(seed):
+    """Propriété : analyse d'une fenêtre = référence complète filtrée sur la fenêtre."""
+    driver = random_timeline(seed, days=70)
+    rng = random.Random(seed)
+    for _ in range(3):
+        start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 60))
+        end = start + timedelta(days=rng.randint(0, 20))
+        if diverges(driver, start=start, end=end):
+            minimal = shrink_divergence(driver, start=start, end=end)
+            pytest.fail(
+                f"Divergence (seed={seed}, {start}..{end}) sur : {minimal.activities}"
+            )
+
+
+def test_engines_agree_on_article_subsets():
+    driver = random_timeline(1234)
+    for articles in (("Art. 6",), ("Art. 7",), ("Art. 8",)):
+        assert not diverges(driver, articles)
+
+
+def _broken_optimized(driver, articles=None, start=None, end=None):
+    """Moteur défectueux : perd les infractions Art. 7 au-delà de 5h de conduite."""
+    return [
+        inf for inf in analyze(driver, start, end, articles=articles, use_cache=False)
+        if not (inf.article == "Art. 7" and inf.value > 5)
+    ]
+
+
+def _diverging_timeline():
+    for seed in range(100):
+        driver = random_timeline(seed, days=7)
+        if diverges(driver, optimized=_broken_optimized):
+            return driver
+    pytest.skip("Aucune timeline générée ne déclenche le défaut simulé")
+
+
+def test_shrink_finds_minimal_diverging_input():
+    driver = _diverging_timeline()
+    minimal = shrink_divergence(driver, optimized=_broken_optimized)
+
+    assert diverges(minimal, optimized=_broken_optimized)
+    assert len(minimal.activities) < len(driver.activities)
+    # 1-minimal : retirer n'importe quelle activité fait disparaître la divergence
+    for i in range(len(minimal.activities)):
+        reduced = minimal.model_copy(
+            update={"activities": minimal.activities[:i] + minimal.activities[i + 1:]}
+        )
+        assert not diverges(reduced, optimized=_broken_optimized)
+
+
+def test_analyze_shadowed_returns_optimized_result(caplog):
+    driver = random_timeline(7)
+    shadow_stats.reset()
+    with caplog.at_level(logging.WARNING, logger="engine.shadow"):
+        result = analyze_shadowed(driver, sample_rate=1.0)
+
+    assert result == optimized_analyze(driver)
+    assert shadow_stats.snapshot() == {"compared": 1, "mismatches": 0}
+    assert not caplog.records
+
+
+def test_analyze_shadowed_logs_mismatch(monkeypatch, caplog):
+    driver = _diverging_timeline()
+    monkeypatch.setattr(
+        "engine.shadow.analyze",
+        lambda d, start=None, end=None, articles=None, **_: _broken_optimized(d, articles, start, end),
+    )
+    monkeypatch.setattr("engine.shadow.optimized_analyze", _broken_optimized)
+    shadow_stats.reset()
+    with caplog.at_level(logging.WARNING, logger="engine.shadow"):
+        analyze_shadowed(driver, sample_rate=1.0)
+        mismatch_logger.wait()
+
+    assert shadow_stats.snapshot() == {"compared": 1, "mismatches": 1}
+    assert "Divergence" in caplog.records[0].getMessage()
+
+
+def test_mismatch_shrink_runs_in_background(monkeypatch):
+    """La réduction d'une divergence ne retarde pas l'analyse échantillonnée."""
+    driver = _diverging_timeline()
+    release = threading.Event()
+    shrunk = []
+
+    def slow_log(d, articles, start=None, end=None):
+        release.wait(5)
+        shrunk.append(d.card_number)
+
+    monkeypatch.setattr(
+        "engine.shadow.analyze",
+        lambda d, start=None, end=None, articles=None, **_: _broken_optimized(d, articles, start, end),
+    )
+    monkeypatch.setattr("engine.shadow._log_mismatch", slow_log)
+    analyze_shadowed(driver, sample_rate=1.0)
+    assert shrunk == []  # rendu avant la fin de la réduction
+
+    release.set()
+    mismatch_logger.wait()
+    assert shrunk == [driver.card_number]
@@ -0,0 +1,89 @@
+"""Tests des traces de bout en bout (spans, propagation traceparent, export)."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from observability.tracing import export_worker, parse_traceparent
+from tests.generators import synthetic_crew, vu_raw_json
+
+PARENT_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN = "00f067aa0ba902b7"
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{PARENT_TRACE}-{PARENT_SPAN}-01") == (PARENT_TRACE, PARENT_SPAN, True)
+    assert parse_traceparent(f"00-{PARENT_TRACE}-{PARENT_SPAN}-00")[2] is False
+    assert parse_traceparent("00-" + "0" * 32 + f"-{PARENT_SPAN}-01") is None
+    assert parse_traceparent("n'importe quoi") is None
+    assert parse_traceparent(None) is None
+
+
+def _spans(path):
+    export_worker.flush()
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    return [
+        span
+        for doc in documents
+        for resource in doc["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+
+
+def test_upload_trace_is_nested_and_propagated(api_client, fake_decoder, monkeypatch, tmp_path):
+    trace_file = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_EXPORTER", f"file:{trace_file}")
+    fake_decoder.raw_json = vu_raw_json(*synthetic_crew(random.Random(6), weeks=1))
+
+    response = api_client.post(
+        "/upload",
+        files={"file": ("vehicule.DDD", b"\x00", "application/octet-stream")},
+        headers={"traceparent": f"00-{PARENT_TRACE}-{PARENT_SPAN}-01"},
+    )
+    assert response.status_code == 200
+    assert response.headers["traceparent"].startswith(f"00-{PARENT_TRACE}-")
+
+    spans = _spans(trace_file)
+    by_id = {s["spanId"]: s for s in spans}
+    names = [s["name"] for s in spans]
+    assert all(s["traceId"] == PARENT_TRACE for s in spans)
+
+    root = next(s for s in spans if s["name"] == "POST /upload")
+    assert root["parentSpanId"] == PARENT_SPAN
+    for name in ("http.receive", "temp_write", "decode", "normalize", "analyze", "persist"):
+        assert name in names
+
+    def parent_name(span):
+        return by_id[span["parentSpanId"]]["name"]
+
+    assert {parent_name(s) for s in spans if s["name"] == "normalize.blocks"} == {"normalize"}
+    assert {parent_name(s) for s in spans if s["name"] == "normalize.sort"} == {"normalize"}
+    assert names.count("normalize.sort") == 2
+    assert {parent_name(s) for s in spans if s["name"].startswith("rule:")} == {"analyze"}
+    assert {parent_name(s) for s in spans if s["name"] == "sqlite"} == {"dedupe", "persist"}
+
+
+def test_tracing_disabled_without_exporter(api_client, monkeypatch):
+    monkeypatch.delenv("TRACE_EXPORTER", raising=False)
+    response = api_client.get("/")
+    assert "traceparent" not in response.headers
+
+
+def test_sql_is_not_traced_outside_a_trace(monkeypatch):
+    """Hors trace, le curseur n'ouvre pas de span (ni ne reformate la requête)."""
+    import sqlite3
+
+    from observability import tracing
+
+    opened = []
+    real_span = tracing.span
+    monkeypatch.setattr(tracing, "span", lambda *a, **kw: opened.append(kw) or real_span(*a, **kw))
+    conn = sqlite3.connect(":memory:", factory=tracing.TracedConnection)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (2,)
+    assert opened == []
@@ -0,0 +1,211 @@
+"""Tests de la déduplication des uploads (empreinte du contenu)."""
+
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db import (
+    get_connection,
+    get_infringements_by_driver,
+    get_or_create_driver,
+    get_summary,
+    init_db,
+    save_analysis,
+)
+from engine.infringement_engine import analyze
+from models.activity import ActivityType
+from tests.conftest import make_activity, make_driver
+from tests.generators import card_raw_json, synthetic_driver
+
+
+def _count(db_path, table: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_duplicate_upload_skips_decoder(api_client, fake_decoder, monkeypatch):
+    import api.pipeline
+    import database.db
+
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(11), weeks=2))
+    files = {"file": ("carte.C1B", b"contenu")}
+    first = api_client.post("/upload", files=files).json()
+    infringements = _count(database.db.DB_PATH, "infringements")
+
+    def no_decoder(*args, **kwargs):
+        raise AssertionError("décodage inattendu")
+
+    monkeypatch.setattr(api.pipeline, "parse_file", no_decoder)
+    second = api_client.post("/upload", files={"file": ("copie.C1B", b"contenu")}).json()
+
+    assert first["duplicate"] is False and second["duplicate"] is True
+    assert second["results"][0]["analysis_id"] == first["results"][0]["analysis_id"]
+    assert second["results"][0]["total_infringements"] == first["results"][0]["total_infringements"]
+    assert _count(database.db.DB_PATH, "analyses") == 1
+    assert _count(database.db.DB_PATH, "infringements") == infringements
+
+
+def test_duplicate_upload_has_fresh_response_shape(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(11), weeks=2))
+    first = api_client.post("/upload", files={"file": ("carte.C1B", b"contenu")}).json()
+    second = api_client.post("/upload", files={"file": ("copie.C1B", b"contenu")}).json()
+
+    assert first.keys() == second.keys()
+    assert [r.keys() for r in second["results"]] == [r.keys() for r in first["results"]]
+    fresh, duplicate = first["results"][0], second["results"][0]
+    assert duplicate["total_activities"] == fresh["total_activities"] > 0
+    assert duplicate["infringements"] == fresh["infringements"]
+
+
+def test_forced_upload_replaces_previous_analysis(api_client, fake_decoder):
+    import database.db
+
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(11), weeks=2))
+    first = api_client.post("/upload", files={"file": ("carte.C1B", b"contenu")}).json()
+    infringements = _count(database.db.DB_PATH, "infringements")
+
+    forced = api_client.post("/upload?force=true", files={"file": ("carte.C1B", b"contenu")}).json()
+
+    assert forced["duplicate"] is False
+    assert forced["results"][0]["analysis_id"] == first["results"][0]["analysis_id"]
+    assert _count(database.db.DB_PATH, "analyses") == 1
+    assert _count(database.db.DB_PATH, "infringements") == infringements
+
+
+def test_init_db_migrates_existing_analyses_table(tmp_path):
+    db_path = str(tmp_path / "ancienne.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""CREATE TABLE analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, driver_id INTEGER NOT NULL,
+            filename TEXT NOT NULL, file_type TEXT NOT NULL,
+            analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, total_infringements INTEGER DEFAULT 0)""")
+        conn.execute("INSERT INTO analyses (driver_id, filename, file_type) VALUES (1, 'a.C1B', 'card')")
+
+    init_db(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+        assert "content_hash" in columns
+        assert conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 1
+
+
+def test_overlapping_downloads_do_not_duplicate_infringements(api_client, fake_decoder):
+    import database.db
+
+    driver = synthetic_driver(random.Random(12), weeks=4)
+    fake_decoder.raw_json = card_raw_json(driver)
+    first = api_client.post("/upload", files={"file": ("j1.C1B", b"premier")}).json()
+    total = first["results"][0]["total_infringements"]
+    assert total > 0
+
+    # Deuxième téléchargement : même historique, fichier différent
+    second = api_client.post("/upload", files={"file": ("j2.C1B", b"second")}).json()
+    driver_id = second["results"][0]["driver_id"]
+
+    assert second["results"][0]["analysis_id"] != first["results"][0]["analysis_id"]
+    assert _count(database.db.DB_PATH, "infringements") == total
+    stored = api_client.get(f"/infringements/{driver_id}").json()["infringements"]
+    assert {i["analysis_id"] for i in stored} == {second["results"][0]["analysis_id"]}
+
+
+def test_init_db_removes_duplicate_infringements(tmp_path):
+    db_path = str(tmp_path / "doublons.db")
+    init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP INDEX idx_infringements_event")
+        for analysis_id in (1, 2):
+            conn.execute(
+                """INSERT INTO infringements (analysis_id, driver_id, article, rule_description,
+                   severity, value, limit_value, excess, infringement_date)
+                   VALUES (?, 1, 'Art. 6.1', 'Temps de conduite journalier', 'MI', 10, 9, 1, '2024-01-02')""",
+                (analysis_id,),
+            )
+
+    init_db(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT analysis_id FROM infringements").fetchall() == [(2,)]
+
+
+def test_two_break_violations_on_one_day_are_both_kept(tmp_path):
+    db_path = str(tmp_path / "pauses.db")
+    init_db(db_path)
+    driver = make_driver([
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 5, 0, 10, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 10, 0, 14, 50),
+    ])
+    infringements = [i for i in analyze(driver, use_cache=False) if i.article == "Art. 7"]
+    assert len(infringements) == 2
+
+    with get_connection(db_path) as conn:
+        driver_id = get_or_create_driver(conn, driver.driver_name, driver.card_number)
+        save_analysis(conn, driver_id, "j1.C1B", "card", infringements, "h1")
+        # Téléchargement chevauchant : les mêmes infractions ne sont pas dupliquées
+        save_analysis(conn, driver_id, "j2.C1B", "card", infringements, "h2")
+        stored = get_infringements_by_driver(conn, driver_id)
+        summary = get_summary(conn)
+
+    assert sorted(i["excess"] for i in stored) == [0.33, 0.5]
+    assert summary["by_article"] == {"Art. 7": 2}
+
+
+def test_migration_keeps_same_day_infringements_of_one_analysis(tmp_path):
+    db_path = str(tmp_path / "migration.db")
+    init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP INDEX idx_infringements_event")
+        for analysis_id, excess in ((1, 0.5), (1, 0.33), (2, 0.5), (2, 0.33)):
+            conn.execute(
+                """INSERT INTO infringements (analysis_id, driver_id, article, rule_description,
+                   severity, value, limit_value, excess, infringement_date)
+                   VALUES (?, 1, 'Art. 7', 'Pause insuffisante après 4h30 de conduite', 'MI',
+                           5, 4.5, ?, '2024-01-02')""",
+                (analysis_id, excess),
+            )
+
+    init_db(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT analysis_id, excess FROM infringements ORDER BY id").fetchall()
+    assert rows == [(2, 0.5), (2, 0.33)]
+
+
+def test_overlap_on_boundary_day_keeps_distinct_events(tmp_path):
+    """Deux pauses insuffisantes le même jour, chacune vue par un seul téléchargement."""
+    db_path = str(tmp_path / "bornes.db")
+    init_db(db_path)
+    morning = make_driver([make_activity(ActivityType.DRIVING, 2024, 1, 2, 5, 0, 10, 0)])
+    afternoon = make_driver([make_activity(ActivityType.DRIVING, 2024, 1, 2, 10, 0, 14, 50)])
+    first = [i for i in analyze(morning, use_cache=False) if i.article == "Art. 7"]
+    second = [i for i in analyze(afternoon, use_cache=False) if i.article == "Art. 7"]
+    assert len(first) == len(second) == 1 and first[0].date == second[0].date
+
+    with get_connection(db_path) as conn:
+        driver_id = get_or_create_driver(conn, morning.driver_name, morning.card_number)
+        save_analysis(conn, driver_id, "j1.C1B", "card", first, "h1")
+        save_analysis(conn, driver_id, "j2.C1B", "card", second, "h2")
+        stored = get_infringements_by_driver(conn, driver_id)
+
+    assert sorted(i["excess"] for i in stored) == sorted([first[0].excess, second[0].excess])
+
+
+def test_moved_infringements_update_previous_analysis_total(tmp_path):
+    db_path = str(tmp_path / "totaux.db")
+    init_db(db_path)
+    driver = make_driver([
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 5, 0, 10, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 2, 10, 0, 14, 50),
+    ])
+    infringements = [i for i in analyze(driver, use_cache=False) if i.article == "Art. 7"]
+
+    with get_connection(db_path) as conn:
+        driver_id = get_or_create_driver(conn, driver.driver_name, driver.card_number)
+        first = save_analysis(conn, driver_id, "j1.C1B", "card", infringements, "h1")
+        # Le second téléchargement ne contient que la seconde infraction
+        second = save_analysis(conn, driver_id, "j2.C1B", "card", infringements[1:], "h2")
+        totals = dict(conn.execute("SELECT id, total_infringements FROM analyses"))
+
+    assert totals == {first: 1, second: 1}
@@ -69,3 +69,96 @@ def test_reduced_weekly_rest_no_infringement():
     driver = make_driver(activities)
     infringements = check_weekly_rest(driver)
     assert len(infringements) == 0
+
+
+# === Compensation des repos réduits ===
+
+def _weeks_with_weekend_rests(weekend_rest_hours, extra_rest_hours=0, extra_days=(1,)):
+    """Semaines lun-ven de conduite, repos de fin de semaine de durée donnée.
+
+    ``weekend_rest_hours`` : durée du repos hebdomadaire de chaque semaine.
+    ``extra_rest_hours`` : surplus ajouté au repos journalier normal (11h)
+    des jours ``extra_days`` (0 = lundi) de la 2ème semaine.
+    """
+    activities = []
+    monday = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for week, rest_hours in enumerate(weekend_rest_hours):
+        week_start = monday + timedelta(weeks=week)
+        cursor = week_start + timedelta(hours=6)
+        for day in range(5):
+            day_start = week_start + timedelta(days=day, hours=6)
+            if day_start > cursor:
+                cursor = day_start
+            drive_end = cursor + timedelta(hours=8)
+            activities.append(Activity(
+                type=ActivityType.DRIVING, start=cursor, end=drive_end,
+                duration_minutes=8 * 60,
+            ))
+            rest = 11 if day < 4 else rest_hours
+            if week == 1 and day in extra_days:
+                rest += extra_rest_hours
+            rest_end = drive_end + timedelta(hours=rest)
+            activities.append(Activity(
+                type=ActivityType.REST, start=drive_end, end=rest_end,
+                duration_minutes=int(rest * 60),
+            ))
+            cursor = rest_end
+    return make_driver(activities)
+
+
+def test_reduced_weekly_rest_not_compensated_infringement():
+    """Repos réduit de 30h sans compensation avant l'échéance -> infraction."""
+    driver = _weeks_with_weekend_rests([30, 45, 45, 45, 45])
+    infringements = [
+        i for i in check_weekly_rest(driver)
+        if i.rule_description == "Repos hebdomadaire réduit non compensé"
+    ]
+    assert len(infringements) == 1
+    assert infringements[0].excess == 15.0
+    assert infringements[0].date == datetime(2024, 1, 5).date()
+
+
+def test_reduced_weekly_rest_compensated():
+    """Repos réduit de 30h compensé par 15h rattachées au repos suivant -> OK."""
+    driver = _weeks_with_weekend_rests([30, 60, 45, 45, 45])
+    infringements = [
+        i for i in check_weekly_rest(driver)
+        if i.rule_description == "Repos hebdomadaire réduit non compensé"
+    ]
+    assert infringements == []
+
+
+def test_reduced_weekly_rest_partial_surplus_does_not_compensate():
+    """Un surplus qui ne couvre pas tout le manque ne compense rien."""
+    driver = _weeks_with_weekend_rests([36, 45, 45, 45, 45], extra_rest_hours=5)
+    infringements = [
+        i for i in check_weekly_rest(driver)
+        if i.rule_description == "Repos hebdomadaire réduit non compensé"
+    ]
+    # Repos de 16h le mardi : 5h au-delà de 11h, manque de 9h entier
+    assert len(infringements) == 1
+    assert infringements[0].excess == 9.0
+    assert infringements[0].value == 0.0
+
+
+def test_reduced_weekly_rest_not_compensated_by_spread_surplus():
+    """Des surplus répartis sur plusieurs repos ne s'additionnent pas."""
+    driver = _weeks_with_weekend_rests(
+        [36, 45, 45, 45, 45], extra_rest_hours=3, extra_days=(1, 2, 3)
+    )
+    infringements = [
+        i for i in check_weekly_rest(driver)
+        if i.rule_description == "Repos hebdomadaire réduit non compensé"
+    ]
+    assert len(infringements) == 1
+    assert infringements[0].excess == 9.0
+
+
+def test_reduced_weekly_rest_compensated_by_daily_rest():
+    """Repos journalier de 20h : ses 9h de surplus couvrent le manque en bloc."""
+    driver = _weeks_with_weekend_rests([36, 45, 45, 45, 45], extra_rest_hours=9)
+    infringements = [
+        i for i in check_weekly_rest(driver)
+        if i.rule_description == "Repos hebdomadaire réduit non compensé"
+    ]
+    assert infringements == []
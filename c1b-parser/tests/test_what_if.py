@@ -0,0 +1,57 @@
+"""Tests pour l'évaluation de plannings hypothétiques (what-if)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.infringement_engine import analyze
+from engine.what_if import evaluate_candidates
+from models.activity import ActivityType
+from tests.conftest import make_activity, make_driver
+
+
+def _history():
+    """Lundi-mardi : 9h de conduite par jour avec pauses et repos."""
+    activities = []
+    for day in (15, 16):
+        activities += [
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 6, 0, 10, 30),
+            make_activity(ActivityType.REST, 2024, 1, day, 10, 30, 11, 15),
+            make_activity(ActivityType.DRIVING, 2024, 1, day, 11, 15, 15, 45),
+            make_activity(ActivityType.REST, 2024, 1, day, 15, 45, 23, 59),
+        ]
+    return make_driver(activities)
+
+
+def _plan(drive_hours_without_break):
+    """Mercredi : repos jusqu'à 6h puis conduite sans pause."""
+    return [
+        make_activity(ActivityType.REST, 2024, 1, 17, 0, 0, 6, 0),
+        make_activity(ActivityType.DRIVING, 2024, 1, 17, 6, 0, 6 + drive_hours_without_break, 0),
+        make_activity(ActivityType.REST, 2024, 1, 17, 6 + drive_hours_without_break, 0, 23, 59),
+    ]
+
+
+def test_compliant_and_violating_candidates():
+    results = evaluate_candidates(_history(), [_plan(4), _plan(6), []])
+    assert results[0] == []
+    assert [i.article for i in results[1]] == ["Art. 7"]
+    assert results[2] == []
+
+
+def test_matches_full_analysis_of_history_plus_candidate():
+    """Le contexte partagé donne le même résultat qu'une analyse complète."""
+    history = _history()
+    plan = _plan(6)
+    full = analyze(make_driver(history.activities + plan), use_cache=False)
+    baseline = analyze(history, use_cache=False)
+    expected = [i for i in full if i not in baseline]
+    assert evaluate_candidates(history, [plan])[0] == expected
+
+
+def test_parallel_matches_sequential():
+    candidates = [_plan(h) for h in (3, 4, 5, 6, 7, 8)]
+    sequential = evaluate_candidates(_history(), candidates)
+    parallel = evaluate_candidates(_history(), candidates, workers=2)
+    assert parallel == sequential
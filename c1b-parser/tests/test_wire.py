@@ -0,0 +1,133 @@
+"""Tests du format colonnes et de la négociation de contenu."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from api.wire import (
+    COLUMNAR_JSON,
+    JSON_MEDIA_TYPE,
+    columnar_timeline,
+    negotiate_encoding,
+    negotiate_media_type,
+    timeline_from_columnar,
+)
+from tests.generators import card_raw_json, synthetic_driver
+
+
+def test_columnar_round_trip_preserves_timeline():
+    driver = synthetic_driver(random.Random(7), weeks=2)
+    driver.activities[0].vehicle_registration = "AB-123-CD"
+
+    restored = timeline_from_columnar(json.loads(json.dumps(columnar_timeline(driver))))
+
+    assert restored.card_number == driver.card_number
+    assert [a.model_dump() for a in restored.activities] == [a.model_dump() for a in driver.activities]
+
+
+def test_columnar_rejects_ragged_columns():
+    payload = columnar_timeline(synthetic_driver(random.Random(7), weeks=1))
+    payload["ends"].pop()
+    with pytest.raises(ValueError):
+        timeline_from_columnar(payload)
+
+
+def test_negotiation_follows_quality_values():
+    assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+    assert negotiate_media_type(f"{COLUMNAR_JSON}, application/json;q=0.5") == COLUMNAR_JSON
+    assert negotiate_media_type(f"application/json, {COLUMNAR_JSON};q=0.5") == JSON_MEDIA_TYPE
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+
+
+def test_parse_columnar_is_smaller_and_equivalent(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(8), weeks=4))
+    files = {"file": ("carte.C1B", b"\x00")}
+
+    plain = api_client.post("/parse", files=files, headers={"Accept-Encoding": "identity"})
+    compact = api_client.post(
+        "/parse", files=files, headers={"Accept": COLUMNAR_JSON, "Accept-Encoding": "identity"}
+    )
+
+    assert compact.headers["content-type"] == COLUMNAR_JSON
+    assert len(compact.content) * 3 < len(plain.content)
+    body = compact.json()
+    restored = timeline_from_columnar(body["results"][0], body["type_codes"])
+    expected = plain.json()["results"][0]["activities"]
+    assert [a.start.isoformat() for a in restored.activities] == [a["start"] for a in expected]
+    assert [a.type.value for a in restored.activities] == [a["type"] for a in expected]
+
+
+def test_large_responses_are_gzipped(api_client, fake_decoder):
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(8), weeks=4))
+
+    response = api_client.post(
+        "/upload", files={"file": ("carte.C1B", b"\x00")}, headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["drivers_found"] == 1
+
+
+def test_upload_is_plain_json_whatever_accept(api_client, fake_decoder):
+    """/upload ne renvoie pas de timeline : jamais étiqueté comme colonnes."""
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(8), weeks=1))
+
+    response = api_client.post(
+        "/upload", files={"file": ("carte.C1B", b"\x00")}, headers={"Accept": COLUMNAR_JSON}
+    )
+
+    assert response.headers["content-type"] == JSON_MEDIA_TYPE
+    assert response.json()["drivers_found"] == 1
+
+
+def test_brotli_round_trip(api_client, fake_decoder):
+    brotli = pytest.importorskip("brotli")
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(8), weeks=4))
+    files = {"file": ("carte.C1B", b"\x00")}
+
+    plain = api_client.post("/parse", files=files, headers={"Accept-Encoding": "identity"})
+    # Corps brut, avant toute décompression par le client
+    with api_client.stream(
+        "POST", "/parse", files=files, headers={"Accept-Encoding": "br"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(raw)) == plain.json()
+
+
+def test_msgpack_columnar(api_client, fake_decoder):
+    msgpack = pytest.importorskip("msgpack")
+    from api.wire import COLUMNAR_MSGPACK
+
+    fake_decoder.raw_json = card_raw_json(synthetic_driver(random.Random(8), weeks=1))
+    response = api_client.post("/parse", files={"file": ("carte.C1B", b"\x00")},
+                               headers={"Accept": COLUMNAR_MSGPACK})
+
+    assert response.headers["content-type"] == COLUMNAR_MSGPACK
+    assert msgpack.unpackb(response.content)["drivers_found"] == 1
+
+
+def test_msgpack_round_trip_preserves_timeline(api_client, fake_decoder):
+    msgpack = pytest.importorskip("msgpack")
+    from api.wire import COLUMNAR_MSGPACK
+
+    driver = synthetic_driver(random.Random(8), weeks=2)
+    fake_decoder.raw_json = card_raw_json(driver)
+    files = {"file": ("carte.C1B", b"\x00")}
+
+    compact = api_client.post("/parse", files=files, headers={"Accept": COLUMNAR_MSGPACK})
+    plain = api_client.post("/parse", files=files, headers={"Accept": COLUMNAR_JSON})
+
+    body = msgpack.unpackb(compact.content)
+    assert body == plain.json()
+    restored = timeline_from_columnar(body["results"][0], body["type_codes"])
+    assert [(a.type, a.start, a.end) for a in restored.activities] == [
+        (a.type, a.start, a.end) for a in timeline_from_columnar(plain.json()["results"][0]).activities
+    ]